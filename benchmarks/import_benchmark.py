@@ -0,0 +1,84 @@
+'''
+Measures the import time of RPALite with python -X importtime and checks it against a startup budget.
+
+Each statement is run in a fresh interpreter. The report shows the import time of the statement (without the
+imports of a bare interpreter), the slowest imported modules and the heavy dependencies (OpenCV, numpy, pyautogui,
+OCR engines, ...) that were imported although the statement does not need them. The exit code is 1 if a statement
+exceeds the budget or imports a heavy dependency, so the script can guard the startup time in CI.
+
+Usage:
+    python benchmarks/import_benchmark.py [--budget-ms 1500] [--top 10] [--allow-heavy] [statement ...]
+'''
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+
+DEFAULT_STATEMENTS = ['import RPALite', 'from RPALite import RPALite']
+
+# Modules RPALite imports only when a capability that needs them is used
+HEAVY_MODULES = ['cv2', 'numpy', 'pyautogui', 'pyperclip', 'easyocr', 'paddleocr', 'torch', 'paddle',
+                 'uiautomation', 'pywinauto', 'Quartz', 'AppKit', 'mouse', 'keyboard', 'Xlib']
+
+
+def measure_import(statement, src_dir=SRC_DIR):
+    '''
+    Runs statement in a new interpreter with -X importtime.
+
+    Returns
+    -------
+    tuple
+        (total_us, modules, heavy_modules): the cumulative import time in microseconds of the modules imported by the
+        statement, a list of (cumulative_us, module_name) of the imported modules and the list of the heavy modules
+        that were imported.
+    '''
+    check = f"{statement}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (os.path.abspath(src_dir), env.get('PYTHONPATH')) if p)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', check], capture_output=True, text=True,
+                             env=env)
+    if process.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed: {process.stderr.strip().splitlines()[-1]}")
+
+    total, modules = 0, []
+    for line in process.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative_us), name.strip()))
+        if not name[1:].startswith(' '):
+            # Only the top level imports, the nested ones are part of their cumulative time
+            total += int(cumulative_us)
+    heavy = [m for m in process.stdout.strip().split(',') if m]
+    return total, modules, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=1500, help='Maximum import time of a statement')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest modules to show')
+    parser.add_argument('--allow-heavy', action='store_true', help='Do not fail if heavy modules are imported')
+    parser.add_argument('statements', nargs='*', default=DEFAULT_STATEMENTS)
+    args = parser.parse_args()
+
+    baseline = measure_import('pass')[0]
+    failed = False
+    for statement in args.statements:
+        total, modules, heavy = measure_import(statement)
+        total = max(total - baseline, 0)
+        within_budget = total <= args.budget_ms * 1000
+        print(f"{statement}: {total / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)"
+              f"{'' if within_budget else ' OVER BUDGET'}")
+        for cumulative, name in sorted(modules, reverse=True)[:args.top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+        if heavy:
+            print(f"  heavy modules imported: {', '.join(heavy)}")
+        failed = failed or not within_budget or (bool(heavy) and not args.allow_heavy)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+'''
+Benchmarks the OCR modes of ImageHandler against the plain full frame recognition.
+
+For every image and mode it reports the latency of the recognition and the recall, which is the share of the texts
+found by the full frame recognition that the mode found at (about) the same position. Comparing the resolution modes
+shows the accuracy/latency tradeoff of downsampling before OCR.
+
+Usage:
+    python benchmarks/ocr_benchmark.py [--engine easyocr|paddleocr] [--tile-size 640] [--scales 0.75 0.5]
+                                       [--repeat 3] [image ...]
+
+If no image is given, the images in tests/unit are used.
+'''
+import argparse
+import glob
+import os
+import sys
+import time
+
+import PIL.Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from RPALite.image_handler import ImageHandler  # noqa: E402
+from RPALite.ocr_utils import box_bounds  # noqa: E402
+
+
+def same_text(expected, actual, tolerance=8):
+    '''Returns True if two OCR entries have the same text at about the same position.'''
+    if expected[1].strip() != actual[1].strip():
+        return False
+    return all(abs(a - b) <= tolerance for a, b in zip(box_bounds(expected[0]), box_bounds(actual[0])))
+
+
+def recall(expected, actual):
+    if not expected:
+        return 1.0
+    actual = actual or []
+    found = sum(1 for e in expected if any(same_text(e, a) for a in actual))
+    return found / len(expected)
+
+
+def measure(handler, image, repeat):
+    '''Returns the best latency in seconds of repeat recognitions and the last result.'''
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # Bypass the Snapshot and the result cache so that each run really recognizes the image
+        result = handler.ocr_handler.find_texts_in_image(image)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def build_modes(args):
+    '''Returns the (name, ImageHandler) pairs to benchmark. The first one is the reference.'''
+    common = dict(ocr_engine=args.engine, languages=args.languages, ocr_cache_size=0)
+    return [
+        ('full', ImageHandler(**common)),
+        (f'tiled {args.tile_size}px x{args.workers}',
+         ImageHandler(ocr_tile_size=args.tile_size, ocr_tile_workers=args.workers, **common)),
+    ] + [(f'resolution {scale}', ImageHandler(ocr_resolution=scale, **common)) for scale in args.scales]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the OCR modes of RPALite')
+    parser.add_argument('images', nargs='*')
+    parser.add_argument('--engine', default='easyocr')
+    parser.add_argument('--languages', nargs='+', default=['en'])
+    parser.add_argument('--tile-size', type=int, default=640)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--scales', type=float, nargs='*', default=[0.75, 0.5],
+                        help='fixed OCR resolution scale factors to compare')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    images = args.images or sorted(glob.glob(os.path.join(os.path.dirname(__file__), os.pardir, 'tests', 'unit', '*.png')))
+    modes = build_modes(args)
+
+    print(f"{'image':<28}{'mode':<28}{'latency (s)':>12}{'speedup':>10}{'recall':>8}")
+    for path in images:
+        image = PIL.Image.open(path).convert('RGB')
+        reference_time, reference = None, None
+        for name, handler in modes:
+            elapsed, result = measure(handler, image, args.repeat)
+            if reference is None:
+                reference_time, reference = elapsed, result or []
+            print(f"{os.path.basename(path):<28}{name:<28}{elapsed:>12.3f}{reference_time / elapsed:>10.2f}"
+                  f"{recall(reference, result):>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
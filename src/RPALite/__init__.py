@@ -3,5 +3,27 @@
 """
 __version__ = "0.0.9"
 
-from .rpalite import RPALite
-from .image_handler import ImageHandler
+import importlib
+
+# The public classes are imported on first access, so that importing the package (or one of its modules) does not
+# import Robot Framework, OpenCV, numpy and the automation libraries.
+_exports = {
+    'RPALite': '.rpalite',
+    'ImageHandler': '.image_handler',
+    'Snapshot': '.snapshot',
+    'OCRProfile': '.ocr_profile',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module(_exports[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
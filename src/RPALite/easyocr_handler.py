@@ -1,46 +1,125 @@
-import easyocr
 import numpy as np
 from typing import List, Tuple, Optional
 import logging
+from contextlib import contextmanager
+from .ocr_handler import OCRHandler
+from .ocr_result import OcrResult
 
 logger = logging.getLogger(__name__)
 
-class EasyOCRHandler:
-    def __init__(self, languages: List[str] = ['en'], debug_mode: bool = False):
-        self.languages = languages
-        self.debug_mode = debug_mode
+class EasyOCRHandler(OCRHandler):
+    engine_name = 'easyocr'
+    supports_detection = True
+
+    def __init__(self, languages: List[str] = ['en'], debug_mode: bool = False, cache=None, profile=None):
+        super().__init__(languages, debug_mode, cache, profile)
+        self.reader = None
+
+    def _load(self):
+        import easyocr
         self.reader = easyocr.Reader(self.languages)
-        
-    def find_texts_in_image(self, image):
+
+    @contextmanager
+    def _cpu_threads(self):
+        # torch.set_num_threads() changes the thread count of the whole process, so the previous count is restored
+        # after the call to keep other engines and user code unaffected
+        threads = self.profile.cpu_threads
+        if not threads:
+            yield
+            return
+        import torch
+        previous = torch.get_num_threads()
+        torch.set_num_threads(threads)
+        try:
+            yield
+        finally:
+            torch.set_num_threads(previous)
+
+    def _recognize(self, img_array):
         """
-        Find text locations in an image using EasyOCR.
-        
+        Find text locations in an image array using EasyOCR.
+
         Args:
-            image: PIL Image or numpy array
-            text: Text to search for
-            
+            img_array: numpy array of the image
+
         Returns:
-            A list of tuples where each tuple contains:
-            - A bounding box tuple (x, y, width, height) representing the text location
-            - The recognized text string that contains the search text
-            Returns None if:
-            - The input image is invalid
-            - No text is found that contains the search text
-            - An error occurs during OCR processing
+            An OcrResult with:
+            - The bounding boxes of the texts, the 4 corner points of each text
+            - The recognized text strings
+            - The confidences of the recognitions
+            Returns None if an error occurs during OCR processing
         """
-        if isinstance(image, np.ndarray):
-            img_array = image
-        else:
-            img_array = np.array(image)
-            
+        profile = self.profile
         try:
-            results = self.reader.readtext(img_array, link_threshold=0.3, width_ths=0.3, batch_size=2, slope_ths=0.5)
-            
+            with self._cpu_threads():
+                results = self.reader.readtext(img_array, link_threshold=profile.link_threshold, width_ths=0.3,
+                                               batch_size=profile.batch_size, slope_ths=0.5,
+                                               canvas_size=profile.canvas_size, mag_ratio=profile.mag_ratio)
+
             if self.debug_mode:
                 logger.debug(f"EasyOCR results: {results}")
-                
-            return results
-                
+
+            return OcrResult.from_list(results)
+
         except Exception as e:
             logger.error(f"Error in EasyOCR text recognition: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def _detect(self, img_array):
+        from easyocr.utils import reformat_input
+        profile = self.profile
+        img, _ = reformat_input(img_array)
+        with self._cpu_threads():
+            horizontal_list, free_list = self.reader.detect(img, link_threshold=profile.link_threshold, width_ths=0.3,
+                                                            slope_ths=0.5, canvas_size=profile.canvas_size,
+                                                            mag_ratio=profile.mag_ratio)
+        boxes = [[[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+                 for x_min, x_max, y_min, y_max in horizontal_list[0]]
+        boxes.extend([[int(p[0]), int(p[1])] for p in box] for box in free_list[0])
+        boxes.sort(key=lambda box: (box[0][1], box[0][0]))
+        return boxes
+
+    def _recognize_boxes(self, img_array, boxes):
+        from easyocr.utils import reformat_input
+        profile = self.profile
+        _, img_cv_grey = reformat_input(img_array)
+        horizontal_list = []
+        free_list = []
+        for box in boxes:
+            xs = [p[0] for p in box]
+            ys = [p[1] for p in box]
+            if box[0][1] == box[1][1] and box[0][0] == box[3][0]:
+                horizontal_list.append([min(xs), max(xs), min(ys), max(ys)])
+            else:
+                free_list.append(box)
+        with self._cpu_threads():
+            results = self.reader.recognize(img_cv_grey, horizontal_list, free_list, batch_size=profile.batch_size)
+
+        # EasyOCR sorts the results and clips the boxes to the image, so each result is assigned to the closest box
+        recognized = [None] * len(boxes)
+        corners = np.array([np.array(box, dtype=np.float64).reshape(4, 2) for box in boxes])
+        for box, text, confidence in results:
+            distances = np.abs(corners - np.array(box, dtype=np.float64).reshape(1, 4, 2)).sum(axis=(1, 2))
+            i = int(distances.argmin())
+            recognized[i] = (boxes[i], text, confidence)
+        return recognized
+
+    def _recognize_batch(self, img_arrays):
+        # readtext_batched() needs images of the same size, which is the usual case for screenshots of one host
+        if len(img_arrays) < 2 or len({img_array.shape for img_array in img_arrays}) > 1:
+            return super()._recognize_batch(img_arrays)
+        profile = self.profile
+        try:
+            with self._cpu_threads():
+                results = self.reader.readtext_batched(img_arrays, link_threshold=profile.link_threshold, width_ths=0.3,
+                                                       batch_size=profile.batch_size, slope_ths=0.5,
+                                                       canvas_size=profile.canvas_size, mag_ratio=profile.mag_ratio)
+
+            if self.debug_mode:
+                logger.debug(f"EasyOCR batch results: {results}")
+
+            return [OcrResult.from_list(result) for result in results]
+
+        except Exception as e:
+            logger.error(f"Error in EasyOCR batch text recognition: {e}")
+            return [None] * len(img_arrays)
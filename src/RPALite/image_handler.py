@@ -2,26 +2,192 @@ import cv2
 import numpy as np
 from typing import List, Tuple, Optional
 import logging
-import math
-from difflib import SequenceMatcher
+import threading
+import time
+from contextlib import contextmanager
+from .snapshot import Snapshot
+from .ocr_cache import OCRResultCache
+from .ocr_disk_cache import PersistentOCRCache
+from .incremental_ocr import IncrementalOCRHandler
+from .tiled_ocr import TiledOCRHandler
+from .scaled_ocr import ScaledOCRHandler
+from .ocr_profile import get_profile
+from .ocr_registry import create_ocr_engine, get_registry
+from .ocr_process_pool import OCRProcessPool
+from .remote_ocr import RemoteOCRHandler
+from .location_hints import LocationHintCache
+from .query_ocr import QueryAwareRecognizer
+from .text_index import TextIndex
+from .ocr_result import OcrResult
+from .text_prefilter import TextChangeDetector, TextPrefilterOCRHandler, find_text_regions
+from .ocr_utils import expand_rect, offset_result, union_rect
 
 logger = logging.getLogger(__name__)
 
 class ImageHandler:
-    def __init__(self, debug_mode: bool = False, ocr_engine: str = "paddleocr", languages: List[str] = ['en'], debug_image_show_seconds=5):
+    def __init__(self, debug_mode: bool = False, ocr_engine: str = "paddleocr", languages: List[str] = ['en'], debug_image_show_seconds=5,
+                 ocr_cache_size: int = 16, ocr_cache_max_bytes: int = 8 * 1024 * 1024, incremental_ocr: bool = False,
+                 ocr_tile_size: int = 0, ocr_tile_overlap: int = 160, ocr_tile_workers: int = 2, ocr_resolution='full',
+                 ocr_profile=None, shared_ocr_engine: bool = True, ocr_workers: int = 0, ocr_max_pending: int = 4,
+                 ocr_daemon_socket=None, ocr_remote_engine: str = "paddleocr", ocr_disk_cache=None,
+                 ocr_disk_cache_max_bytes: int = 256 * 1024 * 1024, ocr_prefilter: bool = False,
+                 query_aware_ocr: bool = False, text_location_hints: bool = False, location_hint_min_ratio: float = 0.9):
         '''
-        Initialize the ImageHandler class. This class use EasyOCR for text OCR. About language codes please check https://www.jaided.ai/easyocr/'''
+        Initialize the ImageHandler class. This class use EasyOCR for text OCR. About language codes please check https://www.jaided.ai/easyocr/
+
+        OCR results are cached by the content of the recognized image. ocr_cache_size is the maximum number of cached results and ocr_cache_max_bytes the maximum memory they may use. Set ocr_cache_size to 0 to disable the cache.
+
+        ocr_disk_cache enables the persistent OCR cache shared by all runs: True stores it at the default path (see default_cache_path()), a string is the path of the database. ocr_disk_cache_max_bytes is the maximum size of the stored results. See PersistentOCRCache.
+
+        If incremental_ocr is True, only the regions of the screen that changed since the previous screenshot are recognized again. When a window was moved or a list scrolled, the previous texts are moved with the content and only the newly exposed strip is recognized. See IncrementalOCRHandler.
+
+        If ocr_tile_size is larger than 0, images larger than ocr_tile_size pixels are split into tiles overlapping by ocr_tile_overlap pixels which are recognized by ocr_tile_workers threads at the same time. Each worker thread loads its own OCR model. See TiledOCRHandler.
+
+        ocr_resolution is the resolution policy for OCR: 'full' recognizes images as they are, 'auto' downsamples high DPI screenshots to the logical resolution (or large texts to a normal height) and a number between 0 and 1 is a fixed scale factor. See ScaledOCRHandler.
+
+        If ocr_prefilter is True, cheap OpenCV operations find the regions of the image that may contain text and only those regions are recognized. Waiting functions also skip OCR while no text region of the screen changes. See TextPrefilterOCRHandler and TextChangeDetector.
+
+        If query_aware_ocr is True, searching a text detects the text boxes first and only recognizes the boxes whose size fits the searched text, unless the full screen was already recognized. Only the paddleocr and easyocr engines running in-process support it, and the tiling and resolution options are not applied to it. See QueryAwareRecognizer.
+
+        If text_location_hints is True, the position where each text was last found is remembered and the next search of the text first recognizes only the area around it. The search returns right away if the text is found there with a match ratio of at least location_hint_min_ratio, otherwise the full image is searched. See LocationHintCache.
+
+        ocr_profile is the speed profile of the OCR engine: 'fast', 'balanced' (default), 'accurate' or an OCRProfile object. See the ocr_profile module.
+
+        If shared_ocr_engine is True, the OCR engine is shared with the other ImageHandler instances of the process using the same engine, languages and profile, so that the models are loaded only once. Call close() to release it. See OCREngineRegistry.
+
+        If ocr_workers is larger than 0, OCR runs in that many worker processes instead of the calling process, with at most ocr_max_pending requests in flight. Each worker loads its own OCR model and shared_ocr_engine is ignored. See OCRProcessPool.
+
+        If ocr_engine is "remote", the images are recognized by the rpalite-ocrd daemon listening on ocr_daemon_socket (None uses the RPALITE_OCRD_SOCKET environment variable or the default path) with the ocr_remote_engine engine. If the daemon is not available, the same engine is used in-process. See RemoteOCRHandler.'''
         self.debug_mode = debug_mode
         self.languages = languages
         self.debug_image_show_milliseconds = debug_image_show_seconds * 1000
-        # Initialize OCR handler based on selected engine
-        if ocr_engine.lower() == "paddleocr":
-            from .paddleocr_handler import PaddleOCRHandler
-            self.ocr_handler = PaddleOCRHandler(languages, debug_mode)
+        # Pixels added around a rect before only that part of the image is recognized, so that texts starting inside the rect are not cut
+        self.ocr_crop_padding = 32
+        self.ocr_disk_cache = None
+        if isinstance(ocr_disk_cache, str) and ocr_disk_cache.lower() in ('true', 'false'):
+            # Robot Framework passes booleans as strings
+            ocr_disk_cache = ocr_disk_cache.lower() == 'true'
+        if ocr_disk_cache:
+            self.ocr_disk_cache = PersistentOCRCache(ocr_disk_cache if isinstance(ocr_disk_cache, str) else None,
+                                                     ocr_disk_cache_max_bytes)
+        if ocr_cache_size > 0:
+            self.ocr_cache = OCRResultCache(ocr_cache_size, ocr_cache_max_bytes, backend=self.ocr_disk_cache)
         else:
-            from .easyocr_handler import EasyOCRHandler
-            self.ocr_handler = EasyOCRHandler(languages, debug_mode)
+            self.ocr_cache = self.ocr_disk_cache
+        self.ocr_engine = ocr_engine
+        self.ocr_profile = get_profile(ocr_profile)
+        self.shared_ocr_engine = shared_ocr_engine
+        self.ocr_daemon_socket = ocr_daemon_socket
+        self.ocr_remote_engine = ocr_remote_engine
+        self.ocr_process_pool = None
+        if ocr_workers > 0:
+            self.ocr_process_pool = OCRProcessPool(ocr_engine, languages, debug_mode, cache=self.ocr_cache,
+                                                   profile=self.ocr_profile, workers=ocr_workers,
+                                                   max_pending=ocr_max_pending)
+        # The OCR models are loaded by the first OCR query or by warm_up()
+        self.ocr_handler = self.engine_ocr_handler = self.ocr_process_pool or \
+            self._create_ocr_handler(self.ocr_cache, shared_ocr_engine)
+        self._warm_up_thread = None
+        self.tiled_ocr_handler = None
+        if ocr_tile_size > 0:
+            self.ocr_handler = self.tiled_ocr_handler = TiledOCRHandler(self.ocr_handler, ocr_tile_size, ocr_tile_overlap, ocr_tile_workers,
+                                                                        handler_factory=lambda: self._create_ocr_handler(None, False), debug_mode=debug_mode,
+                                                                        cache=self.ocr_cache)
+        self.scaled_ocr_handler = None
+        if ocr_resolution != 'full':
+            self.ocr_handler = self.scaled_ocr_handler = ScaledOCRHandler(self.ocr_handler, ocr_resolution, debug_mode=debug_mode)
+        self.ocr_prefilter = ocr_prefilter
+        self.location_hints = LocationHintCache() if text_location_hints else None
+        self.location_hint_min_ratio = location_hint_min_ratio
+        self.query_recognizer = None
+        if query_aware_ocr:
+            self.query_recognizer = QueryAwareRecognizer(self.engine_ocr_handler, debug_mode=debug_mode)
+        if ocr_prefilter:
+            self.ocr_handler = TextPrefilterOCRHandler(self.ocr_handler, debug_mode=debug_mode)
+        if incremental_ocr:
+            self.ocr_handler = IncrementalOCRHandler(self.ocr_handler, debug_mode=debug_mode)
         pass
+
+    def _create_ocr_handler(self, cache, shared):
+        # Initialize OCR handler based on selected engine
+        if self.ocr_process_pool is not None:
+            # The pool is safe to use from several threads and distributes the requests over its workers
+            return self.ocr_process_pool
+        if self.ocr_engine.lower() == "remote":
+            return RemoteOCRHandler(self.languages, self.debug_mode, cache=cache, profile=self.ocr_profile,
+                                    socket_path=self.ocr_daemon_socket, engine=self.ocr_remote_engine,
+                                    fallback_factory=lambda: self._create_engine(self.ocr_remote_engine, None, shared))
+        return self._create_engine(self.ocr_engine, cache, shared)
+
+    def _create_engine(self, engine, cache, shared):
+        if shared:
+            return get_registry().acquire(engine, self.languages, self.ocr_profile, self.debug_mode, cache)
+        return create_ocr_engine(engine, self.languages, self.debug_mode, cache=cache, profile=self.ocr_profile)
+
+    def warm_up(self, wait: bool = False):
+        '''Loads the OCR models and runs a dummy recognition on a background thread. If wait is True, waits until it is finished.'''
+        if self._warm_up_thread is None:
+            def run():
+                try:
+                    self.engine_ocr_handler.warm_up()
+                except Exception as e:
+                    logger.error(f"Failed to warm up the OCR engine: {e}")
+            self._warm_up_thread = threading.Thread(target=run, name='rpalite-ocr-warm-up', daemon=True)
+            self._warm_up_thread.start()
+        if wait:
+            self._warm_up_thread.join()
+
+    @contextmanager
+    def ocr_deadline(self, timeout):
+        '''
+        Context manager limiting the OCR requests sent to the worker processes to finish within timeout seconds from now. Requests still running after the deadline raise OCRTimeoutError (a TimeoutError) and are cancelled if no worker started them yet. Without worker processes this does nothing.
+        '''
+        pool = self.ocr_process_pool
+        if pool is None:
+            yield
+            return
+        previous = pool.deadline
+        pool.deadline = time.monotonic() + timeout
+        try:
+            yield
+        finally:
+            pool.deadline = previous
+
+    def close(self):
+        '''Releases the OCR engine and stops the OCR worker threads. The OCR functions can not be used anymore afterwards.'''
+        for handler in (self.tiled_ocr_handler, self.engine_ocr_handler):
+            close = getattr(handler, 'close', None)
+            if close is not None:
+                close()
+
+    def set_ocr_profile(self, profile):
+        '''Switches the speed profile ('fast', 'balanced', 'accurate' or an OCRProfile) of the OCR engine. Returns the previous profile.'''
+        previous = self.ocr_profile
+        self.ocr_profile = get_profile(profile)
+        self.ocr_handler.set_profile(self.ocr_profile)
+        return previous
+
+    def set_display_scale(self, scale_x, scale_y):
+        '''Sets the ratio between the physical pixels of screenshots and the logical screen resolution, used by the 'auto' OCR resolution policy.'''
+        if self.scaled_ocr_handler is not None:
+            self.scaled_ocr_handler.set_display_scale(scale_x, scale_y)
+
+    def find_text_regions(self, image):
+        '''Returns the (x, y, width, height) rectangles of the probable text lines of the image, found without OCR. See text_prefilter.find_text_regions().'''
+        if image is None:
+            return None
+        snapshot = Snapshot.wrap(image)
+        return snapshot.memoize(('text_regions',), lambda: find_text_regions(snapshot.gray))
+
+    def create_text_change_detector(self):
+        '''Returns a TextChangeDetector telling polling loops whether the texts of the screen changed, or None if ocr_prefilter is disabled.'''
+        return TextChangeDetector() if self.ocr_prefilter else None
+
+    def get_ocr_cache_stats(self):
+        '''Returns the statistics (entries, bytes, hits, misses, evictions, hit_rate) of the OCR result cache, or None if the cache is disabled.'''
+        if self.ocr_cache is None:
+            return None
+        return self.ocr_cache.stats()
     
     def check_point_inide_rect(self, point, rect):  # Should probably be "inside_rect"
         '''Check if a point is in a rect. The point's coordinates are (x, y). The rect's coordinates are (x, y, width, height).'''
@@ -35,10 +201,9 @@ class ImageHandler:
         if point is None or rects is None or len(rects) == 0:
             return False
         
-        for rect in rects:
-            if self.check_point_inide_rect(point, rect):
-                return True
-        return False
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        return bool(((rects[:, 0] <= point[0]) & (rects[:, 1] <= point[1]) &
+                     (rects[:, 0] + rects[:, 2] >= point[0]) & (rects[:, 1] + rects[:, 3] >= point[1])).any())
         
     
     def find_image_location(self, image, parentImage):
@@ -46,12 +211,13 @@ class ImageHandler:
             return None
         # Find the location of the image in the parent image
         try:
+            parentImage = Snapshot.wrap(parentImage)
             if self.debug_mode:
-                cv2.imshow('shapes', np.array(parentImage)) 
+                cv2.imshow('shapes', parentImage.array) 
                 cv2.waitKey(self.debug_image_show_milliseconds)
                 cv2.destroyAllWindows()
 
-            gray = cv2.cvtColor(np.array(parentImage), cv2.COLOR_BGR2GRAY)
+            gray = parentImage.gray
             
             target = cv2.cvtColor(np.array(image), cv2.COLOR_BGR2GRAY)
             
@@ -77,12 +243,13 @@ class ImageHandler:
             return None
         # Find the location of the image in the parent image
         try:
+            parentImage = Snapshot.wrap(parentImage)
             if self.debug_mode:
-                cv2.imshow('shapes', np.array(parentImage)) 
+                cv2.imshow('shapes', parentImage.array) 
                 cv2.waitKey(self.debug_image_show_milliseconds)
                 cv2.destroyAllWindows()
 
-            gray = cv2.cvtColor(np.array(parentImage), cv2.COLOR_BGR2GRAY)
+            gray = parentImage.gray
             
             target = cv2.cvtColor(np.array(image), cv2.COLOR_BGR2GRAY)
             
@@ -108,9 +275,17 @@ class ImageHandler:
         '''
         Returns the location information, format is (top_x, top_y, width, height) of the text. This function will first iterate over the arrays, find matched text and check it is in the window. If the matched text is in the window, the function will return the text location. If no matched text found returns None.
         '''
-        for r in arrays:
-            if text in r[1] and self.check_point_inide_rects(r[0][0], windows):
-                return r[0][0]        
+        result = OcrResult.from_list(arrays)
+        if not result or windows is None or len(windows) == 0:
+            return None
+        # The texts starting inside one of the windows, taken from the index of the top left corners
+        index = result.point_index()
+        inside = set()
+        for window in windows:
+            inside.update(index.within(window).tolist())
+        for i in sorted(inside):
+            if text in result.texts[i]:
+                return result.boxes[i, 0].tolist()
         return None
     
 
@@ -131,8 +306,87 @@ class ImageHandler:
 
 
     def read_text(self, image):
+        '''
+        Returns the OCR result of the image. The image can be a PIL image or a Snapshot. For a Snapshot the result is computed only once and then reused by every later query against the same frame.
+
+        Raises OCRTimeoutError if the deadline set by ocr_deadline() is reached. Other OCR errors are logged and return None.
+        '''
+        if image is None:
+            return None
+        snapshot = Snapshot.wrap(image)
+        # A failed recognition is not kept, so the next query on the frame tries again
+        return snapshot.memoize(self._ocr_key(), lambda: OcrResult.from_list(self._read_text(snapshot)), cache_none=False)
+
+    def _ocr_key(self, *parts):
+        # The key of the OCR results of this handler on a Snapshot. It contains the engine configuration, so the results
+        # recognized before set_ocr_profile() are not returned afterwards
+        return ('ocr', id(self)) + tuple(self.engine_ocr_handler.cache_key()) + parts
+
+    def read_text_in_rect(self, image, rect):
+        '''
+        Returns the OCR result of the rect area of the image, with the coordinates of the full image. Only the rect (plus ocr_crop_padding pixels around it) is recognized, which is much faster than recognizing the full image. If the full image was already recognized, its cached result is returned instead.
+
+        The rect's coordinates are (x, y, width, height).
+        '''
+        if image is None:
+            return None
+        snapshot = Snapshot.wrap(image)
+        if rect is None or snapshot.is_cached(self._ocr_key()):
+            return self.read_text(snapshot)
+
+        width, height = snapshot.size
+        crop_rect = expand_rect(rect, self.ocr_crop_padding, width, height)
+        if crop_rect[2] == 0 or crop_rect[3] == 0:
+            return None
+        if crop_rect[2] * crop_rect[3] >= 0.8 * width * height:
+            # Cropping would not save much, recognize the full image so that the result can be shared
+            return self.read_text(snapshot)
+        return snapshot.memoize(self._ocr_key(crop_rect), lambda: self._read_text_in_crop(snapshot, crop_rect), cache_none=False)
+
+    def _read_text_in_crop(self, snapshot, crop_rect):
+        try:
+            x, y, w, h = crop_rect
+            crop = np.ascontiguousarray(snapshot.array[y:y + h, x:x + w])
+            return OcrResult.from_list(offset_result(self.ocr_handler.find_texts_in_image(crop), x, y))
+        except TimeoutError:
+            # The deadline of a waiting keyword was reached, see ocr_deadline()
+            raise
+        except Exception as e:
+            logger.error(f"Error in read_text_in_rect: {e}")
+            return None
+
+    def read_text_for_query(self, image, text, rect=None):
+        '''
+        Returns the OCR result of the text boxes of the image that may contain text, see QueryAwareRecognizer. Boxes not starting inside the (x, y, width, height) rect are ignored. The result is incomplete: use read_text() to get all the texts of the image.
+        '''
+        snapshot = Snapshot.wrap(image)
         try:
-            img_array = np.array(image)
+            boxes = snapshot.memoize(self._ocr_key('boxes'), lambda: self.engine_ocr_handler.detect_boxes(snapshot.array))
+            # The boxes recognized by all the searches in this snapshot, by box index
+            recognized = snapshot.memoize(self._ocr_key('recognized_boxes'), dict)
+            indexes = [i for i, box in enumerate(boxes) if rect is None or self.check_point_inide_rect(box[0], rect)]
+            return OcrResult.from_list(self.query_recognizer.find(snapshot.array, text, boxes, recognized, indexes))
+        except TimeoutError:
+            # The deadline of a waiting keyword was reached, see ocr_deadline()
+            raise
+        except Exception as e:
+            logger.error(f"Error in read_text_for_query: {e}")
+            return None
+
+    def _can_search_by_query(self, snapshot, filter_args_in_parent, rect):
+        if self.query_recognizer is None or filter_args_in_parent is not None:
+            return False
+        if rect is not None and not self._is_rect(rect):
+            return False
+        # A full recognition of the frame is cheaper to search than new recognitions
+        return not snapshot.is_cached(self._ocr_key()) and getattr(self.engine_ocr_handler, 'supports_detection', False)
+
+    def _is_rect(self, rect):
+        return isinstance(rect, (tuple, list)) and len(rect) == 4 and all(isinstance(v, (int, float, np.integer, np.floating)) for v in rect)
+
+    def _read_text(self, image):
+        try:
+            img_array = image.array
             
             cv_image = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)        
             gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
@@ -149,8 +403,11 @@ class ImageHandler:
             enhanced_borders = cv2.GaussianBlur(enhanced_borders, (3, 3), 0)
             img_array = cv2.addWeighted(cv_image, 0.9, enhanced_borders, 0.1, 0)
 
-            arr = self.ocr_handler.find_texts_in_image(image)
+            arr = self.ocr_handler.find_texts_in_image(image.array)
             return arr
+        except TimeoutError:
+            # The deadline of a waiting keyword was reached, see ocr_deadline()
+            raise
         except Exception as e:
             logger.error(f"Error in read_text: {e}")
             return None
@@ -159,11 +416,16 @@ class ImageHandler:
         '''
         Returns the location information list, format is ((top_x, top_y, width, height), text) of the text in the image.
         '''
+        image = Snapshot.wrap(image)
         if rects == None:
             return self.find_texts_in_image(image, text, filter_args_in_parent)
         
         if type(rects) == list and len(rects) > 0:    
-            arr = self.read_text(image)
+            if filter_args_in_parent is None and all(self._is_rect(rect) for rect in rects):
+                # Only the texts inside the rects are needed, so only the area covering them is recognized
+                arr = self.read_text_in_rect(image, union_rect(rects))
+            else:
+                arr = self.read_text(image)
             if arr is None:
                 return None
             for rect in rects:
@@ -181,27 +443,27 @@ class ImageHandler:
         '''
         if text_arr is None:
             return None
+        text_arr = OcrResult.from_list(text_arr)
+        # The parent windows of every candidate are looked up in the layout of the same frame
+        image = Snapshot.wrap(image)
             
         results = []
-        (position, target_text, best_ratio) = None, None, 0
-        for r in text_arr:  
-            ratio = SequenceMatcher(None, r[1], text).ratio()
-            if  text in r[1]: 
-                if ((rect is not None and self.check_point_inide_rect(r[0][0], rect)) or rect is None) and self.check_text_and_filter_in_window(image, text_arr, r[0], r[1], filter_args_in_parent, rect): 
-                    position = r[0]
-                    target_text = r[1]
-                    location = position[0][0], position[0][1], position[1][0]-position[0][0], position[3][1]-position[0][1]
-
-                    results.append( (location, target_text, 1))
-
-            elif ratio > best_ratio and ratio > 0.75 and ((rect is not None and self.check_point_inide_rect(r[0][0], rect)) or rect is None) and self.check_text_and_filter_in_window(image, text_arr, r[0], r[1], filter_args_in_parent, rect):
-                best_ratio = ratio
-                target_text = r[1]
-                position = r[0]
-                
-                location = position[0][0], position[0][1], position[1][0]-position[0][0], position[3][1]-position[0][1]
-
-                results.append((location, target_text, ratio))
+        best_ratio = 0
+        locations = None
+        # Only the texts containing the searched text or similar to it are visited, in the order of the OCR result
+        for i, contained, ratio in self.get_text_index(text_arr, image).search(text, 0.75):
+            if not contained and ratio <= best_ratio:
+                continue
+            r = text_arr[i]
+            if ((rect is not None and self.check_point_inide_rect(r[0][0], rect)) or rect is None) and self.check_text_and_filter_in_window(image, text_arr, r[0], r[1], filter_args_in_parent, rect):
+                if locations is None:
+                    locations = text_arr.locations()
+                location = tuple(int(v) for v in locations[i])
+                if contained:
+                    results.append((location, r[1], 1))
+                else:
+                    best_ratio = ratio
+                    results.append((location, r[1], ratio))
 
         if len(results) == 0:
             return None
@@ -209,16 +471,78 @@ class ImageHandler:
         return results
 
 
+    def get_text_index(self, text_arr, image=None):
+        '''
+        Returns the TextIndex of the texts of an OCR result. For a Snapshot the index is built only once per OCR result and reused by every later search.
+        '''
+        text_arr = OcrResult.from_list(text_arr)
+        if not isinstance(image, Snapshot):
+            return TextIndex(text_arr.texts)
+        # The OCR result is kept with its index, so its id cannot be reused by another result while the index is cached
+        arr, index = image.memoize(('text_index', id(text_arr)), lambda: (text_arr, TextIndex(text_arr.texts)))
+        if arr is not text_arr:
+            return TextIndex(text_arr.texts)
+        return index
+
     def find_texts_in_image(self, image, text, filter_args_in_parent=None, rect=None):
         '''
         Returns the location information, format is (top_x, top_y, width, height) of the text in the image.
         If the text is not found, returns None.
         '''
-        
-        arr = self.read_text(image)
+        image = Snapshot.wrap(image)
+        if self.location_hints is None or filter_args_in_parent is not None or (rect is not None and not self._is_rect(rect)):
+            return self._find_texts_in_image(image, text, filter_args_in_parent, rect)
+
+        window = tuple(rect) if rect is not None else None
+        recognized = image.is_cached(self._ocr_key())
+        if not recognized:
+            results = self._find_text_near_hint(image, text, rect, window)
+            if results is not None:
+                return results
+
+        start = time.perf_counter()
+        results = self._find_texts_in_image(image, text, None, rect)
+        if not recognized:
+            self.location_hints.record_full_search(time.perf_counter() - start)
+        if results:
+            self.location_hints.put(text, results[0][0], window)
+        else:
+            self.location_hints.invalidate(text, window)
+        return results
+
+    def _find_texts_in_image(self, image, text, filter_args_in_parent=None, rect=None):
+        if self._can_search_by_query(image, filter_args_in_parent, rect):
+            arr = self.read_text_for_query(image, text, rect)
+        elif rect is not None and filter_args_in_parent is None and self._is_rect(rect):
+            arr = self.read_text_in_rect(image, rect)
+        else:
+            # The filter texts may be anywhere in the parent windows, so the full image is needed
+            arr = self.read_text(image)
         
         return self.find_texts_in_array_and_rect(text, arr, image, filter_args_in_parent, rect)
 
+    def _find_text_near_hint(self, image, text, rect, window):
+        # Recognizes only the area around the last known position of the text. Returns None if the text is not found there with a high enough match ratio.
+        width, height = image.size
+        search_rect = self.location_hints.get_search_rect(text, width, height, window)
+        if search_rect is None:
+            return None
+        start = time.perf_counter()
+        results = self.find_texts_in_array_and_rect(text, self.read_text_in_rect(image, search_rect), image, None, search_rect)
+        if results and rect is not None:
+            results = [r for r in results if self.check_point_inide_rect(r[0][:2], rect)]
+        if results and results[0][2] >= self.location_hint_min_ratio:
+            self.location_hints.record_hit(time.perf_counter() - start)
+            self.location_hints.put(text, results[0][0], window)
+            return results
+        self.location_hints.record_miss(time.perf_counter() - start)
+        return None
+
+    def get_location_hint_stats(self):
+        '''Returns the metrics (entries, hits, misses, hit_rate, full_searches, full_search_seconds, time_saved) of the text location hints, or None if they are disabled.'''
+        if self.location_hints is None:
+            return None
+        return self.location_hints.stats()
 
     def validate_inside(self, outside, inside):
         # Check if the rectangle is inside the target rectangle. Paramete rect and target's formats are (x, y, width, height)
@@ -229,36 +553,17 @@ class ImageHandler:
             return None
             
         try:
-            img = np.array(image)
-            # converting image into grayscale image 
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) 
-          
-            # setting threshold of gray image 
-            edged = cv2.Canny(gray, 50, 200, apertureSize = 5) 
-
-            # using a findContours() function 
-            contours, _ = cv2.findContours(edged, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE) 
+            snapshot = Snapshot.wrap(image)
+            img = snapshot.array
+            # The layout of the frame is computed once and shared by every query on it
+            layout = snapshot.layout(50, 200, 5)
+            shapes, index = layout.shapes()
             
             targets = []
             approx_list = []
-           
-            # list for storing names of shapes 
-            for contour in contours: 
-                # Approximate contour to a polygon
-                perimeter = cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, 0.01 * perimeter, True)
-
-                # Calculate aspect ratio and bounding box
-                if len(approx) >= 4:
-                    x, y, w, h = cv2.boundingRect(approx)
-
-                    if(h<10 or w<10):
-                        #ignore too small shapes
-                        continue
-            
-                    if(self.validate_inside((x, y, w, h), target)):
-                        approx_list.append(approx)
-                        targets.append((x, y, w, h))
+            for i in index.containing(target):
+                approx_list.append(layout.polygons[shapes[i]])
+                targets.append(layout.polygon_rects[shapes[i]])
 
             if(targets is None or len(targets)==0):
                 return None
@@ -284,40 +589,22 @@ class ImageHandler:
             return None
             
         try:
-            img = np.array(image)
-            # converting image into grayscale image 
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) 
-          
-            # setting threshold of gray image 
-            edged = cv2.Canny(gray, 50, 200, apertureSize = 5) 
-
-            # using a findContours() function 
-            contours, _ = cv2.findContours(edged, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE) 
+            snapshot = Snapshot.wrap(image)
+            img = snapshot.array
+            # The layout of the frame is computed once and shared by every query on it
+            layout = snapshot.layout(50, 200, 5)
+            shapes, index = layout.shapes()
             
-            i = 0
             dist = 1000000
-            a = 0
             target_information = None
 
-            # list for storing names of shapes 
-            for contour in contours: 
-                # Approximate contour to a polygon
-                perimeter = cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, 0.01 * perimeter, True)
-
-                # Calculate aspect ratio and bounding box
-                if len(approx) >= 4:
-                    x, y, w, h = cv2.boundingRect(approx)
-
-                    if(h<10 or w<10):
-                        #ignore too small shapes
-                        continue
-
-                    dist1 = abs(cv2.pointPolygonTest(contour,(float(target[0]), float(target[1])),True))
-            
-                    if(self.validate_inside((x, y, w, h), target) and dist1 < dist):
-                        dist = dist1
-                        target_information = approx, (x, y, w, h)
+            # The shape around the target whose border is the closest to the top left corner of the target
+            for i in index.containing(target):
+                contour = layout.contours[shapes[i]]
+                dist1 = abs(cv2.pointPolygonTest(contour,(float(target[0]), float(target[1])),True))
+                if dist1 < dist:
+                    dist = dist1
+                    target_information = layout.polygons[shapes[i]], layout.polygon_rects[shapes[i]]
             
             if(target_information is None):
                 return None
@@ -342,20 +629,15 @@ class ImageHandler:
             return None
             
         try:
-            text_arr = self.read_text(image)
+            text_arr = OcrResult.from_list(self.read_text_in_rect(image, rect))
             if text_arr is None:
                 return None
                 
-            results = []
-            (position, target_text) = None, None
-            for r in text_arr:  
-            
-                if (rect is not None and self.check_point_inide_rect(r[0][0], rect) and self.check_point_inide_rect(r[0][2], rect)):
-                    position = r[0]
-                    target_text = r[1]
-                    location = position[0][0], position[0][1], position[1][0]-position[0][0], position[3][1]-position[0][1]
-
-                    results.append((location, target_text))
+            # The texts whose top left and bottom right corners are inside the rect
+            starts = text_arr.point_index().within(rect)
+            inside = starts[text_arr.select(starts).points_in_rect(rect, 2)]
+            locations = text_arr.locations()
+            results = [(tuple(int(v) for v in locations[i]), text_arr.texts[i]) for i in inside]
 
             if len(results) == 0:
                 return None
@@ -375,158 +657,30 @@ class ImageHandler:
             return None
             
         try:
-            img = np.array(image)
-            # converting image into grayscale image 
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) 
-          
-            # setting threshold of gray image 
-            edged = cv2.Canny(gray, 50, 150, apertureSize = 5) 
-            # using a findContours() function 
-            contours, _ = cv2.findContours(
-                edged, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE) 
+            snapshot = Snapshot.wrap(image)
+            img = snapshot.array
+            # The layout of the frame is computed once and shared by every query on it. Its candidate controls are the
+            # shapes and the horizontal lines of the frame, sorted by row
+            controls, index = snapshot.layout(50, 150, 5).controls()
             
-            i = 0
             dist = 1000000
-            a = 0
             target_information = None
-            distance_threshold = 20
-            
-            # Use HoughLinesP to detect lines in the image, adjust parameters to detect isolated horizontal lines
-            # Hough transform for line detection
-            lines = cv2.HoughLinesP(edged, 1, np.pi/180, threshold=100, 
-                                    minLineLength=50, maxLineGap=1)
-      
 
-            angle_threshold  = 10
-            horizontal_lines = []
-            other_lines = []
-            
-            if lines is not None:
-                for line in lines:
-                    x1, y1, x2, y2 = line[0]
-                    dx = x2 - x1
-                    dy = y2 - y1
-                    if dx == 0 and dy == 0:
-                        continue  # Ignore zero-length line segments
-                    
-                    # Calculate line angle (convert to 0-180 degrees)
-                    angle = math.degrees(math.atan2(dy, dx)) % 180
-                    
-                    # Classify as horizontal line segments or other line segments
-                    if (angle <= angle_threshold) or (angle >= 180 - angle_threshold):
-                        if dx > 100:
-                            horizontal_lines.append((x1, y1, x2, y2))
-                    else:
-                        other_lines.append((x1, y1, x2, y2))
-        
-            lines = horizontal_lines
-            
-           
-            # Merge lines and contours into a single array and sort
-            combined_elements = []
-            if lines is not None:
-                combined_elements.extend(('line', line) for line in lines)
-            combined_elements.extend(('contour', c) for c in contours)
-            
-            # Unified sorting logic: Sort by y-coordinate in ascending order, for same y, rectangles come first, then by x-coordinate
-            combined_elements.sort(key=lambda elem: (
-                (elem[1][1] if elem[0] == 'line' else cv2.boundingRect(elem[1])[1]),  # y-coordinate
-                1 if elem[0] == 'line' else 0,  # for same y-coordinate, rectangles come first
-                elem[1][0] if elem[0] == 'line' else cv2.boundingRect(elem[1])[0]   # x-coordinate
-            ))
-
-            # Additional processing logic
-            temp_contours = []
-            current_y = None
-            elements_to_remove = set()
-            
-            for i, elem in enumerate(combined_elements):
-                elem_type, data = elem
-                
-                # Get y-coordinate of current element
-                if elem_type == 'line':
-                    y = data[1]  # Take y1 coordinate of the line
-                else:
-                    y = cv2.boundingRect(data)[1]
-                    
-                # If it's a contour
-                if elem_type == 'contour':
-                    if current_y is None or y != current_y:
-                        # Start of a new row
-                        current_y = y
-                        temp_contours = [data]
-                    else:
-                        # Same row, add to temporary contours
-                        temp_contours.append(data)
-                        
-                # If it's a line
-                elif elem_type == 'line':
-                    if y != current_y:
-                        # Not in current row, skip
-                        elements_to_remove.add(i)
-                        continue
-                        
-                    # Check if it's contained by contours
-                    x1, y1, x2, y2 = data
-                    is_contained = False
-                    for contour in temp_contours:
-                        # Get contour boundaries
-                        x, y, w, h = cv2.boundingRect(contour)
-                        # Check if the line is inside the contour
-                        if x <= x1 and x + w >= x2 and y <= y1 and y + h >= y2:
-                            is_contained = True
-                            break
-                            
-                    if is_contained:
-                        elements_to_remove.add(i)
-                        
-            # Remove elements to exclude
-            combined_elements = [elem for i, elem in enumerate(combined_elements) if i not in elements_to_remove]
-
-            # Create image copy for display
             if self.debug_mode:
                 display_image = img.copy()
-                
-                # Draw all detected lines
-               
-                for elem in combined_elements:
-                    elem_type, data = elem
-                    
-                    # Get unified bounding box information
-                    if elem_type == 'line':
-                        # Generate rectangle area for line segments (simulate contour)
-                        x1, y1, x2, y2 = data
-                        # Draw line in red with width 1
-                        cv2.line(display_image, (x1, y1), (x2, y2), (0, 0, 255), 1)
-                
-                cv2.imshow('Lines', display_image) 
+                for approx, _ in controls:
+                    cv2.drawContours(display_image, [approx], -1, (0, 0, 255), 1)
+                cv2.imshow('Controls', display_image) 
                 cv2.waitKey(self.debug_image_show_milliseconds)
                 cv2.destroyAllWindows()
 
+            # The distance of the target's bottom corners to the rect of a control is a lower bound of their distance to
+            # its polygon, so controls that cannot beat the best distance even with the smallest weight (0.125) are skipped
+            distance_bounds = np.minimum(index.distances((target[0], target[1] + target[3])),
+                                         index.distances((target[0] + target[2], target[1] + target[3])))
 
-            for elem in combined_elements:
-                elem_type, data = elem
-                
-                # Get unified bounding box information for elements
-                if elem_type == 'line':
-                    # Generate rectangle area for line segment (simulate contour)
-                    x1, y1, x2, y2 = data
-                    x, y, w, h = x1, y1 - 15, x2 - x1, 15
-                    # Create simulated approximated contour (rectangle)
-                    approx = np.array([[[x, y]], [[x + w, y]], [[x + w, y + h]], [[x, y + h]]], dtype=np.int32)
-                else:  # contour
-                    # Original contour processing logic
-                    contour = data
-                    perimeter = cv2.arcLength(contour, True)
-                    approx = cv2.approxPolyDP(contour, 0.01 * perimeter, True)
-                
-                # Unified contour logic
-                if len(approx) >= 4 and len(approx) <= 8:
-                    x, y, w, h = cv2.boundingRect(approx)
-                else:
-                    continue
-
-                if h < 10 or w < 10:
+            for i, (approx, (x, y, w, h)) in enumerate(controls):
+                if distance_bounds[i] * 0.125 >= dist * (target_information[2] if target_information is not None else 1):
                     continue
 
                 # Unified area relationship judgment
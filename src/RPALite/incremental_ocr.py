@@ -0,0 +1,309 @@
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+import logging
+from .ocr_utils import box_to_rect, expand_rect, merge_rects, offset_result, rect_contains, rects_intersect, union_rect
+from .text_prefilter import to_gray
+from .ocr_result import OcrResult
+from .ocr_handler import OCRHandlerWrapper
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_shift(previous, current, downsample: int = 4, min_response: float = 0.2):
+    '''
+    Returns the integer (dx, dy) offset the content moved by from the previous to the current image (grayscale arrays
+    of the same size), or None if the content did not move or did not simply move.
+
+    The offset is estimated with cv2.phaseCorrelate on the images downsampled by the downsample factor, then refined to
+    the pixel on the full resolution. Offsets must be smaller than half of the image. min_response is the minimum
+    response of cv2.phaseCorrelate to accept an offset.
+    '''
+    height, width = current.shape[:2]
+    if width < 16 or height < 16:
+        return None
+    factor = max(1, int(downsample))
+    if width // factor < 16 or height // factor < 16:
+        factor = 1
+    size = (width // factor, height // factor)
+    small_previous = cv2.resize(previous, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+    small_current = cv2.resize(current, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+    window = cv2.createHanningWindow(size, cv2.CV_32F)
+    (shift_x, shift_y), response = cv2.phaseCorrelate(small_previous, small_current, window)
+    if response < min_response:
+        return None
+    coarse_x = int(round(shift_x * width / size[0]))
+    coarse_y = int(round(shift_y * height / size[1]))
+
+    # The downsampled estimate is only accurate to a few pixels, refine it on the full resolution
+    best, best_error = None, None
+    radius = factor // 2 + 1 if factor > 1 else 0
+    for dy in range(coarse_y - radius, coarse_y + radius + 1):
+        for dx in range(coarse_x - radius, coarse_x + radius + 1):
+            if abs(dx) >= width // 2 or abs(dy) >= height // 2:
+                continue
+            moved, original = overlap(previous, current, dx, dy)
+            error = cv2.mean(cv2.absdiff(moved, original))[0]
+            if best_error is None or error < best_error:
+                best, best_error = (dx, dy), error
+    if best is None or best == (0, 0):
+        return None
+    return best
+
+
+def overlap(previous, current, dx, dy):
+    '''Returns the part of the previous image still visible after its content moved by (dx, dy), and the same part of the current image.'''
+    height, width = current.shape[:2]
+    return (previous[max(0, -dy):height - max(0, dy), max(0, -dx):width - max(0, dx)],
+            current[max(0, dy):height - max(0, -dy), max(0, dx):width - max(0, -dx)])
+
+
+class IncrementalOCRHandler(OCRHandlerWrapper):
+    '''
+    Wraps an OCR handler and only recognizes the parts of the screen that changed since the previous frame.
+
+    The new frame is compared with the previous frame of the same size on a grid of tiles. Tiles with changed pixels
+    are grouped into regions, each region is grown by a margin and recognized on its own. The new boxes are merged
+    into the previous result, replacing the previous boxes that intersect a changed region. If most of the frame
+    changed, the whole frame is recognized as usual.
+
+    When a window is dragged or a list is scrolled, the content of a changed region moved by a constant offset. With
+    motion_compensation the offset of each changed region is estimated with cv2.phaseCorrelate on a downsampled image,
+    the previous boxes of the region are moved by the offset, and the comparison is done against the moved previous
+    frame. Only the newly exposed strip (and whatever else really changed) is recognized again.
+    '''
+
+    def __init__(self, ocr_handler, tile_size: int = 64, margin: int = 16, pixel_threshold: int = 16,
+                 max_dirty_ratio: float = 0.5, max_frames: int = 4, motion_compensation: bool = True,
+                 motion_downsample: int = 4, min_motion_response: float = 0.2, debug_mode: bool = False):
+        '''
+        Parameters
+        ----------
+        ocr_handler : OCRHandler
+            The handler used to recognize full frames and changed regions.
+
+        tile_size : int
+            Width and height in pixels of the tiles the frames are compared on.
+
+        margin : int
+            Pixels added around each changed region before it is recognized, so that texts crossing the border of a
+            changed tile are recognized completely.
+
+        pixel_threshold : int
+            Minimum difference of a pixel value to consider the pixel as changed. This ignores compression noise.
+
+        max_dirty_ratio : float
+            If a larger share of the tiles changed, the full frame is recognized instead.
+
+        max_frames : int
+            Number of previous frames (of different sizes) remembered.
+
+        motion_compensation : bool
+            Whether to reuse the previous boxes of regions whose content moved, see above.
+
+        motion_downsample : int
+            Factor the regions are downsampled by to estimate their offset.
+
+        min_motion_response : float
+            Minimum response of cv2.phaseCorrelate to accept an offset. Lower responses mean the content did not
+            simply move.
+        '''
+        super().__init__(ocr_handler, debug_mode)
+        self.tile_size = tile_size
+        self.margin = margin
+        self.pixel_threshold = pixel_threshold
+        self.max_dirty_ratio = max_dirty_ratio
+        self.max_frames = max_frames
+        self.motion_compensation = motion_compensation
+        self.motion_downsample = max(1, int(motion_downsample))
+        self.min_motion_response = min_motion_response
+        # Previous (frame, result) pairs keyed by frame shape
+        self._previous = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        '''Forgets the previous frames, so that the next frame is recognized completely.'''
+        with self._lock:
+            self._previous.clear()
+
+    def find_texts_in_image(self, image):
+        if isinstance(image, np.ndarray):
+            img_array = image
+        else:
+            img_array = np.array(image)
+
+        with self._lock:
+            previous = self._previous.get(img_array.shape)
+
+        if previous is None:
+            result, frame = self.ocr_handler.find_texts_in_image(img_array), img_array
+        else:
+            result, frame = self._recognize_changes(img_array, previous[0], previous[1])
+
+        if result is not None:
+            with self._lock:
+                self._previous[img_array.shape] = (img_array.copy() if frame is img_array else frame, result)
+                self._previous.move_to_end(img_array.shape)
+                while len(self._previous) > self.max_frames:
+                    self._previous.popitem(last=False)
+        return result
+
+    def find_dirty_tiles(self, previous, current):
+        '''Returns a boolean grid with one value per tile, True if the tile changed between the two frames.'''
+        diff = cv2.absdiff(previous, current)
+        if diff.ndim == 3:
+            diff = diff.max(axis=2)
+        height, width = diff.shape
+        rows = -(-height // self.tile_size)
+        cols = -(-width // self.tile_size)
+        padded = np.zeros((rows * self.tile_size, cols * self.tile_size), dtype=diff.dtype)
+        padded[:height, :width] = diff
+        tiles = padded.reshape(rows, self.tile_size, cols, self.tile_size).max(axis=(1, 3))
+        return tiles > self.pixel_threshold
+
+    def find_dirty_regions(self, dirty_tiles, width, height, previous_result=None):
+        '''Groups the changed tiles into non overlapping (x, y, width, height) regions, grown by the margin.'''
+        count, _, stats, _ = cv2.connectedComponentsWithStats(dirty_tiles.astype(np.uint8), connectivity=8)
+        regions = []
+        for i in range(1, count):
+            col, row, cols, rows = stats[i][:4]
+            rect = (col * self.tile_size, row * self.tile_size, cols * self.tile_size, rows * self.tile_size)
+            regions.append(expand_rect(rect, self.margin, width, height))
+        regions = merge_rects(regions)
+
+        # Grow the regions to fully contain the previous texts they cut through, so those texts are recognized again
+        # completely instead of being dropped or split
+        if previous_result:
+            grown = True
+            while grown:
+                grown = False
+                for box, _, _ in previous_result:
+                    box_rect = expand_rect(box_to_rect(box), 1, width, height)
+                    for i, region in enumerate(regions):
+                        if rects_intersect(region, box_rect) and not rect_contains(region, box_rect):
+                            regions[i] = union_rect([region, box_rect])
+                            grown = True
+                regions = merge_rects(regions)
+        return regions
+
+    def estimate_shift(self, previous, current):
+        '''Returns the (dx, dy) offset the content moved by between two grayscale images, see estimate_shift().'''
+        return estimate_shift(previous, current, self.motion_downsample, self.min_motion_response)
+
+    def compensate_motion(self, img_array, previous_frame, previous_result, dirty_tiles):
+        '''
+        Estimates the offset of the content of each changed region. Returns the previous frame and result with the
+        moved content and boxes moved, and the (x, y, width, height) rects that must be recognized again because their
+        content was not visible before: (frame, result, exposed_rects). Returns None if no content moved.
+        '''
+        height, width = img_array.shape[:2]
+        previous_gray = to_gray(previous_frame)
+        current_gray = to_gray(img_array)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(dirty_tiles.astype(np.uint8), connectivity=8)
+        frame = None
+        result = list(previous_result)
+        exposed = []
+        for i in range(1, count):
+            col, row, cols, rows = (int(v) for v in stats[i][:4])
+            x, y = col * self.tile_size, row * self.tile_size
+            w, h = min(cols * self.tile_size, width - x), min(rows * self.tile_size, height - y)
+            # Shrink the region from the tile grid to the changed pixels, so that static content around is not moved
+            changed = cv2.absdiff(previous_gray[y:y + h, x:x + w], current_gray[y:y + h, x:x + w]) > self.pixel_threshold
+            changed_rows = np.flatnonzero(changed.any(axis=1))
+            changed_cols = np.flatnonzero(changed.any(axis=0))
+            if len(changed_rows) == 0:
+                continue
+            x, y = x + int(changed_cols[0]), y + int(changed_rows[0])
+            w, h = int(changed_cols[-1] - changed_cols[0]) + 1, int(changed_rows[-1] - changed_rows[0]) + 1
+            shift = self.estimate_shift(previous_gray[y:y + h, x:x + w], current_gray[y:y + h, x:x + w])
+            if shift is None:
+                continue
+            dx, dy = shift
+            if self.debug_mode:
+                logger.debug(f"Content of region {(x, y, w, h)} moved by {shift}")
+            if frame is None:
+                frame = previous_frame.copy()
+            moved, _ = overlap(previous_frame[y:y + h, x:x + w], img_array[y:y + h, x:x + w], dx, dy)
+            frame[y + max(0, dy):y + h - max(0, -dy), x + max(0, dx):x + w - max(0, -dx)] = moved
+
+            # The strips the content moved away from show content that was not visible before
+            if dy > 0:
+                exposed.append((x, y, w, dy))
+            elif dy < 0:
+                exposed.append((x, y + h + dy, w, -dy))
+            if dx > 0:
+                exposed.append((x, y, dx, h))
+            elif dx < 0:
+                exposed.append((x + w + dx, y, -dx, h))
+
+            region = (x, y, w, h)
+            visible = (x + max(0, dx), y + max(0, dy), w - abs(dx), h - abs(dy))
+            kept = []
+            for box, text, confidence in result:
+                box_rect = box_to_rect(box)
+                if not rects_intersect(box_rect, region):
+                    kept.append((box, text, confidence))
+                    continue
+                moved_rect = (box_rect[0] + dx, box_rect[1] + dy, box_rect[2], box_rect[3])
+                if not rect_contains(region, box_rect):
+                    # Texts crossing the border of the region may have only partly moved, recognize them again
+                    exposed.append(expand_rect(box_rect, 0, width, height))
+                    exposed.append(expand_rect(moved_rect, 0, width, height))
+                elif rect_contains(visible, moved_rect):
+                    kept.append(([[p[0] + dx, p[1] + dy] for p in box], text, confidence))
+                elif rects_intersect(visible, moved_rect):
+                    # The part of a text still visible at the border of the region is recognized again
+                    exposed.append(expand_rect(moved_rect, 0, width, height))
+            result = kept
+        if frame is None:
+            return None
+        return frame, result, [r for r in exposed if r[2] > 0 and r[3] > 0]
+
+    def _mark_dirty(self, dirty_tiles, rects):
+        for x, y, w, h in rects:
+            dirty_tiles[y // self.tile_size:-(-(y + h) // self.tile_size), x // self.tile_size:-(-(x + w) // self.tile_size)] = True
+        return dirty_tiles
+
+    def _recognize_changes(self, img_array, previous_frame, previous_result):
+        # Returns the result and the frame it is stored with. The frame keeps the previous pixels of the regions whose
+        # recognition failed, so that they are still dirty and recognized again on the next call.
+        height, width = img_array.shape[:2]
+        dirty_tiles = self.find_dirty_tiles(previous_frame, img_array)
+        if not dirty_tiles.any():
+            return list(previous_result), img_array
+        if self.motion_compensation:
+            compensated = self.compensate_motion(img_array, previous_frame, previous_result, dirty_tiles)
+            if compensated is not None:
+                previous_frame, previous_result, exposed = compensated
+                dirty_tiles = self._mark_dirty(self.find_dirty_tiles(previous_frame, img_array), exposed)
+                if not dirty_tiles.any():
+                    return list(previous_result), img_array
+        if dirty_tiles.mean() > self.max_dirty_ratio:
+            return self.ocr_handler.find_texts_in_image(img_array), img_array
+
+        regions = self.find_dirty_regions(dirty_tiles, width, height, previous_result)
+        if sum(r[2] * r[3] for r in regions) > self.max_dirty_ratio * width * height:
+            return self.ocr_handler.find_texts_in_image(img_array), img_array
+
+        if self.debug_mode:
+            logger.debug(f"Incremental OCR on {len(regions)} changed regions: {regions}")
+
+        result = [r for r in previous_result
+                  if not any(rects_intersect(box_to_rect(r[0]), region) for region in regions)]
+        frame = img_array
+        for x, y, w, h in regions:
+            if w == 0 or h == 0:
+                continue
+            crop = np.ascontiguousarray(img_array[y:y + h, x:x + w])
+            region_result = self.ocr_handler.find_texts_in_image(crop)
+            if region_result is None:
+                # The engine failed, the texts of the region are missing from this result
+                logger.debug(f"OCR of changed region {(x, y, w, h)} failed, it will be recognized again")
+                if frame is img_array:
+                    frame = img_array.copy()
+                frame[y:y + h, x:x + w] = previous_frame[y:y + h, x:x + w]
+            elif region_result:
+                result.extend(offset_result(region_result, x, y))
+        # Keep the reading order of a full frame recognition: top to bottom, then left to right
+        return OcrResult.from_list(result).sorted(), frame
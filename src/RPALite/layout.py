@@ -0,0 +1,157 @@
+import math
+import cv2
+import numpy as np
+from .spatial_index import SpatialIndex
+
+
+class FrameLayout:
+    '''
+    The layout analysis of one frame for one set of Canny thresholds: the edges, the contour hierarchy, the polygons
+    approximating the contours with their bounding rects, and the horizontal lines found by the Hough transform.
+
+    The window and control locators of ImageHandler only differ in how they filter and score these shapes, so the
+    analysis is done once per frame and shared by all of them. Get it with Snapshot.layout(), which caches it on the
+    snapshot, and every part of it is computed the first time it is needed.
+    '''
+
+    def __init__(self, snapshot, threshold1=50, threshold2=200, aperture_size=5):
+        '''
+        Parameters
+        ----------
+        snapshot : Snapshot
+            The analysed frame.
+
+        threshold1, threshold2, aperture_size :
+            The parameters of the Canny edge detection.
+        '''
+        self.snapshot = snapshot
+        self._params = (threshold1, threshold2, aperture_size)
+
+    def _memoize(self, name, factory):
+        # The parts are cached on the snapshot, so they share its lock and are dropped by Snapshot.clear_cache()
+        return self.snapshot.memoize(('layout',) + self._params + (name,), factory)
+
+    @property
+    def edges(self):
+        '''The Canny edges of the frame.'''
+        return self.snapshot.edges(*self._params)
+
+    @property
+    def contours(self):
+        '''The contours found on the edges.'''
+        return self.snapshot.contours(*self._params)[0]
+
+    @property
+    def hierarchy(self):
+        '''The hierarchy of the contours, as returned by cv2.findContours() with cv2.RETR_TREE.'''
+        return self.snapshot.contours(*self._params)[1]
+
+    @property
+    def polygons(self):
+        '''The polygons approximating the contours with cv2.approxPolyDP(), with a precision of 1% of their perimeter.'''
+        return self._memoize('polygons', lambda: [cv2.approxPolyDP(contour, 0.01 * cv2.arcLength(contour, True), True)
+                                                  for contour in self.contours])
+
+    @property
+    def polygon_rects(self):
+        '''The (x, y, width, height) bounding rects of the polygons.'''
+        return self._memoize('polygon_rects', lambda: [cv2.boundingRect(approx) for approx in self.polygons])
+
+    @property
+    def contour_rects(self):
+        '''The (x, y, width, height) bounding rects of the contours.'''
+        return self._memoize('contour_rects', lambda: [cv2.boundingRect(contour) for contour in self.contours])
+
+    def shapes(self, min_vertices: int = 4, max_vertices: int = None, min_size: int = 10):
+        '''
+        Returns the (indexes, index) tuple of the shapes whose polygon has at least min_vertices vertices (and at most
+        max_vertices) and whose rect is at least min_size pixels wide and high. indexes are the indexes of the contours
+        of these shapes, and index is the SpatialIndex of their polygon rects.
+        '''
+        def find():
+            rects = self.polygon_rects
+            indexes = [i for i, approx in enumerate(self.polygons)
+                       if len(approx) >= min_vertices and (max_vertices is None or len(approx) <= max_vertices)
+                       and rects[i][2] >= min_size and rects[i][3] >= min_size]
+            return indexes, SpatialIndex([rects[i] for i in indexes])
+
+        return self._memoize(('shapes', min_vertices, max_vertices, min_size), find)
+
+    def horizontal_lines(self, min_length: int = 100, angle_threshold: float = 10):
+        '''
+        Returns the (x1, y1, x2, y2) line segments found by cv2.HoughLinesP() on the edges whose angle with the
+        horizontal is at most angle_threshold degrees and which are more than min_length pixels wide, from left to right.
+        '''
+        def find():
+            lines = cv2.HoughLinesP(self.edges, 1, np.pi/180, threshold=100, minLineLength=50, maxLineGap=1)
+            if lines is None:
+                return []
+            horizontal_lines = []
+            # Depending on the OpenCV version the lines are returned as an (N, 1, 4) or an (N, 4) array
+            for x1, y1, x2, y2 in np.asarray(lines).reshape(-1, 4).tolist():
+                dx = x2 - x1
+                dy = y2 - y1
+                if dx == 0 and dy == 0:
+                    continue  # Ignore zero-length line segments
+                # Calculate line angle (convert to 0-180 degrees)
+                angle = math.degrees(math.atan2(dy, dx)) % 180
+                if ((angle <= angle_threshold) or (angle >= 180 - angle_threshold)) and dx > min_length:
+                    horizontal_lines.append((x1, y1, x2, y2))
+            return horizontal_lines
+
+        return self._memoize(('horizontal_lines', min_length, angle_threshold), find)
+
+    def controls(self):
+        '''
+        Returns the (controls, index) tuple of the candidate controls of the frame: the shapes of 4 to 8 vertices and the
+        horizontal lines (the underlined input fields), the lines drawn by a shape of the same row being dropped.
+
+        controls is the list of their (polygon, rect) tuples, sorted by row then from left to right with the shapes before
+        the lines of the same row. The polygon of a line is the 15 pixels high rect above it. index is the SpatialIndex of
+        the rects.
+        '''
+        return self._memoize('controls', self._find_controls)
+
+    def _find_controls(self):
+        # Merge lines and contours into a single list and sort it by y-coordinate, for the same y rectangles come first,
+        # then by x-coordinate
+        contour_rects = self.contour_rects
+        elements = [(line[1], 1, line[0], 'line', line) for line in self.horizontal_lines()]
+        elements.extend((rect[1], 0, rect[0], 'contour', i) for i, rect in enumerate(contour_rects))
+        elements.sort(key=lambda elem: elem[:3])
+
+        # Drop the lines contained by a contour starting on the same row, and the lines not on the row of a contour
+        temp_rects = []
+        current_y = None
+        kept = []
+        for y, _, _, elem_type, data in elements:
+            if elem_type == 'contour':
+                if current_y is None or y != current_y:
+                    # Start of a new row
+                    current_y = y
+                    temp_rects = [contour_rects[data]]
+                else:
+                    temp_rects.append(contour_rects[data])
+            else:
+                if y != current_y:
+                    continue
+                x1, y1, x2, y2 = data
+                if any(x <= x1 and x + w >= x2 and y <= y1 and y + h >= y2 for x, y, w, h in temp_rects):
+                    continue
+            kept.append((elem_type, data))
+
+        polygons = self.polygons
+        polygon_rects = self.polygon_rects
+        controls = []
+        for elem_type, data in kept:
+            if elem_type == 'line':
+                # Generate a rectangle area for the line segment (simulate a contour)
+                x1, y1, x2, y2 = data
+                x, y, w, h = x1, y1 - 15, x2 - x1, 15
+                approx = np.array([[[x, y]], [[x + w, y]], [[x + w, y + h]], [[x, y + h]]], dtype=np.int32)
+                rect = cv2.boundingRect(approx)
+            else:
+                approx, rect = polygons[data], polygon_rects[data]
+            if 4 <= len(approx) <= 8 and rect[2] >= 10 and rect[3] >= 10:
+                controls.append((approx, rect))
+        return controls, SpatialIndex([rect for _, rect in controls])
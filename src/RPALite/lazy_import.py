@@ -0,0 +1,56 @@
+import importlib
+
+
+class LazyImport:
+    '''
+    A placeholder for a module, or for an attribute of a module, that imports it on first use.
+
+    Modules like cv2, numpy, pyautogui or the platform automation libraries take a noticeable time to import, and many
+    scripts only use a few RPALite functions. Assigning a LazyImport to the module level name that the import statement
+    would define keeps the code using the name unchanged: accessing an attribute or calling it imports the module.
+    '''
+
+    def __init__(self, module_name: str, attribute: str = None, package: str = None):
+        '''
+        Parameters
+        ----------
+        module_name : str
+            The name of the module, for example 'cv2' or '.image_handler' together with package.
+
+        attribute : str
+            If it is not None, the placeholder stands for this attribute of the module instead of the module.
+
+        package : str
+            The package relative module names are resolved against.
+        '''
+        self._module_name = module_name
+        self._attribute = attribute
+        self._package = package
+        self._target = None
+
+    def _resolve(self):
+        if self._target is None:
+            target = importlib.import_module(self._module_name, self._package)
+            if self._attribute is not None:
+                target = getattr(target, self._attribute)
+            self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        if name.startswith('__') and name.endswith('__'):
+            # Do not import for special attributes probed by tools like copy, pickle or inspect
+            raise AttributeError(name)
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        name = self._module_name if self._attribute is None else f"{self._module_name}.{self._attribute}"
+        state = 'imported' if self._target is not None else 'not imported'
+        return f"<LazyImport {name} ({state})>"
+
+
+def lazy_import(module_name: str, attribute: str = None, package: str = None):
+    '''Returns a LazyImport placeholder for the module module_name, or for its attribute if attribute is given.'''
+    return LazyImport(module_name, attribute, package)
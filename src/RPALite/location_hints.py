@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+
+
+class LocationHintCache:
+    '''
+    Remembers where each searched text was last found, so that the next search of the same text can recognize only a
+    small area around that position before falling back to the full screen.
+
+    Hints are keyed by the searched text and an optional window (any hashable value, like the rect the search was
+    limited to). The cache also keeps the metrics of the hinted searches: hits, misses and the estimated time saved,
+    which is the average duration of a full search minus the duration of the hinted search. Misses count as negative
+    savings because the full search still has to run.
+    '''
+
+    def __init__(self, max_entries: int = 256, padding: int = 48):
+        '''
+        Parameters
+        ----------
+        max_entries : int
+            Maximum number of remembered hints. The least recently used hints are dropped first.
+
+        padding : int
+            Pixels added around the last known position of a text to get the area recognized first.
+        '''
+        self.max_entries = max_entries
+        self.padding = padding
+        self.hits = 0
+        self.misses = 0
+        self.full_searches = 0
+        self.time_saved = 0.0
+        self._full_search_seconds = None
+        self._hints = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text, window=None):
+        '''Returns the (x, y, width, height) rect where text was last found, or None.'''
+        with self._lock:
+            rect = self._hints.get((text, window))
+            if rect is not None:
+                self._hints.move_to_end((text, window))
+            return rect
+
+    def get_search_rect(self, text, width, height, window=None):
+        '''Returns the rect around the last known position of text to recognize first, clipped to an image of width x height, or None.'''
+        rect = self.get(text, window)
+        if rect is None:
+            return None
+        # Texts usually move by less than a line height, but taller texts may move further
+        padding = max(self.padding, 2 * int(rect[3]))
+        left = max(0, int(rect[0]) - padding)
+        top = max(0, int(rect[1]) - padding)
+        right = min(width, int(rect[0] + rect[2]) + padding)
+        bottom = min(height, int(rect[1] + rect[3]) + padding)
+        if right <= left or bottom <= top:
+            return None
+        return left, top, right - left, bottom - top
+
+    def put(self, text, rect, window=None):
+        '''Remembers that text was found at the (x, y, width, height) rect.'''
+        with self._lock:
+            self._hints[(text, window)] = tuple(int(v) for v in rect[:4])
+            self._hints.move_to_end((text, window))
+            while len(self._hints) > self.max_entries:
+                self._hints.popitem(last=False)
+
+    def invalidate(self, text=None, window=None):
+        '''Forgets the hint of text, or all the hints if text is None.'''
+        with self._lock:
+            if text is None:
+                self._hints.clear()
+            else:
+                self._hints.pop((text, window), None)
+
+    def record_hit(self, seconds):
+        '''Records a hinted search that found the text in seconds.'''
+        with self._lock:
+            self.hits += 1
+            if self._full_search_seconds is not None:
+                self.time_saved += self._full_search_seconds - seconds
+
+    def record_miss(self, seconds):
+        '''Records a hinted search that did not find the text in seconds, so a full search followed.'''
+        with self._lock:
+            self.misses += 1
+            self.time_saved -= seconds
+
+    def record_full_search(self, seconds):
+        '''Records the duration of a full search, used to estimate the time saved by the hits.'''
+        with self._lock:
+            self.full_searches += 1
+            if self._full_search_seconds is None:
+                self._full_search_seconds = seconds
+            else:
+                # Moving average, so that the estimate follows changes of the OCR settings
+                self._full_search_seconds = 0.8 * self._full_search_seconds + 0.2 * seconds
+
+    def __len__(self):
+        with self._lock:
+            return len(self._hints)
+
+    def stats(self):
+        '''Returns a dict with the entries, hits, misses, hit_rate, full_searches, average full search seconds and estimated time_saved seconds.'''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._hints),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+                'full_searches': self.full_searches,
+                'full_search_seconds': self._full_search_seconds,
+                'time_saved': self.time_saved,
+            }
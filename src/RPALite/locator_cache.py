@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict
+import cv2
+import numpy as np
+import logging
+from .snapshot import Snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    def __init__(self, patches, value, created):
+        # (x, y, width, height) rect and grayscale pixels of each verified patch
+        self.patches = patches
+        self.value = value
+        self.created = created
+
+
+class LocatorCache:
+    '''
+    Caches the results of locator lookups (texts, labels, images) together with the pixels under the located rects.
+
+    Finding a text with OCR takes seconds. Checking that the same pixels are still at the same place of a new screenshot
+    with cv2.matchTemplate takes microseconds. get() returns the cached result only if every stored patch still matches
+    the new frame with a similarity of at least threshold, and the entry is younger than ttl seconds. Entries that do
+    not match anymore are dropped, so the next lookup runs the full search again.
+    '''
+
+    def __init__(self, threshold: float = 0.95, ttl: float = 60, context: int = 4, max_entries: int = 256):
+        '''
+        Parameters
+        ----------
+        threshold : float
+            Minimum normalized correlation between a stored patch and the same area of the new frame.
+
+        ttl : float
+            Seconds a cached result is used. None or 0 keeps results until they do not match anymore.
+
+        context : int
+            Pixels around each located rect stored with the patch, so that changes just around the text (like a
+            different text next to a label) are detected too.
+
+        max_entries : int
+            Maximum number of cached results. The least recently used results are dropped first.
+        '''
+        self.threshold = threshold
+        self.ttl = ttl
+        self.context = context
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.mismatches = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _patch_rect(self, rect, width, height):
+        left = max(0, int(rect[0]) - self.context)
+        top = max(0, int(rect[1]) - self.context)
+        right = min(width, int(rect[0] + rect[2]) + self.context)
+        bottom = min(height, int(rect[1] + rect[3]) + self.context)
+        if right <= left or bottom <= top:
+            return None
+        return left, top, right - left, bottom - top
+
+    def put(self, key, image, rects, value):
+        '''
+        Caches value under key, with the pixels of image under each (x, y, width, height) rect of rects.
+
+        Parameters
+        ----------
+        key : hashable
+            The lookup, for example ('text', text, options...).
+
+        image : PIL.Image or Snapshot
+            The frame the value was found in.
+
+        rects : list
+            The rects to verify on later lookups.
+
+        value : object
+            The result of the lookup.
+        '''
+        snapshot = Snapshot.wrap(image)
+        gray = snapshot.gray
+        height, width = gray.shape[:2]
+        patches = []
+        for rect in rects:
+            patch_rect = self._patch_rect(rect, width, height)
+            if patch_rect is None:
+                return
+            x, y, w, h = patch_rect
+            patches.append((patch_rect, gray[y:y + h, x:x + w].copy()))
+        if not patches:
+            return
+        with self._lock:
+            self._entries[key] = _Entry(patches, value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key, image):
+        '''Returns the value cached under key if its patches still match image, otherwise None.'''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.ttl and time.monotonic() - entry.created > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+        gray = Snapshot.wrap(image).gray
+        matched = all(self.patch_matches(gray, patch_rect, patch) for patch_rect, patch in entry.patches)
+        with self._lock:
+            if not matched:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                self.mismatches += 1
+                self.misses += 1
+                return None
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return entry.value
+
+    def patch_matches(self, gray, patch_rect, patch):
+        '''Returns True if the area patch_rect of the grayscale frame matches the stored patch.'''
+        x, y, w, h = patch_rect
+        if gray.shape[0] < y + h or gray.shape[1] < x + w:
+            return False
+        area = gray[y:y + h, x:x + w]
+        if patch.std() < 1:
+            # The correlation of a flat patch is undefined
+            return float(cv2.absdiff(area, patch).mean()) < 2
+        score = cv2.matchTemplate(area, patch, cv2.TM_CCOEFF_NORMED)[0][0]
+        return bool(np.isfinite(score)) and score >= self.threshold
+
+    def invalidate(self, key=None):
+        '''Drops the result cached under key, or all the results if key is None.'''
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        '''Returns a dict with the entries, hits, misses, mismatches, expirations and hit_rate of the cache.'''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'mismatches': self.mismatches,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+            }
@@ -0,0 +1,134 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import logging
+from .ocr_result import OcrResult
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    '''
+    An in-memory LRU cache for OCR results, keyed by a hash of the frame content.
+
+    Polling keywords like wait_until_text_shown recognize the screen again and again. When nothing changed on the
+    screen, the pixels - and therefore the OCR result - are identical, so the result can be served from this cache
+    instead of running the OCR engine again.
+
+    The cache is bounded both by the number of entries and by the estimated memory used by the stored results. When
+    either budget is exceeded, the least recently used entries are evicted. The cache is thread safe.
+
+    An optional backend (like PersistentOCRCache) is consulted on misses and receives every stored result, so that
+    results survive the process.
+    '''
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 8 * 1024 * 1024, backend=None):
+        '''
+        Parameters
+        ----------
+        max_entries : int
+            Maximum number of OCR results kept in the cache.
+
+        max_bytes : int
+            Maximum estimated memory in bytes used by the cached results.
+
+        backend : PersistentOCRCache
+            Optional second level cache with the same get/put interface.
+        '''
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_frame(img_array):
+        '''Returns a hex digest identifying the content (pixels, shape and dtype) of a numpy image array.'''
+        img_array = np.ascontiguousarray(img_array)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{img_array.shape}{img_array.dtype}".encode())
+        digest.update(img_array.data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def estimate_size(result):
+        '''Returns a rough estimation of the memory in bytes used by an OCR result list.'''
+        if result is None:
+            return 0
+        if isinstance(result, OcrResult):
+            return 64 + result.nbytes
+        # Each entry holds 4 points, a string and a confidence value. 200 bytes covers the tuples, lists and numbers.
+        return 64 + sum(200 + len(r[1]) * 4 for r in result)
+
+    def get(self, key):
+        '''Returns the cached result for key, or None if there is no cached result.'''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # The columns of an OcrResult are not modified by its users
+                return entry[0]
+            self.misses += 1
+        if self.backend is None:
+            return None
+        result = OcrResult.from_list(self.backend.get(key))
+        if result is not None:
+            self._put_in_memory(key, result)
+        return result
+
+    def put(self, key, result):
+        '''Stores result under key, evicting least recently used entries if the budgets are exceeded.'''
+        if result is None:
+            return
+        if self.backend is not None:
+            self.backend.put(key, result)
+        self._put_in_memory(key, result)
+
+    def _put_in_memory(self, key, result):
+        if self.max_entries <= 0:
+            return
+        # The result is kept as an OcrResult, so the budget counts what is really held and hits need no conversion
+        result = OcrResult.from_list(result)
+        size = self.estimate_size(result)
+        if size > self.max_bytes:
+            logger.debug(f"OCR result of {size} bytes exceeds the cache budget and is not cached")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        '''Removes all cached results. The hit and miss counters are kept.'''
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        '''Returns a dict with the entries, bytes, hits, misses, evictions and hit_rate of the cache, and the statistics of the backend under 'persistent'.'''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+                **({'persistent': self.backend.stats()} if self.backend is not None else {}),
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,325 @@
+'''
+rpalite-ocrd: a local OCR daemon holding the OCR models once for all the RPALite processes of a host.
+
+Many Robot Framework processes running in parallel (for example with pabot) would otherwise each load their own OCR
+model. The daemon listens on a Unix domain socket and serves find_texts_in_image requests of ImageHandler instances
+created with ocr_engine="remote" (see RemoteOCRHandler). Requests arriving at about the same time are recognized as one
+batch, and identical frames sent by several processes are recognized once.
+
+Usage:
+    rpalite-ocrd [--socket PATH] [--engine paddleocr|easyocr] [--languages en ch_sim] [--profile balanced]
+                 [--max-batch 8] [--batch-wait-ms 10] [--cache-size 64] [--preload] [--debug]
+
+Protocol: every message is a 8 byte header with the lengths of a JSON object and of a binary payload, followed by
+both. A request is {"op": "ocr", "engine", "languages", "profile", "shape", "dtype"} with the raw frame as payload (the
+profile is a name or a dict of OCRProfile fields), or
+{"op": "ping"}. An OCR response is {"status": "ok", "count", "box_dtype", "texts"} with the boxes and confidences
+arrays as payload (see pack_result()), or {"status": "error", "message"}.
+'''
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from .ocr_cache import OCRResultCache
+from .ocr_process_pool import pack_result, unpack_result
+from .ocr_profile import OCRProfile, get_profile
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct('!II')
+
+
+def default_socket_path():
+    '''Returns the socket path from the RPALITE_OCRD_SOCKET environment variable, or a per user path in the temp directory.'''
+    path = os.environ.get('RPALITE_OCRD_SOCKET')
+    if path:
+        return path
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return os.path.join(tempfile.gettempdir(), f'rpalite-ocrd-{user}.sock')
+
+
+def send_message(sock, header, payload=b''):
+    '''Sends a JSON header and a binary payload.'''
+    data = json.dumps(header).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(data), len(payload)) + data)
+    if payload:
+        sock.sendall(payload)
+
+
+def _receive_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError('Connection closed')
+        received += count
+    return buffer
+
+
+def receive_message(sock):
+    '''Receives a message sent by send_message() and returns its (header, payload).'''
+    header_size, payload_size = _HEADER.unpack(_receive_exactly(sock, _HEADER.size))
+    header = json.loads(bytes(_receive_exactly(sock, header_size)).decode('utf-8'))
+    return header, _receive_exactly(sock, payload_size)
+
+
+def encode_result(result):
+    '''Returns the (header, payload) of an OCR response for result.'''
+    packed = pack_result(result)
+    if packed is None:
+        return {'status': 'ok', 'count': 0}, b''
+    boxes, confidences, texts = packed
+    return ({'status': 'ok', 'count': len(texts), 'box_dtype': boxes.dtype.str, 'texts': texts},
+            boxes.tobytes() + confidences.tobytes())
+
+
+def decode_result(header, payload):
+    '''Returns the OCR result of a response created by encode_result().'''
+    count = header['count']
+    if count == 0:
+        return None
+    box_dtype = np.dtype(header['box_dtype'])
+    boxes_size = count * 8 * box_dtype.itemsize
+    boxes = np.frombuffer(payload, dtype=box_dtype, count=count * 8).reshape(count, 4, 2)
+    confidences = np.frombuffer(payload, dtype=np.float32, count=count, offset=boxes_size)
+    return unpack_result((boxes, confidences, header['texts']))
+
+
+class _Request:
+    def __init__(self, key, frame):
+        self.key = key
+        self.frame = frame
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class OCRDaemon:
+    '''
+    Serves OCR requests over a Unix domain socket. One thread per connection reads the requests and a single batching
+    thread recognizes them: it waits up to batch_wait seconds for more requests after the first one and recognizes up
+    to max_batch requests with the same engine configuration together (see OCRHandler.find_texts_in_images()).
+    '''
+
+    def __init__(self, socket_path=None, engine: str = 'paddleocr', languages=['en'], profile=None,
+                 max_batch: int = 8, batch_wait: float = 0.01, cache_size: int = 64, debug_mode: bool = False,
+                 engine_factory=None):
+        '''
+        Parameters
+        ----------
+        socket_path : str
+            Path of the Unix domain socket. None uses default_socket_path().
+
+        engine, languages, profile :
+            The engine configuration loaded by preload(). Clients may request other configurations, which are loaded
+            on their first request.
+
+        max_batch : int
+            Maximum number of requests recognized together.
+
+        batch_wait : float
+            Seconds to wait for more requests after the first request of a batch.
+
+        cache_size : int
+            Number of OCR results cached by frame content, shared by all the clients. 0 disables the cache.
+
+        engine_factory : callable
+            Function (engine, languages, debug_mode=..., cache=..., profile=...) creating an OCR handler. None uses the
+            engines of RPALite.
+        '''
+        if engine_factory is None:
+            from .ocr_registry import create_ocr_engine as engine_factory
+        self.socket_path = socket_path or default_socket_path()
+        self.default_key = (engine.lower(), tuple(languages), get_profile(profile))
+        self.max_batch = max(1, int(max_batch))
+        self.batch_wait = batch_wait
+        self.cache = OCRResultCache(cache_size, 64 * 1024 * 1024) if cache_size > 0 else None
+        self.debug_mode = debug_mode
+        self.engine_factory = engine_factory
+        self.batches = 0
+        self.requests = 0
+        self._handlers = {}
+        self._queue = queue.Queue()
+        self._server = None
+        self._batcher = None
+        self._running = False
+        self._serving = False
+
+    def get_handler(self, key):
+        '''Returns the OCR handler of an (engine, languages, profile) key, creating it on first use.'''
+        handler = self._handlers.get(key)
+        if handler is None:
+            engine, languages, profile = key
+            handler = self.engine_factory(engine, list(languages), debug_mode=self.debug_mode, cache=self.cache,
+                                          profile=profile)
+            self._handlers[key] = handler
+        return handler
+
+    def preload(self):
+        '''Loads the models of the default engine configuration and runs a dummy recognition.'''
+        self.get_handler(self.default_key).warm_up()
+
+    def recognize(self, key, frame, timeout=None):
+        '''Queues a frame for the batching thread and returns its OCR result.'''
+        request = _Request(key, frame)
+        self._queue.put(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError('Timeout waiting for the OCR result')
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _run_batches(self):
+        while self._running:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch:
+                try:
+                    request = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._running = False
+                    break
+                batch.append(request)
+            self.batches += 1
+            self.requests += len(batch)
+
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.key, []).append(request)
+            for key, requests in groups.items():
+                try:
+                    results = self.get_handler(key).find_texts_in_images([r.frame for r in requests])
+                    for request, result in zip(requests, results):
+                        request.result = result
+                except Exception as e:
+                    logger.error(f"Error recognizing a batch of {len(requests)} frames: {e}")
+                    for request in requests:
+                        request.error = e
+                for request in requests:
+                    request.done.set()
+            if self.debug_mode:
+                logger.debug(f"Recognized a batch of {len(batch)} requests in {len(groups)} groups")
+
+    def _handle_connection(self, sock):
+        while True:
+            try:
+                header, payload = receive_message(sock)
+            except (ConnectionError, OSError, struct.error):
+                return
+            op = header.get('op')
+            try:
+                if op == 'ping':
+                    send_message(sock, {'status': 'ok', 'batches': self.batches, 'requests': self.requests,
+                                        'cache': self.cache.stats() if self.cache is not None else None})
+                elif op == 'ocr':
+                    profile = header.get('profile')
+                    profile = OCRProfile(**profile) if isinstance(profile, dict) else get_profile(profile)
+                    key = (header['engine'].lower(), tuple(header['languages']), profile)
+                    frame = np.frombuffer(payload, dtype=np.dtype(header['dtype'])).reshape(header['shape'])
+                    send_message(sock, *encode_result(self.recognize(key, frame)))
+                else:
+                    send_message(sock, {'status': 'error', 'message': f'Unknown operation: {op}'})
+            except (ConnectionError, BrokenPipeError):
+                return
+            except Exception as e:
+                try:
+                    send_message(sock, {'status': 'error', 'message': f"{type(e).__name__}: {e}"})
+                except OSError:
+                    return
+
+    def start(self):
+        '''Starts listening on the socket and the batching thread. Use serve_forever() to block.'''
+        if os.path.exists(self.socket_path):
+            # Remove the socket of a daemon that did not exit cleanly, unless it still answers
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(self.socket_path)
+                raise RuntimeError(f'An OCR daemon is already listening on {self.socket_path}')
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.socket_path)
+
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                daemon._handle_connection(self.request)
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)
+        self._running = True
+        self._batcher = threading.Thread(target=self._run_batches, name='rpalite-ocrd-batcher', daemon=True)
+        self._batcher.start()
+        logger.info(f"rpalite-ocrd listening on {self.socket_path}")
+
+    def serve_forever(self):
+        '''Serves the requests until shutdown() is called from another thread.'''
+        self._serving = True
+        try:
+            self._server.serve_forever()
+        finally:
+            self._serving = False
+
+    def shutdown(self):
+        '''Stops the daemon and removes the socket.'''
+        self._running = False
+        self._queue.put(None)
+        if self._server is not None:
+            if self._serving:
+                self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='rpalite-ocrd', description='Local OCR daemon shared by RPALite processes')
+    parser.add_argument('--socket', default=None, help=f'Socket path (default: {default_socket_path()})')
+    parser.add_argument('--engine', default='paddleocr', choices=['paddleocr', 'easyocr'])
+    parser.add_argument('--languages', nargs='+', default=['en'])
+    parser.add_argument('--profile', default='balanced')
+    parser.add_argument('--max-batch', type=int, default=8, help='Maximum number of requests recognized together')
+    parser.add_argument('--batch-wait-ms', type=float, default=10,
+                        help='Milliseconds to wait for more requests before recognizing a batch')
+    parser.add_argument('--cache-size', type=int, default=64, help='Number of cached OCR results (0 disables)')
+    parser.add_argument('--preload', action='store_true', help='Load the models before accepting requests')
+    parser.add_argument('--debug', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+    if not hasattr(socket, 'AF_UNIX'):
+        logger.error('rpalite-ocrd needs Unix domain sockets, which are not available on this platform')
+        return 1
+    daemon = OCRDaemon(args.socket, args.engine, args.languages, args.profile, args.max_batch,
+                       args.batch_wait_ms / 1000, args.cache_size, args.debug)
+    if args.preload:
+        daemon.preload()
+    daemon.start()
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
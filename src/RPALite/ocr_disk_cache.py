@@ -0,0 +1,251 @@
+'''
+A persistent OCR result cache stored in a SQLite database, shared by all the runs (and processes) on a host.
+
+Regression suites show the same screens (login pages, dialogs, menus) run after run. With this cache a screen that
+was recognized once is never recognized again, as long as its pixels and the OCR configuration are the same.
+
+The cache can be inspected and pruned from the command line:
+
+    rpalite-ocr-cache [--path PATH] info
+    rpalite-ocr-cache [--path PATH] list [--limit 20]
+    rpalite-ocr-cache [--path PATH] prune [--max-bytes N] [--max-entries N] [--older-than-days N] [--engine NAME]
+    rpalite-ocr-cache [--path PATH] clear
+'''
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from .ocr_cache import OCRResultCache
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS ocr_results (
+    key TEXT PRIMARY KEY,
+    frame_hash TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ocr_results_last_used ON ocr_results (last_used);
+'''
+
+
+def default_cache_path():
+    '''Returns the RPALITE_OCR_CACHE environment variable, or rpalite/ocr_cache.sqlite3 in the user cache directory.'''
+    path = os.environ.get('RPALITE_OCR_CACHE')
+    if path:
+        return path
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'rpalite', 'ocr_cache.sqlite3')
+
+
+class PersistentOCRCache:
+    '''
+    An OCR result cache stored in a SQLite database. It has the same get/put/stats interface as OCRResultCache, so it
+    can be used as the cache of an OCR handler, or as the backend of an OCRResultCache that keeps the most recently
+    used results in memory.
+
+    Keys are the OCR cache keys (frame hash, engine, languages, profile, ...), stored as text. Results are stored as
+    JSON. When the database exceeds max_bytes or max_entries, the least recently used results are deleted.
+    '''
+
+    def __init__(self, path=None, max_bytes: int = 256 * 1024 * 1024, max_entries: int = 100000):
+        '''
+        Parameters
+        ----------
+        path : str
+            Path of the database file. None uses default_cache_path(). The directory is created if needed.
+
+        max_bytes : int
+            Maximum total size in bytes of the stored results.
+
+        max_entries : int
+            Maximum number of stored results.
+        '''
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Several RPALite processes may use the same database; SQLite serializes their writes
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(_SCHEMA)
+
+    hash_frame = staticmethod(OCRResultCache.hash_frame)
+
+    @staticmethod
+    def key_to_text(key):
+        '''Returns the text stored for a cache key tuple. The first item is the frame hash.'''
+        return f"{key[0]}|{key[1:]!r}"
+
+    def get(self, key):
+        '''Returns the stored result for key, or None if there is no stored result.'''
+        text_key = self.key_to_text(key)
+        with self._lock:
+            row = self._connection.execute('SELECT result FROM ocr_results WHERE key = ?', (text_key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute('UPDATE ocr_results SET last_used = ?, hits = hits + 1 WHERE key = ?',
+                                     (time.time(), text_key))
+            self.hits += 1
+        return [(box, text, confidence) for box, text, confidence in json.loads(row[0])]
+
+    def put(self, key, result):
+        '''Stores result under key and deletes the least recently used results if the budgets are exceeded.'''
+        if result is None:
+            return
+        # Engines return numpy numbers, which are converted to Python numbers
+        data = json.dumps([[box, text, confidence] for box, text, confidence in result],
+                          default=lambda value: value.tolist())
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO ocr_results (key, frame_hash, engine, result, size, created, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (self.key_to_text(key), str(key[0]), str(key[1]) if len(key) > 1 else '', data, len(data), now, now))
+            self.evictions += self._enforce_budgets(self.max_bytes, self.max_entries)
+
+    def _enforce_budgets(self, max_bytes, max_entries):
+        count, total = self._connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results').fetchone()
+        deleted = 0
+        while count > 0 and ((max_entries is not None and count > max_entries) or
+                             (max_bytes is not None and total > max_bytes)):
+            # Delete in chunks of about 10% to avoid running this for every put once the database is full
+            chunk = max(1, count // 10, count - max_entries if max_entries is not None else 0)
+            rows = self._connection.execute('SELECT key, size FROM ocr_results ORDER BY last_used LIMIT ?',
+                                            (chunk,)).fetchall()
+            self._connection.executemany('DELETE FROM ocr_results WHERE key = ?', [(row[0],) for row in rows])
+            count -= len(rows)
+            total -= sum(row[1] for row in rows)
+            deleted += len(rows)
+        return deleted
+
+    def prune(self, max_bytes=None, max_entries=None, older_than=None, engine=None):
+        '''
+        Deletes stored results and returns the number of deleted results.
+
+        Parameters
+        ----------
+        max_bytes, max_entries : int
+            Delete the least recently used results until the database is within these budgets.
+
+        older_than : float
+            Delete the results not used for this number of seconds.
+
+        engine : str
+            Delete the results of this OCR engine.
+        '''
+        deleted = 0
+        with self._lock:
+            if older_than is not None:
+                deleted += self._connection.execute('DELETE FROM ocr_results WHERE last_used < ?',
+                                                    (time.time() - older_than,)).rowcount
+            if engine is not None:
+                deleted += self._connection.execute('DELETE FROM ocr_results WHERE engine = ?', (engine,)).rowcount
+            if max_bytes is not None or max_entries is not None:
+                deleted += self._enforce_budgets(max_bytes, max_entries)
+        return deleted
+
+    def entries(self, limit=20):
+        '''Returns the most recently used results as dicts with their key, engine, size, created, last_used and hits.'''
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT key, engine, size, created, last_used, hits FROM ocr_results ORDER BY last_used DESC LIMIT ?',
+                (limit,)).fetchall()
+        return [dict(zip(('key', 'engine', 'size', 'created', 'last_used', 'hits'), row)) for row in rows]
+
+    def clear(self):
+        '''Deletes all stored results. The hit and miss counters are kept.'''
+        with self._lock:
+            self._connection.execute('DELETE FROM ocr_results')
+            self._connection.execute('VACUUM')
+
+    def stats(self):
+        '''Returns a dict with the path, entries, bytes, hits, misses, evictions and hit_rate of the cache.'''
+        with self._lock:
+            count, total = self._connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results').fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'path': self.path,
+                'entries': count,
+                'bytes': total,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM ocr_results').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='rpalite-ocr-cache', description='Inspect and prune the persistent OCR cache')
+    parser.add_argument('--path', default=None, help=f'Database path (default: {default_cache_path()})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('info', help='Show the size of the cache and the results per engine')
+    list_parser = commands.add_parser('list', help='List the most recently used results')
+    list_parser.add_argument('--limit', type=int, default=20)
+    prune_parser = commands.add_parser('prune', help='Delete results')
+    prune_parser.add_argument('--max-bytes', type=int, default=None)
+    prune_parser.add_argument('--max-entries', type=int, default=None)
+    prune_parser.add_argument('--older-than-days', type=float, default=None)
+    prune_parser.add_argument('--engine', default=None)
+    commands.add_parser('clear', help='Delete all results')
+    args = parser.parse_args(argv)
+
+    cache = PersistentOCRCache(args.path)
+    try:
+        if args.command == 'info':
+            stats = cache.stats()
+            print(f"Path:    {stats['path']}")
+            print(f"Entries: {stats['entries']}")
+            print(f"Size:    {stats['bytes'] / 1024:.1f} KiB")
+            with cache._lock:
+                rows = cache._connection.execute(
+                    'SELECT engine, COUNT(*), SUM(size), SUM(hits) FROM ocr_results GROUP BY engine').fetchall()
+            for engine, count, size, hits in rows:
+                print(f"  {engine}: {count} results, {size / 1024:.1f} KiB, {hits} hits")
+        elif args.command == 'list':
+            for entry in cache.entries(args.limit):
+                last_used = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used']))
+                print(f"{last_used}  {entry['hits']:5d} hits  {entry['size']:7d} B  {entry['key']}")
+        elif args.command == 'prune':
+            older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+            deleted = cache.prune(args.max_bytes, args.max_entries, older_than, args.engine)
+            print(f"Deleted {deleted} results")
+        elif args.command == 'clear':
+            cache.clear()
+            print('Deleted all results')
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
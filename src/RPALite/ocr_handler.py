@@ -0,0 +1,199 @@
+import threading
+import cv2
+import numpy as np
+from typing import List
+import logging
+from .ocr_profile import get_profile
+from .ocr_cache import OCRResultCache
+
+logger = logging.getLogger(__name__)
+
+
+class OCRHandler:
+    '''
+    Base class of the OCR engine handlers (EasyOCRHandler and PaddleOCRHandler).
+
+    Subclasses implement _recognize(), which runs the engine on a numpy image array and returns an OcrResult (or a list
+    of (bounding_box, text, confidence) tuples, where bounding_box is the list of the 4 corner points of the text).
+    This class converts the input image and puts the optional OCR result cache in front of the engine.
+
+    Loading the models of an engine takes seconds, so subclasses load them in _load(), which is called by the first
+    recognition (or by load() and warm_up()) instead of by the constructor.
+    '''
+
+    engine_name = None
+    # True if the engine implements _detect() and _recognize_boxes(), so that the texts can be detected first and only some of them recognized
+    supports_detection = False
+
+    def __init__(self, languages: List[str] = ['en'], debug_mode: bool = False, cache=None, profile=None):
+        '''
+        Parameters
+        ----------
+        languages : List[str]
+            Languages to recognize.
+
+        debug_mode : bool
+            Whether to enable debug mode.
+
+        cache : OCRResultCache
+            Optional cache for OCR results. If it is None, every call runs the OCR engine.
+
+        profile : OCRProfile or str
+            The speed profile ('fast', 'balanced', 'accurate' or an OCRProfile). None means 'balanced'.
+        '''
+        self.languages = languages
+        self.debug_mode = debug_mode
+        self.cache = cache
+        self.profile = get_profile(profile)
+        self.loaded = False
+        # Serializes model loading and recognitions, the engines are not safe to call from several threads at once
+        self._lock = threading.RLock()
+
+    def load(self):
+        '''Loads the OCR models if they are not loaded yet.'''
+        with self._lock:
+            if not self.loaded:
+                self._load()
+                self.loaded = True
+
+    def warm_up(self):
+        '''Loads the OCR models and recognizes a small generated image, so that the first real recognition does not pay for loading the models and the allocations of the first inference.'''
+        image = np.full((48, 240, 3), 255, dtype=np.uint8)
+        cv2.putText(image, 'RPALite', (10, 34), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        self._run(image)
+
+    def set_profile(self, profile):
+        '''Switches the speed profile used by the following recognitions. Returns the previous profile.'''
+        previous = self.profile
+        self.profile = get_profile(profile)
+        return previous
+
+    def find_texts_in_image(self, image):
+        """
+        Find texts in an image.
+
+        Args:
+            image: PIL Image or numpy array
+
+        Returns:
+            An OcrResult, which can also be used as a list of tuples where each tuple contains:
+            - The bounding box of the text, a list of the 4 corner points [top_left, top_right, bottom_right, bottom_left]
+            - The recognized text string
+            - The confidence of the recognition
+            Returns None if no text is found or an error occurs during OCR processing
+        """
+        if isinstance(image, np.ndarray):
+            img_array = image
+        else:
+            img_array = np.array(image)
+
+        if self.cache is None:
+            return self._run(img_array)
+
+        key = (self.cache.hash_frame(img_array),) + self.cache_key()
+        result = self.cache.get(key)
+        if result is not None:
+            if self.debug_mode:
+                logger.debug(f"OCR result served from cache: {self.cache.stats()}")
+            return result
+
+        result = self._run(img_array)
+        # Failed or empty recognitions are not cached so that they are retried on the next call
+        if result:
+            self.cache.put(key, result)
+        return result
+
+    def find_texts_in_images(self, images):
+        '''
+        Finds the texts in several images at once and returns the list of their results, in the format of find_texts_in_image().
+
+        Identical images are recognized only once, and the images not found in the cache are passed to the engine as one batch, which some engines recognize faster than one by one.
+        '''
+        arrays = [image if isinstance(image, np.ndarray) else np.array(image) for image in images]
+        hashes = [OCRResultCache.hash_frame(array) for array in arrays]
+        results = {}
+        if self.cache is not None:
+            for frame_hash in set(hashes):
+                result = self.cache.get((frame_hash,) + self.cache_key())
+                if result is not None:
+                    results[frame_hash] = result
+
+        missing = {}
+        for frame_hash, array in zip(hashes, arrays):
+            if frame_hash not in results:
+                missing.setdefault(frame_hash, array)
+        if missing:
+            with self._lock:
+                self.load()
+                batch_results = self._recognize_batch(list(missing.values()))
+            for frame_hash, result in zip(missing, batch_results):
+                results[frame_hash] = result
+                if result and self.cache is not None:
+                    self.cache.put((frame_hash,) + self.cache_key(), result)
+        return [results[frame_hash] for frame_hash in hashes]
+
+    def detect_boxes(self, image):
+        '''
+        Detects the texts of an image without recognizing them and returns the list of their bounding boxes (the 4 corner points, top to bottom, then left to right). Only available if supports_detection is True.
+        '''
+        img_array = image if isinstance(image, np.ndarray) else np.array(image)
+        with self._lock:
+            self.load()
+            return self._detect(img_array)
+
+    def recognize_boxes(self, image, boxes):
+        '''
+        Recognizes the texts inside some bounding boxes returned by detect_boxes(). Returns a list with one (bounding_box, text, confidence) tuple per box, or None for the boxes without a reliable text. Only available if supports_detection is True.
+        '''
+        img_array = image if isinstance(image, np.ndarray) else np.array(image)
+        if not boxes:
+            return []
+        with self._lock:
+            self.load()
+            return self._recognize_boxes(img_array, boxes)
+
+    def cache_key(self):
+        '''Returns the part of the cache key that identifies the engine configuration.'''
+        return (self.engine_name, tuple(self.languages), self.profile)
+
+    def _run(self, img_array):
+        with self._lock:
+            self.load()
+            return self._recognize(img_array)
+
+    def _load(self):
+        pass
+
+    def _recognize(self, img_array):
+        raise NotImplementedError()
+
+    def _detect(self, img_array):
+        raise NotImplementedError(f'{type(self).__name__} does not support text detection only')
+
+    def _recognize_boxes(self, img_array, boxes):
+        raise NotImplementedError(f'{type(self).__name__} does not support recognizing detected boxes')
+
+    def _recognize_batch(self, img_arrays):
+        # Engines supporting batched inference override this
+        return [self._recognize(img_array) for img_array in img_arrays]
+
+
+class OCRHandlerWrapper:
+    '''
+    Base class of the handlers wrapping another OCR handler (TiledOCRHandler, ScaledOCRHandler, ...) to change how
+    the images are recognized. Subclasses implement find_texts_in_image(). The other attributes (languages, cache,
+    set_profile(), ...) are the ones of the wrapped handler, so wrappers can be stacked in front of any engine.
+    '''
+
+    def __init__(self, ocr_handler, debug_mode: bool = False):
+        self.ocr_handler = ocr_handler
+        self.debug_mode = debug_mode
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the wrapper itself
+        if name.startswith('_') or name == 'ocr_handler':
+            raise AttributeError(name)
+        return getattr(self.ocr_handler, name)
+
+    def find_texts_in_image(self, image):
+        raise NotImplementedError()
@@ -0,0 +1,274 @@
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+import numpy as np
+from .ocr_handler import OCRHandler
+from .ocr_result import OcrResult
+
+logger = logging.getLogger(__name__)
+
+
+class OCRTimeoutError(TimeoutError):
+    '''Raised when an OCR request is not finished before the deadline of the waiting keyword or the task timeout.'''
+
+
+def pack_result(result):
+    '''
+    Converts an OCR result (a list of (box, text, confidence) tuples) to a compact (boxes, confidences, texts) tuple:
+    an (N, 4, 2) int32 array (float32 if the engine returns fractional coordinates), an (N,) float32 array and a list
+    of N strings. Returns None for an empty result.
+    '''
+    if not result:
+        return None
+    if isinstance(result, OcrResult):
+        return result.boxes, result.confidences, result.texts
+    boxes = np.asarray([box for box, _, _ in result])
+    boxes = boxes.astype(np.int32 if np.issubdtype(boxes.dtype, np.integer) else np.float32)
+    confidences = np.asarray([confidence for _, _, confidence in result], dtype=np.float32)
+    return boxes, confidences, [text for _, text, _ in result]
+
+
+def unpack_result(packed):
+    '''Converts a result packed by pack_result() back to an OcrResult, or None.'''
+    if packed is None:
+        return None
+    boxes, confidences, texts = packed
+    return OcrResult(boxes, confidences, texts)
+
+
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers the block with the resource tracker. The workers share the tracker of the parent
+        # process, which already tracks the block, so this does not change anything.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(engine_factory, engine, languages, debug_mode, tasks, results, cancel_before):
+    '''Main function of the worker processes: recognizes the frames of the tasks until it gets None.'''
+    if engine_factory is None:
+        from .ocr_registry import create_ocr_engine as engine_factory
+
+    handlers = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, block_name, shape, dtype, profile = task
+        if task_id <= cancel_before.value:
+            results.put((task_id, 'cancelled', None))
+            continue
+        block = None
+        try:
+            handler = handlers.get(profile)
+            if handler is None:
+                handler = handlers[profile] = engine_factory(engine, languages, debug_mode=debug_mode, profile=profile)
+            block = _attach_shared_memory(block_name)
+            frame = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            result = handler.find_texts_in_image(frame)
+            del frame
+            results.put((task_id, 'ok', pack_result(result)))
+        except Exception as e:
+            results.put((task_id, 'error', f"{type(e).__name__}: {e}"))
+        finally:
+            if block is not None:
+                block.close()
+
+
+class OCRProcessPool(OCRHandler):
+    '''
+    An OCR handler that recognizes the images in worker processes, so that the GIL bound pre and post processing of the
+    OCR engines does not block the capture and matching code of the calling process.
+
+    Frames are copied into shared memory blocks and only the name of the block is sent to the workers; the results come
+    back as compact arrays (see pack_result()). At most max_pending requests are in flight, further requests wait for a
+    free slot. A request that is not finished before the deadline set by ocr_deadline() (or before task_timeout) raises
+    OCRTimeoutError, and the workers skip it if they did not start it yet.
+
+    Each worker loads its own OCR model. The workers are started by the first recognition, or by warm_up().
+    '''
+
+    def __init__(self, engine: str, languages=['en'], debug_mode: bool = False, cache=None, profile=None,
+                 workers: int = 2, max_pending: int = 4, task_timeout: float = 120, engine_factory=None):
+        '''
+        Parameters
+        ----------
+        engine : str
+            The OCR engine used by the workers, 'paddleocr' or 'easyocr'.
+
+        workers : int
+            Number of worker processes.
+
+        max_pending : int
+            Maximum number of requests sent to the workers and not finished yet.
+
+        task_timeout : float
+            Maximum number of seconds to wait for a request when no deadline is set.
+
+        engine_factory : callable
+            Module level function (engine, languages, debug_mode=..., profile=...) creating the OCR handler of a worker.
+            None uses the engines of RPALite.
+        '''
+        super().__init__(languages, debug_mode, cache, profile)
+        self.engine_name = engine.lower()
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.task_timeout = task_timeout
+        self.engine_factory = engine_factory
+        # Deadline (time.monotonic() value) of the current waiting keyword, see ocr_deadline()
+        self.deadline = None
+        self._context = multiprocessing.get_context('spawn')
+        self._processes = []
+        self._tasks = None
+        self._results = None
+        self._cancel_before = None
+        self._collector = None
+        self._task_ids = itertools.count(1)
+        self._pending = {}
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._free_blocks = []
+        self._blocks_lock = threading.Lock()
+
+    def _load(self):
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._cancel_before = self._context.Value('q', 0)
+        for i in range(self.workers):
+            process = self._context.Process(target=_worker_main, name=f'rpalite-ocr-worker-{i}', daemon=True,
+                                            args=(self.engine_factory, self.engine_name, list(self.languages),
+                                                  self.debug_mode, self._tasks, self._results, self._cancel_before))
+            process.start()
+            self._processes.append(process)
+        self._collector = threading.Thread(target=self._collect_results, name='rpalite-ocr-results', daemon=True)
+        self._collector.start()
+
+    def _run(self, img_array):
+        # Unlike the in-process engines the pool may be called from several threads at once
+        self.load()
+        return self._recognize(img_array)
+
+    def warm_up(self):
+        '''Starts the workers and lets each of them load its model and recognize a small generated image.'''
+        image = np.full((48, 240, 3), 255, dtype=np.uint8)
+        threads = [threading.Thread(target=self._run, args=(image,)) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _recognize(self, img_array):
+        deadline = self.deadline
+        if deadline is None and self.task_timeout is not None:
+            deadline = time.monotonic() + self.task_timeout
+
+        if not self._slots.acquire(timeout=self._remaining(deadline)):
+            raise OCRTimeoutError('Timeout waiting for a free OCR worker slot')
+        try:
+            img_array = np.ascontiguousarray(img_array)
+            block = self._get_block(img_array.nbytes)
+            np.ndarray(img_array.shape, dtype=img_array.dtype, buffer=block.buf)[...] = img_array
+            task_id = next(self._task_ids)
+            future = Future()
+            self._pending[task_id] = (future, block)
+            self._tasks.put((task_id, block.name, img_array.shape, img_array.dtype.str, self.profile))
+        except BaseException:
+            self._slots.release()
+            raise
+
+        while True:
+            remaining = self._remaining(deadline)
+            try:
+                # Wake up every second to notice workers that died
+                status, payload = future.result(timeout=1 if remaining is None else min(1, remaining))
+                break
+            except FutureTimeoutError:
+                if remaining is not None and remaining <= 1:
+                    # Let the workers skip the request if they did not start it yet
+                    with self._cancel_before.get_lock():
+                        self._cancel_before.value = max(self._cancel_before.value, task_id)
+                    raise OCRTimeoutError(f'OCR request {task_id} timed out')
+                if not any(process.is_alive() for process in self._processes):
+                    self._abandon(task_id)
+                    raise RuntimeError('The OCR worker processes exited')
+            except CancelledError:
+                raise OCRTimeoutError(f'OCR request {task_id} was cancelled')
+
+        if status == 'error':
+            logger.error(f"Error in OCR worker: {payload}")
+            return None
+        return unpack_result(payload)
+
+    @staticmethod
+    def _remaining(deadline):
+        return None if deadline is None else max(0, deadline - time.monotonic())
+
+    def cancel_pending(self):
+        '''Cancels the requests sent so far that the workers did not start yet.'''
+        if self._cancel_before is not None:
+            with self._cancel_before.get_lock():
+                self._cancel_before.value = max(self._cancel_before.value, next(self._task_ids))
+
+    def _abandon(self, task_id):
+        future, block = self._pending.pop(task_id, (None, None))
+        if block is not None:
+            self._put_block(block)
+            self._slots.release()
+
+    def _collect_results(self):
+        while True:
+            message = self._results.get()
+            if message is None:
+                break
+            task_id, status, payload = message
+            future = self._pending.get(task_id, (None, None))[0]
+            self._abandon(task_id)
+            if future is not None and not future.done():
+                if status == 'cancelled':
+                    future.cancel()
+                else:
+                    future.set_result((status, payload))
+
+    def _get_block(self, size):
+        with self._blocks_lock:
+            for i, block in enumerate(self._free_blocks):
+                if block.size >= size:
+                    return self._free_blocks.pop(i)
+        return shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+    def _put_block(self, block):
+        with self._blocks_lock:
+            if len(self._free_blocks) < self.max_pending:
+                self._free_blocks.append(block)
+                return
+        block.close()
+        block.unlink()
+
+    def close(self):
+        '''Stops the worker processes and frees the shared memory blocks.'''
+        with self._lock:
+            if not self.loaded:
+                return
+            self.loaded = False
+            for _ in self._processes:
+                self._tasks.put(None)
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self._processes = []
+            self._results.put(None)
+            self._collector.join(timeout=5)
+            for future, block in self._pending.values():
+                future.cancel()
+                self._put_block(block)
+            self._pending.clear()
+            with self._blocks_lock:
+                blocks, self._free_blocks = self._free_blocks, []
+            for block in blocks:
+                block.close()
+                block.unlink()
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, replace
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class OCRProfile:
+    '''
+    A named set of OCR engine settings that trades accuracy for speed. Both OCR handlers honor the settings their
+    engine supports and ignore the others.
+
+    Attributes
+    ----------
+    name : str
+        The name of the profile. It is part of the OCR cache keys.
+    canvas_size : int
+        EasyOCR: maximum image side length used for text detection. Larger images are downscaled.
+    mag_ratio : float
+        EasyOCR: magnification ratio applied to the image before text detection.
+    det_limit_side_len : int
+        PaddleOCR: maximum image side length used for text detection.
+    use_angle_cls : bool
+        PaddleOCR: whether to run the text angle classifier, needed only for rotated or upside down texts.
+    batch_size : int
+        EasyOCR: number of text boxes recognized in one batch.
+    rec_batch_num : int
+        PaddleOCR: number of text boxes recognized in one batch.
+    cpu_threads : int
+        Number of CPU threads the engine may use. None keeps the engine default. EasyOCR sets the torch thread count,
+        which applies to the whole process, only during its calls and restores the previous count afterwards.
+    enable_mkldnn : bool
+        PaddleOCR: whether to use the MKLDNN (oneDNN) CPU acceleration.
+    link_threshold : float
+        EasyOCR: link confidence threshold used to merge characters into words.
+    '''
+    name: str
+    canvas_size: int = 2560
+    mag_ratio: float = 1.0
+    det_limit_side_len: int = 960
+    use_angle_cls: bool = False
+    batch_size: int = 2
+    rec_batch_num: int = 6
+    cpu_threads: Optional[int] = None
+    enable_mkldnn: bool = False
+    link_threshold: float = 0.3
+
+    def with_settings(self, **settings):
+        '''Returns a copy of this profile with some settings changed, for example FAST.with_settings(cpu_threads=2).'''
+        return replace(self, **settings)
+
+
+FAST = OCRProfile('fast', canvas_size=1280, det_limit_side_len=736, use_angle_cls=False, batch_size=8,
+                  rec_batch_num=16, enable_mkldnn=True)
+'''Fastest profile. Smaller detection size and larger batches; very small texts may be missed.'''
+
+BALANCED = OCRProfile('balanced')
+'''The default profile, using the settings RPALite always used.'''
+
+ACCURATE = OCRProfile('accurate', canvas_size=3840, mag_ratio=1.5, det_limit_side_len=1920, use_angle_cls=True,
+                      batch_size=1, rec_batch_num=6)
+'''Most accurate profile. Larger detection size and angle classification; slowest.'''
+
+PROFILES = {profile.name: profile for profile in (FAST, BALANCED, ACCURATE)}
+
+
+def get_profile(profile):
+    '''
+    Returns the OCRProfile for profile, which can be an OCRProfile or the name of a predefined profile ('fast',
+    'balanced' or 'accurate'). None returns the balanced profile.
+    '''
+    if profile is None:
+        return BALANCED
+    if isinstance(profile, OCRProfile):
+        return profile
+    if isinstance(profile, str) and profile.lower() in PROFILES:
+        return PROFILES[profile.lower()]
+    raise ValueError(f"Unknown OCR profile: {profile}. Use one of {list(PROFILES)} or an OCRProfile object")
@@ -0,0 +1,154 @@
+import threading
+import logging
+from .ocr_handler import OCRHandler
+from .ocr_profile import get_profile
+
+logger = logging.getLogger(__name__)
+
+
+def create_ocr_engine(engine: str, languages, debug_mode: bool = False, cache=None, profile=None):
+    '''Creates a new OCR handler for engine ('paddleocr' or 'easyocr'). Its models are loaded by the first recognition.'''
+    if engine.lower() == "paddleocr":
+        from .paddleocr_handler import PaddleOCRHandler
+        return PaddleOCRHandler(languages, debug_mode, cache=cache, profile=profile)
+    else:
+        from .easyocr_handler import EasyOCRHandler
+        return EasyOCRHandler(languages, debug_mode, cache=cache, profile=profile)
+
+
+class _Entry:
+    def __init__(self, handler):
+        self.handler = handler
+        self.references = 0
+
+
+class OCREngineRegistry:
+    '''
+    Hands out one OCR engine per (engine, languages, profile) key for the whole process.
+
+    Loading an OCR engine loads hundreds of MB of model weights, so RPALite and ImageHandler instances with the same
+    OCR configuration share one engine. The engines are reference counted: acquire() returns a SharedOCRHandler and
+    increments the count, SharedOCRHandler.release() decrements it. The engine is dropped when nobody uses it anymore.
+    '''
+
+    def __init__(self, engine_factory=create_ocr_engine):
+        '''
+        Parameters
+        ----------
+        engine_factory : callable
+            Function (engine, languages, debug_mode=..., profile=...) returning a new OCR handler without a cache.
+        '''
+        self.engine_factory = engine_factory
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(engine, languages, profile):
+        return (engine.lower(), tuple(languages), get_profile(profile))
+
+    def acquire(self, engine: str, languages, profile=None, debug_mode: bool = False, cache=None):
+        '''
+        Returns a SharedOCRHandler using the shared engine for (engine, languages, profile), creating the engine if it
+        does not exist yet. cache is the OCR result cache of the returned handler; it is not shared with the other users
+        of the engine. Call release() on the returned handler when it is no longer used.
+        '''
+        handler = SharedOCRHandler(self, engine, languages, debug_mode, cache, profile)
+        handler._entry = self._acquire_entry(engine, languages, handler.profile, debug_mode)
+        return handler
+
+    def _acquire_entry(self, engine, languages, profile, debug_mode):
+        key = self.make_key(engine, languages, profile)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if debug_mode:
+                    logger.debug(f"Creating shared OCR engine {key}")
+                entry = _Entry(self.engine_factory(engine, list(languages), debug_mode=debug_mode, profile=profile))
+                self._entries[key] = entry
+            entry.references += 1
+            return entry
+
+    def _release_entry(self, entry):
+        with self._lock:
+            entry.references -= 1
+            if entry.references > 0:
+                return
+            for key, value in list(self._entries.items()):
+                if value is entry:
+                    del self._entries[key]
+        close = getattr(entry.handler, 'close', None)
+        if close is not None:
+            close()
+
+    def references(self, engine: str, languages, profile=None):
+        '''Returns the number of handlers using the engine for (engine, languages, profile).'''
+        with self._lock:
+            entry = self._entries.get(self.make_key(engine, languages, profile))
+            return entry.references if entry is not None else 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SharedOCRHandler(OCRHandler):
+    '''
+    An OCR handler using an engine shared through an OCREngineRegistry. Calls to the engine are serialized by the lock
+    of the engine, which also loads its models on the first recognition. Each SharedOCRHandler has its own OCR result cache and speed profile: switching the profile switches to
+    the shared engine of the new profile.
+    '''
+
+    def __init__(self, registry, engine, languages, debug_mode=False, cache=None, profile=None):
+        super().__init__(languages, debug_mode, cache, profile)
+        self.registry = registry
+        self.engine_name = engine.lower()
+        self._entry = None
+
+    @property
+    def engine(self):
+        '''The shared OCR handler running the recognitions.'''
+        if self._entry is None:
+            raise RuntimeError('The OCR engine was released')
+        return self._entry.handler
+
+    def set_profile(self, profile):
+        previous = self.profile
+        profile = get_profile(profile)
+        if profile != previous and self._entry is not None:
+            entry = self.registry._acquire_entry(self.engine_name, self.languages, profile, self.debug_mode)
+            self.registry._release_entry(self._entry)
+            self._entry = entry
+        self.profile = profile
+        return previous
+
+    @property
+    def supports_detection(self):
+        return self.engine.supports_detection
+
+    def cache_key(self):
+        return self.engine.cache_key()
+
+    def _recognize(self, img_array):
+        return self.engine._run(img_array)
+
+    def _detect(self, img_array):
+        return self.engine.detect_boxes(img_array)
+
+    def _recognize_boxes(self, img_array, boxes):
+        return self.engine.recognize_boxes(img_array, boxes)
+
+    def release(self):
+        '''Releases the shared engine. The handler can not be used anymore afterwards.'''
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self.registry._release_entry(entry)
+
+    close = release
+
+
+_default_registry = OCREngineRegistry()
+
+
+def get_registry():
+    '''Returns the process-wide OCREngineRegistry.'''
+    return _default_registry
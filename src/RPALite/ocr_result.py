@@ -0,0 +1,160 @@
+import numpy as np
+from .spatial_index import SpatialIndex
+
+
+class OcrResult:
+    '''
+    The texts recognized in an image, stored in columns: an (N, 4, 2) int32 array of the bounding boxes (the 4 corner
+    points [top_left, top_right, bottom_right, bottom_left] of each text), an (N,) float32 array of the confidences and
+    a list of the N texts.
+
+    Geometric queries on the texts (which boxes start inside a rect, which boxes are inside a rect, the reading order)
+    run as NumPy operations on all the boxes at once instead of Python loops over the boxes.
+
+    For compatibility, an OcrResult also behaves like the list of (bounding_box, text, confidence) tuples returned by
+    the OCR handlers before: it can be iterated, indexed and compared with such a list, and to_list() returns it.
+    '''
+
+    def __init__(self, boxes=None, confidences=None, texts=None):
+        '''
+        Parameters
+        ----------
+        boxes : numpy.ndarray
+            The (N, 4, 2) corner points of the boxes. Fractional coordinates are rounded.
+
+        confidences : numpy.ndarray
+            The (N,) confidences of the texts.
+
+        texts : list
+            The N texts.
+        '''
+        texts = list(texts) if texts is not None else []
+        boxes = np.zeros((0, 4, 2)) if boxes is None else np.asarray(boxes)
+        if not np.issubdtype(boxes.dtype, np.integer):
+            boxes = np.rint(boxes)
+        self.boxes = boxes.astype(np.int32, copy=False).reshape(len(texts), 4, 2)
+        self.confidences = np.zeros(len(texts), dtype=np.float32) if confidences is None else \
+            np.asarray(confidences, dtype=np.float32).reshape(len(texts))
+        self.texts = texts
+        self._rows = None
+        self._point_index = None
+
+    @classmethod
+    def from_list(cls, result):
+        '''Returns the OcrResult of a list of (bounding_box, text, confidence) tuples, or None if result is None.'''
+        if result is None:
+            return None
+        if isinstance(result, OcrResult):
+            return result
+        result = list(result)
+        if not result:
+            return cls()
+        return cls(np.asarray([np.asarray(box, dtype=np.float64).reshape(4, 2) for box, _, _ in result]),
+                   [confidence for _, _, confidence in result], [str(text) for _, text, _ in result])
+
+    @classmethod
+    def concat(cls, results):
+        '''Returns the OcrResult with the texts of all the results, in their order.'''
+        results = [cls.from_list(result) for result in results if result is not None]
+        if not results:
+            return cls()
+        return cls(np.concatenate([r.boxes for r in results]), np.concatenate([r.confidences for r in results]),
+                   [text for r in results for text in r.texts])
+
+    def to_list(self):
+        '''Returns the texts as the list of (bounding_box, text, confidence) tuples, the bounding box being a list of 4 [x, y] lists.'''
+        if self._rows is None:
+            self._rows = list(zip(self.boxes.tolist(), self.texts, self.confidences.tolist()))
+        return list(self._rows)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if self._rows is None:
+                self.to_list()
+            return self._rows[index]
+        return self.to_list()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, OcrResult):
+            return self.texts == other.texts and np.array_equal(self.boxes, other.boxes) and \
+                np.array_equal(self.confidences, other.confidences)
+        if isinstance(other, (list, tuple)):
+            return self.to_list() == [tuple(r) for r in other]
+        return NotImplemented
+
+    def __repr__(self):
+        return f'OcrResult({self.to_list()!r})'
+
+    def __getstate__(self):
+        return {'boxes': self.boxes, 'confidences': self.confidences, 'texts': self.texts}
+
+    def __setstate__(self, state):
+        self.__init__(state['boxes'], state['confidences'], state['texts'])
+
+    @property
+    def nbytes(self):
+        '''The memory in bytes used by the arrays and the texts.'''
+        return self.boxes.nbytes + self.confidences.nbytes + sum(49 + len(text) for text in self.texts)
+
+    def locations(self):
+        '''
+        Returns the (N, 4) int32 array of the (x, y, width, height) locations of the texts, taken from the top left,
+        top right and bottom left corners like the locations returned by the text searches.
+        '''
+        boxes = self.boxes
+        return np.stack([boxes[:, 0, 0], boxes[:, 0, 1], boxes[:, 1, 0] - boxes[:, 0, 0], boxes[:, 3, 1] - boxes[:, 0, 1]],
+                        axis=1)
+
+    def bounds(self):
+        '''Returns the (N, 4) int32 array of the (left, top, right, bottom) bounds of the boxes.'''
+        return np.concatenate([self.boxes.min(axis=1), self.boxes.max(axis=1)], axis=1)
+
+    def points_in_rect(self, rect, corner: int = 0):
+        '''Returns the boolean mask of the boxes whose corner (0 is the top left corner) is inside the (x, y, width, height) rect, borders included.'''
+        points = self.boxes[:, corner]
+        return (points[:, 0] >= rect[0]) & (points[:, 1] >= rect[1]) & \
+            (points[:, 0] <= rect[0] + rect[2]) & (points[:, 1] <= rect[1] + rect[3])
+
+    def points_in_rects(self, rects, corner: int = 0):
+        '''Returns the boolean mask of the boxes whose corner is inside at least one of the (x, y, width, height) rects.'''
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        if len(rects) == 0:
+            return np.zeros(len(self), dtype=bool)
+        points = self.boxes[:, corner, None, :]
+        inside = (points[..., 0] >= rects[:, 0]) & (points[..., 1] >= rects[:, 1]) & \
+            (points[..., 0] <= rects[:, 0] + rects[:, 2]) & (points[..., 1] <= rects[:, 1] + rects[:, 3])
+        return inside.any(axis=1)
+
+    def boxes_in_rect(self, rect):
+        '''Returns the boolean mask of the boxes whose top left and bottom right corners are inside the (x, y, width, height) rect.'''
+        return self.points_in_rect(rect, 0) & self.points_in_rect(rect, 2)
+
+    def point_index(self):
+        '''Returns the SpatialIndex of the top left corners of the boxes, built on the first call.'''
+        if self._point_index is None:
+            corners = self.boxes[:, 0]
+            self._point_index = SpatialIndex(np.concatenate([corners, np.zeros_like(corners)], axis=1))
+        return self._point_index
+
+    def select(self, indexes):
+        '''Returns the OcrResult of the texts selected by a boolean mask or an array of indexes, in this order.'''
+        indexes = np.asarray(indexes)
+        indexes = np.flatnonzero(indexes) if indexes.dtype == bool else indexes.astype(np.intp).reshape(-1)
+        return OcrResult(self.boxes[indexes], self.confidences[indexes], [self.texts[i] for i in indexes.tolist()])
+
+    def sorted(self):
+        '''Returns the OcrResult sorted in reading order: top to bottom, then left to right.'''
+        if len(self) < 2:
+            return self
+        left, top = self.boxes[:, :, 0].min(axis=1), self.boxes[:, :, 1].min(axis=1)
+        return self.select(np.lexsort((left, top)))
+
+    def offset(self, dx, dy):
+        '''Returns the OcrResult with every box moved by (dx, dy).'''
+        return OcrResult(self.boxes + np.array([int(dx), int(dy)], dtype=np.int32), self.confidences, self.texts)
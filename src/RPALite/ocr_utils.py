@@ -0,0 +1,78 @@
+'''
+Helper functions for OCR result lists. An OCR result is a list of (bounding_box, text, confidence) tuples, where
+bounding_box is the list of the 4 corner points [top_left, top_right, bottom_right, bottom_left] of the text.
+Rectangles use the (x, y, width, height) format like everywhere else in RPALite.
+
+The OCR handlers return OcrResult objects, which can be used as such lists.
+'''
+from .ocr_result import OcrResult
+
+
+def box_bounds(box):
+    '''Returns the (left, top, right, bottom) bounds of a bounding box given by its corner points.'''
+    xs = [p[0] for p in box]
+    ys = [p[1] for p in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def box_to_rect(box):
+    '''Returns the (x, y, width, height) rectangle enclosing a bounding box given by its corner points.'''
+    left, top, right, bottom = box_bounds(box)
+    return left, top, right - left, bottom - top
+
+
+def rects_intersect(rect1, rect2):
+    '''Returns True if two (x, y, width, height) rectangles overlap.'''
+    return rect1[0] < rect2[0] + rect2[2] and rect2[0] < rect1[0] + rect1[2] and \
+        rect1[1] < rect2[1] + rect2[3] and rect2[1] < rect1[1] + rect1[3]
+
+
+def rect_contains(outside, inside):
+    '''Returns True if the (x, y, width, height) rectangle outside fully contains the rectangle inside.'''
+    return outside[0] <= inside[0] and outside[1] <= inside[1] and \
+        outside[0] + outside[2] >= inside[0] + inside[2] and outside[1] + outside[3] >= inside[1] + inside[3]
+
+
+def union_rect(rects):
+    '''Returns the smallest (x, y, width, height) rectangle containing all the rectangles.'''
+    left = min(r[0] for r in rects)
+    top = min(r[1] for r in rects)
+    right = max(r[0] + r[2] for r in rects)
+    bottom = max(r[1] + r[3] for r in rects)
+    return left, top, right - left, bottom - top
+
+
+def expand_rect(rect, padding, width, height):
+    '''Returns the rectangle grown by padding pixels on each side and clipped to an image of width x height.'''
+    left = max(0, int(rect[0]) - padding)
+    top = max(0, int(rect[1]) - padding)
+    right = min(width, int(rect[0] + rect[2]) + padding)
+    bottom = min(height, int(rect[1] + rect[3]) + padding)
+    return left, top, max(0, right - left), max(0, bottom - top)
+
+
+def offset_result(result, dx, dy):
+    '''Returns a copy of the OCR result with every bounding box moved by (dx, dy).'''
+    if result is None:
+        return None
+    if isinstance(result, OcrResult):
+        return result.offset(dx, dy)
+    return [([[p[0] + dx, p[1] + dy] for p in box], text, confidence) for box, text, confidence in result]
+
+
+def merge_rects(rects):
+    '''Merges overlapping (x, y, width, height) rectangles until no two rectangles of the returned list overlap.'''
+    rects = list(rects)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                if rects_intersect(rects[i], rects[j]):
+                    rects[i] = union_rect([rects[i], rects[j]])
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return rects
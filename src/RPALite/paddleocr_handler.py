@@ -1,26 +1,51 @@
 import cv2
-from paddleocr import PaddleOCR
 import numpy as np
 from typing import List, Tuple, Optional
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .ocr_handler import OCRHandler
+from .ocr_result import OcrResult
 
 logger = logging.getLogger(__name__)
 
-class PaddleOCRHandler:
-    def __init__(self, languages: List[str] = ['en'], debug_mode: bool = False, confidence_threshold: float = 0.5):
+class PaddleOCRHandler(OCRHandler):
+    engine_name = 'paddleocr'
+    supports_detection = True
+
+    def __init__(self, languages: List[str] = ['en'], debug_mode: bool = False, confidence_threshold: float = 0.5, cache=None, profile=None):
         """
         Initialize PaddleOCR handler.
         
         Args:
             languages: List of languages to recognize (default: ['en'])
             debug_mode: Whether to enable debug mode (default: False)
+            cache: Optional OCRResultCache for OCR results (default: None)
+            profile: Speed profile name or OCRProfile (default: 'balanced')
         """
-        self.languages = languages
-        self.debug_mode = debug_mode
+        super().__init__(languages, debug_mode, cache, profile)
         self.confidence_threshold = confidence_threshold
         
-        # Initialize multiple PaddleOCR instances based on languages
+        # PaddleOCR instances per speed profile, because the profile settings are fixed when an instance is created
+        self._instances_by_profile = {}
         self.ocr_instances = []
+        # Runs the recognition of the different languages in parallel
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _load(self):
+        self.ocr_instances = self._get_instances(self.profile)
+
+    def _get_instances(self, profile):
+        instances = self._instances_by_profile.get(profile)
+        if instances is not None:
+            return instances
+
+        from paddleocr import PaddleOCR
+
+        # Initialize multiple PaddleOCR instances based on languages
+        instances = []
+        languages = self.languages
         
         # Check if we have both English and other languages
         has_english = 'en' in languages
@@ -32,63 +57,189 @@ class PaddleOCRHandler:
                 continue
                 
             # Only initialize unique language instances
-            if lang not in [ocr.lang for ocr in self.ocr_instances]:
-                ocr = PaddleOCR(lang=lang, show_log=debug_mode)
-                self.ocr_instances.append(ocr)
+            if lang not in [ocr.lang for ocr in instances]:
+                options = dict(use_angle_cls=profile.use_angle_cls, det_limit_side_len=profile.det_limit_side_len,
+                               rec_batch_num=profile.rec_batch_num, enable_mkldnn=profile.enable_mkldnn)
+                if profile.cpu_threads:
+                    options['cpu_threads'] = profile.cpu_threads
+                ocr = PaddleOCR(lang=lang, show_log=self.debug_mode, **options)
+                instances.append(ocr)
+
+        self._instances_by_profile[profile] = instances
+        return instances
         
-    def find_texts_in_image(self, image):
+    def _recognize(self, img_array):
         """
-        Find text locations in an image using PaddleOCR.
+        Find text locations in an image array using PaddleOCR.
         
         Args:
-            image: PIL Image or numpy array
-            text: Text to search for
+            img_array: numpy array of the image
             
         Returns:
-            A list of tuples where each tuple contains:
-            - A bounding box tuple (x, y, width, height) representing the text location
-            - The recognized text string that contains the search text
+            An OcrResult with:
+            - The bounding boxes of the texts, the 4 corner points of each text
+            - The recognized text strings
+            - The confidences of the recognitions
             Returns None if:
-            - The input image is invalid
-            - No text is found that contains the search text
+            - No text is found
             - An error occurs during OCR processing
         """
-        if isinstance(image, np.ndarray):
-            img_array = image
-        else:
-            img_array = np.array(image)
-            
+        profile = self.profile
         try:
-            all_results = []
-            
-            # Process image with each OCR instance
-            for ocr in self.ocr_instances:
-                ocr_results = ocr.ocr(img_array, cls=True)
-                
-                if self.debug_mode:
-                    logger.debug(f"PaddleOCR results for {ocr.lang}: {ocr_results}")
-                
-                # Process results from this OCR instance
-                if ocr_results and ocr_results[0]:
-                    for line in ocr_results[0]:
-                        if line and len(line) >= 2:
-                            bbox = line[0]
-                            text_recognized = line[1][0]
-                            confidence = line[1][1]
-                            
-                            # Filter out low confidence results
-                            if confidence >= self.confidence_threshold:
-                                all_results.append((bbox, text_recognized, confidence))
+            self.ocr_instances = self._get_instances(profile)
+            if len(img_array.shape) == 3 and img_array.shape[2] == 4:
+                img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2RGB)
+
+            if len(self.ocr_instances) == 1:
+                all_results = self._recognize_with_instance(self.ocr_instances[0], img_array, profile)
+            else:
+                all_results = self._recognize_multi_language(img_array, profile)
             
             # Remove duplicate results (same text and similar bounding box)
             unique_results = self._remove_duplicate_results(all_results)
             
-            return unique_results if unique_results else None
+            return OcrResult.from_list(unique_results) if unique_results else None
             
         except Exception as e:
             logger.error(f"Error in PaddleOCR text recognition: {e}")
             return None
 
+    def _recognize_with_instance(self, ocr, img_array, profile):
+        """
+        Runs the full detection and recognition pipeline of one PaddleOCR instance.
+        """
+        results = []
+        ocr_results = ocr.ocr(img_array, cls=profile.use_angle_cls)
+        
+        if self.debug_mode:
+            logger.debug(f"PaddleOCR results for {ocr.lang}: {ocr_results}")
+        
+        if ocr_results and ocr_results[0]:
+            for line in ocr_results[0]:
+                if line and len(line) >= 2:
+                    bbox = line[0]
+                    text_recognized = line[1][0]
+                    confidence = line[1][1]
+                    
+                    # Filter out low confidence results
+                    if confidence >= self.confidence_threshold:
+                        results.append((bbox, text_recognized, confidence))
+        return results
+
+    def _recognize_multi_language(self, img_array, profile):
+        """
+        Detects the text boxes once and recognizes them with every language in parallel. For each box the text of the
+        language with the highest confidence is kept.
+
+        The detection model is language independent, so running it once per language only repeated the same work. The
+        detector of the Chinese instance is used if there is one, because it is trained on the most varied data.
+        """
+        detector = self._get_detector()
+        dt_boxes, _ = detector.text_detector(img_array)
+        if dt_boxes is None or len(dt_boxes) == 0:
+            return []
+        dt_boxes = self._sort_boxes(dt_boxes)
+        rec_results = self._recognize_crops(detector, img_array, dt_boxes, profile)
+
+        results = []
+        for box, (text_recognized, confidence) in zip(dt_boxes, rec_results):
+            if self.debug_mode:
+                logger.debug(f"PaddleOCR result for box {box.tolist()}: {text_recognized} ({confidence})")
+            # Filter out low confidence results
+            if confidence >= self.confidence_threshold:
+                results.append((box.tolist(), text_recognized, confidence))
+        return results
+
+    def _get_detector(self):
+        return next((ocr for ocr in self.ocr_instances if ocr.lang == 'ch'), self.ocr_instances[0])
+
+    def _recognize_crops(self, detector, img_array, boxes, profile):
+        """
+        Recognizes the texts inside the boxes with every language and returns one (text, confidence) tuple per box,
+        the one of the language with the highest confidence.
+        """
+        crops = [self._crop_box(img_array, box) for box in boxes]
+        if profile.use_angle_cls and getattr(detector, 'text_classifier', None) is not None:
+            crops, _, _ = detector.text_classifier(crops)
+
+        def recognize(ocr):
+            rec_results, _ = ocr.text_recognizer(crops)
+            return rec_results
+
+        if len(self.ocr_instances) == 1:
+            rec_results_by_language = [recognize(self.ocr_instances[0])]
+        else:
+            executor = self._get_executor(len(self.ocr_instances))
+            rec_results_by_language = list(executor.map(recognize, self.ocr_instances))
+        return [max((rec_results[i] for rec_results in rec_results_by_language), key=lambda r: r[1])
+                for i in range(len(boxes))]
+
+    def _detect(self, img_array):
+        self.ocr_instances = self._get_instances(self.profile)
+        if len(img_array.shape) == 3 and img_array.shape[2] == 4:
+            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2RGB)
+        dt_boxes, _ = self._get_detector().text_detector(img_array)
+        if dt_boxes is None or len(dt_boxes) == 0:
+            return []
+        return [box.tolist() for box in self._sort_boxes(dt_boxes)]
+
+    def _recognize_boxes(self, img_array, boxes):
+        profile = self.profile
+        self.ocr_instances = self._get_instances(profile)
+        if len(img_array.shape) == 3 and img_array.shape[2] == 4:
+            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2RGB)
+        rec_results = self._recognize_crops(self._get_detector(), img_array, boxes, profile)
+        return [(box, text_recognized, confidence) if confidence >= self.confidence_threshold else None
+                for box, (text_recognized, confidence) in zip(boxes, rec_results)]
+
+    def _get_executor(self, workers):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rpalite-paddleocr')
+            return self._executor
+
+    @staticmethod
+    def _sort_boxes(dt_boxes):
+        """
+        Sorts text boxes top to bottom, then left to right for boxes on the same line, like PaddleOCR does.
+        """
+        boxes = sorted(dt_boxes, key=lambda b: (b[0][1], b[0][0]))
+        for i in range(len(boxes) - 1):
+            for j in range(i, -1, -1):
+                if abs(boxes[j + 1][0][1] - boxes[j][0][1]) < 10 and boxes[j + 1][0][0] < boxes[j][0][0]:
+                    boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+                else:
+                    break
+        return boxes
+
+    @staticmethod
+    def _crop_box(img_array, box):
+        """
+        Returns the text inside a (possibly rotated) box as an upright image, like PaddleOCR does before recognition.
+        """
+        points = np.array(box, dtype=np.float32)
+        width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+        height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+        width, height = max(width, 1), max(height, 1)
+        target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+        matrix = cv2.getPerspectiveTransform(points, target)
+        crop = cv2.warpPerspective(img_array, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE,
+                                   flags=cv2.INTER_CUBIC)
+        if height / width >= 1.5:
+            # Vertical text
+            crop = np.rot90(crop)
+        return crop
+
+    def cache_key(self):
+        return super().cache_key() + (self.confidence_threshold,)
+
+    def close(self):
+        '''Stops the threads recognizing the languages in parallel.'''
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
     def _is_similar_bbox(self, bbox1, bbox2, threshold=5):
         """
         Check if two bounding boxes are similar within a given threshold.
@@ -118,26 +269,40 @@ class PaddleOCRHandler:
             List of unique OCR results
         """
         unique_results = []
+        # Spatial hash of the unique results: (normalized text, cell x, cell y) of the top left point -> indexes.
+        # Similar boxes have top left points at most threshold pixels apart, so they are in the same or a neighbouring
+        # cell, which makes the deduplication linear in the number of boxes.
+        threshold = 5
+        cell_size = threshold + 1
+        grid = {}
+
+        def cell(bbox):
+            return int(bbox[0][0] // cell_size), int(bbox[0][1] // cell_size)
         
         for new_result in results:
             new_bbox, new_text, new_confidence = new_result
             # Normalize text for comparison
             normalized_text = new_text.strip().lower()
+            cell_x, cell_y = cell(new_bbox)
             
+            candidates = sorted(i for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                                for i in grid.get((normalized_text, cell_x + dx, cell_y + dy), ()))
             found_similar = False
-            for i, existing_result in enumerate(unique_results):
-                existing_bbox, existing_text, existing_confidence = existing_result
+            for i in candidates:
+                existing_bbox, existing_text, existing_confidence = unique_results[i]
                 
-                # Check if text is the same and bounding boxes are similar
-                if normalized_text == existing_text.strip().lower() and \
-                   self._is_similar_bbox(new_bbox, existing_bbox):
+                # Check if bounding boxes are similar. The text is the same because of the grid key.
+                if self._is_similar_bbox(new_bbox, existing_bbox, threshold):
                     # Keep the result with higher confidence
                     if new_confidence > existing_confidence:
                         unique_results[i] = new_result
+                        grid[(normalized_text,) + cell(existing_bbox)].remove(i)
+                        grid.setdefault((normalized_text, cell_x, cell_y), []).append(i)
                     found_similar = True
                     break
             
             if not found_similar:
+                grid.setdefault((normalized_text, cell_x, cell_y), []).append(len(unique_results))
                 unique_results.append(new_result)
         
         return unique_results
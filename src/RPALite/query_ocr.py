@@ -0,0 +1,157 @@
+import math
+import re
+import threading
+from difflib import SequenceMatcher
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_char_count(box, char_aspect: float = 0.55):
+    '''
+    Estimates the number of characters of a detected text box from its aspect ratio: the length of the box divided by
+    the width of a character, which is about char_aspect times the height of the line.
+    '''
+    (x0, y0), (x1, y1), _, (x3, y3) = box[0], box[1], box[2], box[3]
+    width = math.hypot(x1 - x0, y1 - y0)
+    height = math.hypot(x3 - x0, y3 - y0)
+    if height / max(width, 1) >= 1.5:
+        # Vertical text
+        width, height = height, width
+    return max(1, round(width / (max(height, 1) * char_aspect)))
+
+
+def length_bounds(length, min_ratio: float = 0.75):
+    '''
+    Returns the (shortest, longest) lengths of a text whose SequenceMatcher ratio with a text of the given length can be
+    above min_ratio. The ratio is 2 * matches / (length1 + length2), and matches is at most the shorter length.
+    '''
+    return length * min_ratio / (2 - min_ratio), length * (2 - min_ratio) / min_ratio
+
+
+def text_matches(text, candidate, min_ratio: float = 0.75):
+    '''Returns True if the candidate text contains text or is similar to it, like ImageHandler's text search.'''
+    return text in candidate or SequenceMatcher(None, candidate, text).ratio() > min_ratio
+
+
+def contains_words(text, candidate):
+    '''Returns True if the candidate text contains text as whole words, e.g. 'Save' in 'Save changes' but not in 'Saved'.'''
+    return re.search(r'(?<!\w)' + re.escape(text) + r'(?!\w)', candidate) is not None
+
+
+class QueryAwareRecognizer:
+    '''
+    Searches one text in an image by recognizing only the detected text boxes that may contain it.
+
+    The engine first detects the text boxes without recognizing them. The boxes are split in three groups by the
+    number of characters estimated from their size (see estimate_char_count()):
+
+    1. boxes of a length compatible with the query under the fuzzy match threshold (see length_bounds()),
+    2. longer boxes, which may contain the query,
+    3. shorter boxes, in case the estimation was wrong.
+
+    The groups are recognized one after another until a recognized text contains the query as whole words, so on dense
+    screens only a small part of the boxes is recognized. Weaker matches, like 'Saved' or a fuzzy match for 'Save', only
+    stop the search once the longer boxes were recognized too, since one of them may hold a better match. The
+    recognized boxes are remembered per image, so searching another text in the same image does not recognize them
+    again.
+
+    The OCR handler must support detection (see OCRHandler.supports_detection).
+    '''
+
+    def __init__(self, ocr_handler, min_ratio: float = 0.75, tolerance: float = 1.5, char_aspect: float = 0.55,
+                 debug_mode: bool = False):
+        '''
+        Parameters
+        ----------
+        ocr_handler : OCRHandler
+            The handler detecting and recognizing the texts.
+
+        min_ratio : float
+            The fuzzy match threshold of the text search.
+
+        tolerance : float
+            Factor the length bounds are widened by, because the estimated lengths are approximate.
+
+        char_aspect : float
+            The width of a character relative to the height of its line.
+        '''
+        self.ocr_handler = ocr_handler
+        self.min_ratio = min_ratio
+        self.tolerance = tolerance
+        self.char_aspect = char_aspect
+        self.debug_mode = debug_mode
+        self.searched_boxes = 0
+        self.recognized_boxes = 0
+        self._lock = threading.Lock()
+
+    def group_boxes(self, boxes, text, indexes=None):
+        '''Returns the indexes of the boxes in the order they are recognized, as the list of the three groups.'''
+        shortest, longest = length_bounds(len(text), self.min_ratio)
+        shortest /= self.tolerance
+        longest *= self.tolerance
+        compatible, longer, shorter = [], [], []
+        for i in (range(len(boxes)) if indexes is None else indexes):
+            count = estimate_char_count(boxes[i], self.char_aspect)
+            if count > longest:
+                longer.append(i)
+            elif count < shortest:
+                shorter.append(i)
+            else:
+                compatible.append(i)
+        return [compatible, longer, shorter]
+
+    def find(self, img_array, text, boxes, recognized, indexes=None):
+        '''
+        Recognizes the boxes that may contain text and returns the OCR result of all the searched boxes recognized so
+        far.
+
+        Parameters
+        ----------
+        img_array : numpy.ndarray
+            The image.
+
+        text : str
+            The searched text.
+
+        boxes : list
+            The boxes detected in the image by the OCR handler.
+
+        recognized : dict
+            The recognized boxes of the image, by box index (None for boxes without a reliable text). It is updated
+            with the boxes recognized by this call.
+
+        indexes : list
+            The indexes of the boxes to search. None searches all the boxes.
+        '''
+        indexes = list(range(len(boxes))) if indexes is None else list(indexes)
+        with self._lock:
+            self.searched_boxes += len(indexes)
+        for n, group in enumerate(self.group_boxes(boxes, text, indexes)):
+            texts = [recognized[i][1] for i in indexes if recognized.get(i) is not None]
+            if any(contains_words(text, t) for t in texts):
+                break
+            if n == 2 and any(text_matches(text, t, self.min_ratio) for t in texts):
+                # The compatible and the longer boxes were recognized, the shorter ones would be worse matches
+                break
+            pending = [i for i in group if i not in recognized]
+            if not pending:
+                continue
+            results = self.ocr_handler.recognize_boxes(img_array, [boxes[i] for i in pending])
+            with self._lock:
+                self.recognized_boxes += len(pending)
+            for i, result in zip(pending, results):
+                recognized[i] = result
+        if self.debug_mode:
+            count = sum(1 for i in indexes if i in recognized)
+            logger.debug(f"Recognized {count} of {len(indexes)} text boxes searching '{text}'")
+        return [recognized[i] for i in sorted(indexes) if recognized.get(i) is not None]
+
+    def stats(self):
+        '''Returns a dict with the numbers of boxes searched and recognized by find() and the share of boxes recognized.'''
+        with self._lock:
+            return {
+                'searched_boxes': self.searched_boxes,
+                'recognized_boxes': self.recognized_boxes,
+                'recognized_ratio': self.recognized_boxes / self.searched_boxes if self.searched_boxes else 0.0,
+            }
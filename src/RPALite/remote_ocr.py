@@ -0,0 +1,119 @@
+import dataclasses
+import logging
+import socket
+import threading
+import time
+import numpy as np
+from .ocr_handler import OCRHandler
+from .ocr_daemon import decode_result, default_socket_path, receive_message, send_message
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteOCRError(RuntimeError):
+    '''Raised when the OCR daemon answers a request with an error.'''
+
+
+class RemoteOCRHandler(OCRHandler):
+    '''
+    An OCR handler sending the images to the rpalite-ocrd daemon (see the ocr_daemon module), so that the RPALite
+    processes of a host share one loaded OCR model.
+
+    If the daemon is not running or fails, the images are recognized in-process by a fallback engine, which is loaded
+    on first use. The daemon is tried again every retry_interval seconds.
+    '''
+
+    engine_name = 'remote'
+
+    def __init__(self, languages=['en'], debug_mode: bool = False, cache=None, profile=None, socket_path=None,
+                 engine: str = 'paddleocr', fallback_factory=None, timeout: float = 120, retry_interval: float = 30):
+        '''
+        Parameters
+        ----------
+        socket_path : str
+            Path of the socket of the daemon. None uses the RPALITE_OCRD_SOCKET environment variable or the default path.
+
+        engine : str
+            The engine the daemon should use, 'paddleocr' or 'easyocr'. The fallback uses the same engine.
+
+        fallback_factory : callable
+            Function without parameters returning the OCR handler used when the daemon is not available.
+
+        timeout : float
+            Maximum number of seconds to wait for the answer of the daemon.
+
+        retry_interval : float
+            Seconds to wait before trying the daemon again after it was not available.
+        '''
+        super().__init__(languages, debug_mode, cache, profile)
+        self.socket_path = socket_path or default_socket_path()
+        self.engine = engine.lower()
+        self.fallback_factory = fallback_factory
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.fallback_handler = None
+        self._socket = None
+        self._retry_at = 0
+        self._fallback_lock = threading.Lock()
+
+    def cache_key(self):
+        return (self.engine_name, self.engine, tuple(self.languages), self.profile)
+
+    def _recognize(self, img_array):
+        if time.monotonic() >= self._retry_at:
+            try:
+                return self._recognize_remote(img_array)
+            except RemoteOCRError as e:
+                # The daemon is running but could not recognize the image, the connection can be used again
+                logger.warning(f"OCR daemon at {self.socket_path} failed, using in-process OCR: {e}")
+            except (OSError, ConnectionError, ValueError) as e:
+                self._disconnect()
+                self._retry_at = time.monotonic() + self.retry_interval
+                logger.warning(f"OCR daemon at {self.socket_path} is not available, using in-process OCR: {e}")
+        return self._fallback().find_texts_in_image(img_array)
+
+    def _recognize_remote(self, img_array):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError('Unix domain sockets are not available on this platform')
+        img_array = np.ascontiguousarray(img_array)
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            self._socket.connect(self.socket_path)
+        send_message(self._socket, {'op': 'ocr', 'engine': self.engine, 'languages': list(self.languages),
+                                    'profile': dataclasses.asdict(self.profile), 'shape': list(img_array.shape),
+                                    'dtype': img_array.dtype.str}, memoryview(img_array).cast('B'))
+        header, payload = receive_message(self._socket)
+        if header.get('status') != 'ok':
+            raise RemoteOCRError(header.get('message'))
+        return decode_result(header, payload)
+
+    def _fallback(self):
+        with self._fallback_lock:
+            if self.fallback_handler is None:
+                if self.fallback_factory is not None:
+                    self.fallback_handler = self.fallback_factory()
+                else:
+                    from .ocr_registry import create_ocr_engine
+                    self.fallback_handler = create_ocr_engine(self.engine, self.languages, self.debug_mode,
+                                                              profile=self.profile)
+            if self.fallback_handler.profile != self.profile:
+                self.fallback_handler.set_profile(self.profile)
+            return self.fallback_handler
+
+    def _disconnect(self):
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def close(self):
+        '''Closes the connection to the daemon and releases the fallback engine.'''
+        with self._lock:
+            self._disconnect()
+            close = getattr(self.fallback_handler, 'close', None)
+            if close is not None:
+                close()
+            self.fallback_handler = None
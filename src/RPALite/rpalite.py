@@ -3,41 +3,50 @@ import tempfile
 import platform
 import threading
 import PIL.Image
-import numpy as np
 from robot.api.deco import keyword, library, not_keyword
 from robot.api import logger
-from deprecated import deprecated
 import PIL
 import time
-import pyautogui
-import pyperclip
-import cv2
 from datetime import datetime
-from .image_handler import ImageHandler
+from contextlib import contextmanager
+from .lazy_import import lazy_import
 import os
 import subprocess
 import locale
 from typing import List
 
-# Import platform-specific dependencies
+# Heavy dependencies are imported when they are used for the first time, so that importing RPALite stays fast and
+# scripts only pay for the capabilities they use.
+np = lazy_import('numpy')
+cv2 = lazy_import('cv2')
+pyautogui = lazy_import('pyautogui')
+pyperclip = lazy_import('pyperclip')
+ImageHandler = lazy_import('.image_handler', 'ImageHandler', __package__)
+Snapshot = lazy_import('.snapshot', 'Snapshot', __package__)
+LocatorCache = lazy_import('.locator_cache', 'LocatorCache', __package__)
+estimate_shift = lazy_import('.incremental_ocr', 'estimate_shift', __package__)
+
+# Platform-specific dependencies
 if platform.system() == 'Windows':
-    import uiautomation as auto
-    import mouse as mouselib
-    from pywinauto import mouse, keyboard, findwindows, Application
+    auto = lazy_import('uiautomation')
+    mouselib = lazy_import('mouse')
+    mouse = lazy_import('pywinauto.mouse')
+    keyboard = lazy_import('pywinauto.keyboard')
+    findwindows = lazy_import('pywinauto.findwindows')
+    Application = lazy_import('pywinauto', 'Application')
 elif platform.system() == 'Darwin':  # macOS
-    try:
-        from Quartz import *
-        from AppKit import *
-    except ImportError:
-        # Handle case where pyobjc is not installed
-        pass
+    # Requires pyobjc
+    Quartz = lazy_import('Quartz')
+    AppKit = lazy_import('AppKit')
     # Use pyautogui for mouse and keyboard on macOS instead of mouse/keyboard modules
 elif platform.system() == 'Linux':
-    import mouse as mouselib
-    import keyboard
-    import Xlib
-    from Xlib import X, display, Xutil
-    from Xlib.ext import randr
+    mouselib = lazy_import('mouse')
+    keyboard = lazy_import('keyboard')
+    Xlib = lazy_import('Xlib')
+    X = lazy_import('Xlib.X')
+    display = lazy_import('Xlib.display')
+    Xutil = lazy_import('Xlib.Xutil')
+    randr = lazy_import('Xlib.ext.randr')
 
 @library(scope='GLOBAL', auto_keywords=True)
 class RPALite:
@@ -54,31 +63,109 @@ class RPALite:
     '''
 
     def __init__(self, debug_mode: bool = False, ocr_engine: str = "easyocr", languages: List[str] = ['en'],
-                 step_pause_interval: int = 3):
+                 step_pause_interval: int = 3, ocr_cache_size: int = 16, incremental_ocr: bool = False,
+                 ocr_tile_size: int = 0, ocr_tile_workers: int = 2, ocr_resolution='full',
+                 ocr_profile: str = 'balanced', shared_ocr_engine: bool = True, warm_up_ocr: bool = False,
+                 ocr_workers: int = 0, ocr_daemon_socket: str = None, ocr_disk_cache = None, ocr_prefilter: bool = False,
+                 query_aware_ocr: bool = False, text_location_hints: bool = False, locator_cache: bool = False,
+                 locator_cache_threshold: float = 0.95, locator_cache_ttl: float = 60):
         """
         Initialize the RPALite class.
         :param debug_mode: Whether to enable debug mode
-        :param ocr_engine: OCR engine to use (easyocr or paddleocr)
+        :param ocr_engine: OCR engine to use (easyocr, paddleocr, or remote to use the rpalite-ocrd daemon with paddleocr)
         :param languages: Languages for OCR
         :param step_pause_interval: Time to wait between steps
+        :param ocr_cache_size: Maximum number of OCR results cached by screen content (0 disables the cache)
+        :param incremental_ocr: Whether to recognize only the screen regions that changed since the previous screenshot
+        :param ocr_tile_size: If larger than 0, large screenshots are recognized as tiles of this size in parallel
+        :param ocr_tile_workers: Number of tiles recognized at the same time when ocr_tile_size is set
+        :param ocr_resolution: OCR resolution policy: 'full', 'auto' (downsample high DPI screenshots to the logical resolution) or a scale factor between 0 and 1
+        :param ocr_profile: OCR speed profile: 'fast', 'balanced' or 'accurate' (or an OCRProfile object)
+        :param shared_ocr_engine: Whether to share the OCR engine with the other RPALite instances of the process using the same engine, languages and profile
+        :param warm_up_ocr: Whether to load the OCR model on a background thread right away instead of on the first OCR query
+        :param ocr_workers: If larger than 0, OCR runs in this number of worker processes so that it does not block the calling process
+        :param ocr_daemon_socket: Socket path of the rpalite-ocrd daemon used when ocr_engine is remote (default: RPALITE_OCRD_SOCKET environment variable or a per user path in the temp directory)
+        :param ocr_disk_cache: Enables the persistent OCR cache shared by all runs: True uses the default path, a string is the path of the cache database
+        :param ocr_prefilter: Whether to recognize only the screen regions that look like text, and to skip OCR in waiting keywords while no text on the screen changes
+        :param query_aware_ocr: Whether text searches detect the text boxes first and only recognize the boxes whose size fits the searched text
+        :param text_location_hints: Whether text searches first recognize only the area where the text was found last time, before searching the whole screen
+        :param locator_cache: Whether to reuse the result of a text, label or image lookup while the pixels under the found location do not change, instead of searching again
+        :param locator_cache_threshold: Minimum similarity (0 to 1) between the pixels under a cached location and the same area of the new screenshot
+        :param locator_cache_ttl: Seconds a cached lookup result is reused (0 means until the pixels change)
         """
         self.platform = platform.system()
         self.debug_mode = debug_mode
         self.ocr_engine = ocr_engine
         if self.platform not in ['Windows', 'Linux', 'Darwin']:
             raise Exception('This version currently only supports Windows, macOS and Linux. Other platforms will be supported in the future.')
-        self.image_handler = ImageHandler(debug_mode, ocr_engine, languages)
+        # The image handler (and the image processing libraries it imports) is created on first use
+        self._image_handler = None
+        self._image_handler_options = dict(debug_mode=debug_mode, ocr_engine=ocr_engine, languages=languages,
+                                           ocr_cache_size=ocr_cache_size, incremental_ocr=incremental_ocr,
+                                           ocr_tile_size=ocr_tile_size, ocr_tile_workers=ocr_tile_workers,
+                                           ocr_resolution=ocr_resolution, ocr_profile=ocr_profile,
+                                           shared_ocr_engine=shared_ocr_engine, ocr_workers=ocr_workers,
+                                           ocr_daemon_socket=ocr_daemon_socket, ocr_disk_cache=ocr_disk_cache,
+                                           ocr_prefilter=ocr_prefilter, query_aware_ocr=query_aware_ocr,
+                                           text_location_hints=text_location_hints)
+        self._locator_cache = None
+        self._locator_cache_options = dict(threshold=locator_cache_threshold, ttl=locator_cache_ttl) if locator_cache else None
         self.step_pause_interval = step_pause_interval
         self.screen_recording_thread = None
         self.screen_recording_file = None
+        # Stack of snapshots pinned by freeze_frame(). While it is not empty take_screenshot() returns the top one.
+        self._frozen_snapshots = []
         
-        # Initialize display scaling factors (universal for all platforms)
-        self._display_scale_factor_x = None  # X-axis scaling factor
-        self._display_scale_factor_y = None  # Y-axis scaling factor
-        self._detect_display_scaling()
+        # Display scaling factors (universal for all platforms). They are detected on first use, from the first
+        # screenshot if possible, so that creating an instance does not need to take a screenshot.
+        self._scale_factor_x = None  # X-axis scaling factor
+        self._scale_factor_y = None  # Y-axis scaling factor
+        self._display_scaling_detected = False
+        if warm_up_ocr:
+            self.warm_up()
+
+    @property
+    def image_handler(self):
+        '''The ImageHandler used for OCR and image recognition. It is created on first use.'''
+        if self._image_handler is None:
+            self._image_handler = ImageHandler(**self._image_handler_options)
+            if self._display_scaling_detected:
+                self._image_handler.set_display_scale(self._scale_factor_x, self._scale_factor_y)
+        return self._image_handler
+
+    @image_handler.setter
+    def image_handler(self, value):
+        self._image_handler = value
+
+    @property
+    def locator_cache(self):
+        '''The LocatorCache reusing the results of lookups while the screen does not change, or None if it is disabled.'''
+        if self._locator_cache is None and self._locator_cache_options is not None:
+            self._locator_cache = LocatorCache(**self._locator_cache_options)
+        return self._locator_cache
+
+    @property
+    def _display_scale_factor_x(self):
+        if not self._display_scaling_detected:
+            self._detect_display_scaling()
+        return self._scale_factor_x
+
+    @_display_scale_factor_x.setter
+    def _display_scale_factor_x(self, value):
+        self._scale_factor_x = value
+
+    @property
+    def _display_scale_factor_y(self):
+        if not self._display_scaling_detected:
+            self._detect_display_scaling()
+        return self._scale_factor_y
+
+    @_display_scale_factor_y.setter
+    def _display_scale_factor_y(self, value):
+        self._scale_factor_y = value
 
     @not_keyword
-    def _detect_display_scaling(self):
+    def _detect_display_scaling(self, full_screenshot = None):
         """
         Universal display scaling detection for all platforms.
         This detects when the screenshot resolution differs from the logical screen resolution
@@ -86,13 +173,17 @@ class RPALite:
         - Windows: High DPI displays (150%, 200% scaling)
         - macOS: Retina displays (2x scaling)
         - Linux: Fractional scaling in various desktop environments
+
+        full_screenshot is a screenshot of the whole screen that was already taken. If it is None, a new screenshot is taken.
         """
+        self._display_scaling_detected = True
         try:
             # Get logical screen size from pyautogui
             logical_size = pyautogui.size()
             
             # Take a full screenshot to get actual pixel dimensions
-            full_screenshot = pyautogui.screenshot()
+            if full_screenshot is None:
+                full_screenshot = pyautogui.screenshot()
             
             if full_screenshot:
                 # Calculate the scaling factor
@@ -149,6 +240,8 @@ class RPALite:
             self._display_scale_factor_y = 1.0
             if self.debug_mode:
                 logger.warn(f"Error detecting display scaling, assuming 1.0x: {e}")
+        if self._image_handler is not None:
+            self._image_handler.set_display_scale(self._scale_factor_x, self._scale_factor_y)
 
     @not_keyword
     def _scale_coordinates_to_physical(self, x, y):
@@ -406,6 +499,72 @@ class RPALite:
         else:
             time.sleep(seconds)
 
+    def set_ocr_profile(self, profile):
+        '''Switches the OCR speed profile used by the following keywords.
+
+        Parameters
+        ----------
+        profile : str
+            'fast' (lowest latency, very small texts may be missed), 'balanced' (default) or 'accurate' (slowest, also recognizes rotated texts). An OCRProfile object can be passed from Python for custom settings.
+
+        Returns
+        -------
+        str
+            The name of the previous profile, which can be used to switch back.
+        '''
+        return self.image_handler.set_ocr_profile(profile).name
+
+    def get_ocr_cache_stats(self):
+        '''Returns the statistics of the OCR result cache.
+
+        Returns
+        -------
+        dict
+            A dict with the number of cached entries, their estimated bytes, the hits, misses and evictions counters and the hit_rate. Returns None if the cache is disabled.
+        '''
+        return self.image_handler.get_ocr_cache_stats()
+
+    def get_location_hint_stats(self):
+        '''Returns the metrics of the text location hints (see the text_location_hints parameter).
+
+        Returns
+        -------
+        dict
+            A dict with the number of remembered positions, the hits and misses of the searches near a remembered position, the hit_rate, the number and average duration in seconds of the full screen searches, and the estimated time_saved in seconds. Returns None if the hints are disabled.
+        '''
+        return self.image_handler.get_location_hint_stats()
+
+    def warm_up(self, wait: bool = False):
+        '''Loads the OCR model and runs a dummy recognition on a background thread, so that the first keyword using OCR does not pay the loading time. Without calling this keyword the model is loaded by the first OCR query.
+
+        Parameters
+        ----------
+        wait : bool
+            If True, wait until the warm-up is finished.
+        '''
+        self.image_handler.warm_up(wait)
+
+    def release_ocr_engine(self):
+        '''Releases the OCR engine of this RPALite instance. A shared engine is unloaded when no other instance uses it anymore. The keywords using OCR can not be used after calling this keyword.'''
+        if self._image_handler is not None:
+            self._image_handler.close()
+
+    def clear_locator_cache(self):
+        '''Forgets the cached lookup results (see the locator_cache parameter), so that the following lookups search the screen again.'''
+        if self._locator_cache is not None:
+            self._locator_cache.invalidate()
+
+    def get_locator_cache_stats(self):
+        '''Returns the statistics of the locator cache.
+
+        Returns
+        -------
+        dict
+            A dict with the number of cached results, the hits and misses counters, the number of results dropped because the screen changed (mismatches) or because they were too old (expirations) and the hit_rate. Returns None if the cache is disabled.
+        '''
+        cache = self.locator_cache
+        return cache.stats() if cache is not None else None
+
     def get_cursor_position(self):
         '''Gets the current mouse location. 
         
@@ -441,6 +600,7 @@ class RPALite:
 
         if image is None:
             image = self.take_screenshot()
+        image = Snapshot.wrap(image)
         text_locations = self.image_handler.find_texts_in_image(image, title)
         if text_locations is None or len(text_locations) == 0:
             return None
@@ -496,13 +656,23 @@ class RPALite:
         if image is None:
             img = self.take_screenshot()
         else:
-            img = image
+            img = Snapshot.wrap(image)
+
+        cache = self.locator_cache
+        if cache is not None:
+            control = cache.get(('label', label), img)
+            if control is not None:
+                return control
             
         location = self.image_handler.find_texts_in_image(img, label)
         if(location is None or location[0] is None):
             return None
         else:
-            return self.image_handler.find_control_near_position(img, location[0][0], True)
+            control = self.image_handler.find_control_near_position(img, location[0][0], True)
+            if cache is not None and control is not None:
+                # The control is found from the position of its label, so checking the label is enough
+                cache.put(('label', label), img, [location[0][0]], control)
+            return control
 
     def get_screen_size(self):
         '''Returns the size of the screen.
@@ -658,6 +828,8 @@ class RPALite:
         '''
         Take a screenshot of the current screen. If all_screens is True, take a screenshot of all screens.
 
+        The returned Snapshot wraps the PIL image and can be used everywhere a PIL image is accepted. Analysis results such as OCR are cached on it, so passing the same snapshot to several functions only recognizes the screen once. While a frame is frozen with freeze_frame() or frozen_frame(), the frozen snapshot is returned instead of a new screenshot.
+
         Parameters
         ----------
         all_screens : bool
@@ -668,9 +840,14 @@ class RPALite:
             
         Returns
         -------
-        PIL.Image
+        Snapshot
             The screenshot image
         '''
+        if self._frozen_snapshots:
+            snapshot = self._frozen_snapshots[-1]
+            if filename:
+                snapshot.save(filename)
+            return snapshot
         try:
             if self.platform == 'Darwin':
                 if all_screens:
@@ -682,14 +859,64 @@ class RPALite:
             else:
                 # For Windows and Linux
                 img = pyautogui.screenshot()
+
+            if not self._display_scaling_detected:
+                self._detect_display_scaling(img)
                 
             if filename:
                 img.save(filename)
             
-            return img
+            return Snapshot(img)
         except Exception as e:
             logger.error(f"Failed to take screenshot: {e}")
             return None
+
+    def freeze_frame(self, image = None):
+        '''
+        Pins one screenshot so that every following keyword works on the same frame until unfreeze_frame() is called. Because analysis results are cached on the frozen frame, a block of queries against it costs only one OCR pass.
+
+        Please note that waiting keywords (like wait_until_text_shown) see no screen changes while a frame is frozen.
+
+        Parameters
+        ----------
+        image : PIL.Image or Snapshot
+            The image to pin. If it is None, a new screenshot of the current screen will be taken.
+
+        Returns
+        -------
+        Snapshot
+            The frozen frame
+        '''
+        snapshot = Snapshot.wrap(image) if image is not None else self.take_screenshot()
+        if snapshot is None:
+            raise AssertionError('Cannot freeze frame: failed to take screenshot')
+        self._frozen_snapshots.append(snapshot)
+        return snapshot
+
+    def unfreeze_frame(self):
+        '''
+        Releases the frame pinned by the most recent freeze_frame() call. Following keywords will take new screenshots again (or use the previous frozen frame if freeze_frame() was called several times).
+        '''
+        if not self._frozen_snapshots:
+            logger.warn("No frozen frame to release")
+            return
+        self._frozen_snapshots.pop()
+
+    @not_keyword
+    @contextmanager
+    def frozen_frame(self, image = None):
+        '''
+        Context manager version of freeze_frame() and unfreeze_frame(). All RPALite calls inside the with block work on the same frame:
+
+            with rpalite.frozen_frame():
+                user_field = rpalite.find_control_by_label('User')
+                password_field = rpalite.find_control_by_label('Password')
+        '''
+        snapshot = self.freeze_frame(image)
+        try:
+            yield snapshot
+        finally:
+            self.unfreeze_frame()
     
     def wait_until_text_shown(self, text, filter_args_in_parent=None, parent_control = None, search_in_image = None, timeout = 30):
         '''
@@ -720,16 +947,33 @@ class RPALite:
         '''
 
         start_time = datetime.now()
-        while(True):
-            location = self.find_text_positions(text, filter_args_in_parent, parent_control, search_in_image)
-            if(location is not None):
-                return location[0] 
-            else:
-                diff = datetime.now() - start_time
-                if(diff.seconds > timeout):
+        text_change_detector = self._create_text_change_detector(filter_args_in_parent)
+        location = None
+        # OCR requests running in worker processes are cancelled when the timeout is reached
+        with self.image_handler.ocr_deadline(timeout + 1):
+            while(True):
+                if search_in_image is None:
+                    search_in_image = self.take_screenshot()
+                try:
+                    # While no text of the screen changes, the text is still not shown
+                    if text_change_detector is None or text_change_detector.has_changed(search_in_image):
+                        location = self.find_text_positions(text, filter_args_in_parent, parent_control, search_in_image)
+                except TimeoutError:
                     raise AssertionError('Timeout waiting for text: ' + text)
-                self.sleep(1)
-                search_in_image = None
+                if(location is not None):
+                    return location[0] 
+                else:
+                    diff = datetime.now() - start_time
+                    if(diff.seconds > timeout):
+                        raise AssertionError('Timeout waiting for text: ' + text)
+                    self.sleep(1)
+                    search_in_image = None
+
+    def _create_text_change_detector(self, filter_args_in_parent):
+        # The windows used to filter texts may change without any text changing, so the detector is only used without filters
+        if filter_args_in_parent is not None:
+            return None
+        return self.image_handler.create_text_change_detector()
 
     def wait_until_text_disappears(self, text, filter_args_in_parent=None, parent_control = None, search_in_image = None, timeout = 30):
         """
@@ -754,16 +998,27 @@ class RPALite:
 
         """
         start_time = datetime.now()
-        while(True):
-            disappear_text= self.find_text_positions(text, filter_args_in_parent, parent_control, search_in_image)
-            if disappear_text is None:
-                return
-            else:
-                diff = datetime.now() - start_time
-                if diff.seconds > timeout:
+        text_change_detector = self._create_text_change_detector(filter_args_in_parent)
+        disappear_text = None
+        # OCR requests running in worker processes are cancelled when the timeout is reached
+        with self.image_handler.ocr_deadline(timeout + 1):
+            while(True):
+                if search_in_image is None:
+                    search_in_image = self.take_screenshot()
+                try:
+                    # While no text of the screen changes, the text is still shown
+                    if text_change_detector is None or text_change_detector.has_changed(search_in_image):
+                        disappear_text= self.find_text_positions(text, filter_args_in_parent, parent_control, search_in_image)
+                except TimeoutError:
                     raise AssertionError('Timeout waiting for text disappears: ' + text)
-                self.sleep(1)
-                search_in_image = None
+                if disappear_text is None:
+                    return
+                else:
+                    diff = datetime.now() - start_time
+                    if diff.seconds > timeout:
+                        raise AssertionError('Timeout waiting for text disappears: ' + text)
+                    self.sleep(1)
+                    search_in_image = None
 
     def validate_text_exists(self, text, filter_args_in_parent=None, parent_control = None, img = None, throw_exception_when_failed = True):
         '''Validate if a specific text exists in the current screen. If the text exists, this function will return the position of the text; otherwise it will raise an AssertionError.
@@ -825,7 +1080,28 @@ class RPALite:
         '''
         if img is None:
             img = self.take_screenshot()
-        
+        img = Snapshot.wrap(img)
+
+        cache = self.locator_cache
+        if cache is not None:
+            cache_key = ('text', text, repr(filter_args_in_parent), repr(parent_control), exact_match)
+            positions = cache.get(cache_key, img)
+            if positions is not None:
+                return list(positions)
+            positions = self._find_text_positions(text, filter_args_in_parent, parent_control, img, exact_match)
+            if positions:
+                cache.put(cache_key, img, positions, list(positions))
+            return positions
+        return self._find_text_positions(text, filter_args_in_parent, parent_control, img, exact_match)
+
+    def _find_text_positions(self, text, filter_args_in_parent, parent_control, img, exact_match):
+        matches = self._find_text_matches(text, filter_args_in_parent, parent_control, img, exact_match)
+        if matches is None:
+            return None
+        return [loc[0] for loc in matches]
+
+    def _find_text_matches(self, text, filter_args_in_parent, parent_control, img, exact_match):
+        # Returns the (location, matched text, score) results of text, or None
         locations = self.image_handler.find_texts_in_rects(img, text, filter_args_in_parent, parent_control)
         if(locations is None or len(locations) == 0):
             return None
@@ -845,11 +1121,128 @@ class RPALite:
                 filtered_locations.append(loc)
             
             if filtered_locations:
-                return [loc[0] for loc in filtered_locations]
+                return filtered_locations
 
             return None
         else:
-            return [loc[0] for loc in locations]
+            return locations
+
+    def find_texts_positions(self, texts, filter_args_in_parent=None, parent_control = None, img = None, exact_match=False):
+        '''Finds several texts in the current screen. The screen is captured and recognized only once, and every text is searched in the same OCR result, which is much faster than calling find_text_positions() for each text.
+
+        Parameters
+        ----------
+        texts : list
+            The texts to search for.
+
+        filter_args_in_parent : dict
+            The filter arguments to filter the parent control, see find_text_positions().
+
+        parent_control : uiautomation control
+            The parent control to search in. If not specified, the function will search all controls.
+
+        img : PIL.Image
+            The image to search in. If not specified, the function will take a screenshot and search in the screenshot.
+
+        exact_match : bool
+            If True, only the texts matching exactly are returned, like in validate_text_exists().
+
+        Returns
+        -------
+        dict
+            The results by searched text. Each result is a list of (location, score) tuples, best match first, where location is a tuple of (x, y, width, height) and score is the match ratio (1 if the text was found as is). The result of a text which is not found is None.
+        '''
+        if isinstance(texts, str):
+            texts = [texts]
+        if img is None:
+            img = self.take_screenshot()
+        img = Snapshot.wrap(img)
+        if len(texts) > 1:
+            # One full recognition shared by all the queries, instead of partial recognitions for each query
+            self.image_handler.read_text(img)
+
+        results = {}
+        for text in texts:
+            if text in results:
+                continue
+            matches = self._find_text_matches(text, filter_args_in_parent, parent_control, img, exact_match)
+            results[text] = [(loc[0], loc[2]) for loc in matches] if matches else None
+        return results
+
+    def wait_until_any_text_shown(self, texts, filter_args_in_parent=None, parent_control = None, timeout = 30):
+        '''
+        Waits until at least one of the texts is shown in the current screen. Each poll takes one screenshot and recognizes it once for all the texts.
+
+        Parameters
+        ----------
+        texts : list
+            The texts to wait for.
+
+        filter_args_in_parent : dict
+            The filter arguments to filter the parent control, see find_text_positions().
+
+        parent_control : uiautomation control
+            The parent control to search in. If not specified, the function will search all controls.
+
+        timeout : int
+            The timeout in seconds. If none of the texts is found within the timeout, an AssertionError will be raised.
+
+        Returns
+        -------
+        dict
+            The results by searched text, see find_texts_positions(). At least one of the texts has a result.
+        '''
+        return self._wait_until_texts_shown(texts, filter_args_in_parent, parent_control, timeout, any)
+
+    def wait_until_all_texts_shown(self, texts, filter_args_in_parent=None, parent_control = None, timeout = 30):
+        '''
+        Waits until all the texts are shown in the same screen. Each poll takes one screenshot and recognizes it once for all the texts.
+
+        Parameters
+        ----------
+        texts : list
+            The texts to wait for.
+
+        filter_args_in_parent : dict
+            The filter arguments to filter the parent control, see find_text_positions().
+
+        parent_control : uiautomation control
+            The parent control to search in. If not specified, the function will search all controls.
+
+        timeout : int
+            The timeout in seconds. If some texts are still not found after the timeout, an AssertionError will be raised.
+
+        Returns
+        -------
+        dict
+            The results by searched text, see find_texts_positions().
+        '''
+        return self._wait_until_texts_shown(texts, filter_args_in_parent, parent_control, timeout, all)
+
+    def _wait_until_texts_shown(self, texts, filter_args_in_parent, parent_control, timeout, condition):
+        if isinstance(texts, str):
+            texts = [texts]
+        timeout = float(timeout)
+        start_time = datetime.now()
+        text_change_detector = self._create_text_change_detector(filter_args_in_parent)
+        results = {text: None for text in texts}
+        # OCR requests running in worker processes are cancelled when the timeout is reached
+        with self.image_handler.ocr_deadline(timeout + 1):
+            while(True):
+                search_in_image = self.take_screenshot()
+                try:
+                    # While no text of the screen changes, the results are still the same
+                    if text_change_detector is None or text_change_detector.has_changed(search_in_image):
+                        results = self.find_texts_positions(texts, filter_args_in_parent, parent_control, search_in_image)
+                except TimeoutError:
+                    raise AssertionError('Timeout waiting for texts: ' + ', '.join(texts))
+                if condition(result is not None for result in results.values()):
+                    return results
+                diff = datetime.now() - start_time
+                if(diff.seconds > timeout):
+                    missing = [text for text, result in results.items() if result is None]
+                    raise AssertionError('Timeout waiting for texts: ' + ', '.join(missing))
+                self.sleep(1)
 
 
     def find_application(self, title=None, class_name=None):
@@ -998,10 +1391,18 @@ class RPALite:
         if(isinstance(location_description, str)):
             if location_description.startswith('image:'):
                 path = location_description.split('image:')[1]
-                img = PIL.Image.open(path)
                 if parent_image is None:
                     parent_image = self.take_screenshot()
-                return self.image_handler.find_image_location(img, parent_image)
+                cache = self.locator_cache
+                if cache is not None:
+                    location = cache.get(('image', path), parent_image)
+                    if location is not None:
+                        return location
+                img = PIL.Image.open(path)
+                location = self.image_handler.find_image_location(img, parent_image)
+                if cache is not None and location is not None:
+                    cache.put(('image', path), parent_image, [location], location)
+                return location
             
             if location_description.startswith('automateId:'):
                 automate_id = location_description.split('automateId:')[1]
@@ -1284,6 +1685,111 @@ class RPALite:
         sleep_seconds = sleep if sleep is not None else self.step_pause_interval
         self.sleep(sleep_seconds)
 
+    def scroll_until_text_shown(self, text, region = None, max_scrolls = 20, times = -3, settle_timeout = 2):
+        '''
+        Scrolls the mouse wheel over a region (like a list) until a text is shown in the region, and returns the location of the text.
+
+        Instead of sleeping a fixed time after each scroll, the function polls the region until its content stopped moving. It then estimates how far the content moved and only recognizes the newly revealed band. If the content does not move after a scroll, the end of the list is reached and an AssertionError is raised.
+
+        It cannot be called while a frame is frozen with freeze_frame() or frozen_frame(), because the frozen frame hides the scrolled content.
+
+        Parameters
+        ----------
+        text : str
+            The text to scroll to.
+
+        region : tuple
+            The (x, y, width, height) region to scroll in and search, in screenshot coordinates. If not specified, the whole screen is used.
+
+        max_scrolls : int
+            The maximum number of scrolls. If the text is still not shown after them, an AssertionError will be raised.
+
+        times : int
+            The number of wheel steps of each scroll, see scroll(). Negative values scroll down, positive values scroll up.
+
+        settle_timeout : float
+            The time in seconds to wait for the content to move after a scroll.
+
+        Returns
+        -------
+        tuple
+            The location of the text in the screen. The location is a tuple of (x, y, width, height).
+        '''
+        max_scrolls = int(max_scrolls)
+        times = int(times)
+        settle_timeout = float(settle_timeout)
+        if self._frozen_snapshots:
+            raise AssertionError('Cannot scroll to text while a frame is frozen, call unfreeze_frame() first')
+        snapshot = self.take_screenshot()
+        if snapshot is None:
+            raise AssertionError('Cannot scroll to text: failed to take screenshot')
+        region = self._to_region(region, snapshot.size)
+
+        location = self.image_handler.find_texts_in_image(snapshot, text, rect=region)
+        if location:
+            return location[0][0]
+
+        x, y, width, height = region
+        self.mouse_move(*self._scale_coordinates_to_logical(x + width // 2, y + height // 2))
+        previous = self._crop_gray(snapshot, region)
+        for i in range(max_scrolls):
+            self.scroll(times, sleep=-1)
+            settled = self._wait_until_region_settles(region, previous, settle_timeout)
+            if settled is None:
+                raise AssertionError(f'Text not found before the end of the scrolled content: {text}')
+            snapshot, current = settled
+
+            shift = estimate_shift(previous, current)
+            search_rect = self._revealed_band(region, shift) if shift is not None else region
+            logger.debug(f'Scroll {i + 1}: content moved by {shift}, searching {search_rect}')
+            location = self.image_handler.find_texts_in_image(snapshot, text, rect=search_rect)
+            if location:
+                return location[0][0]
+            previous = current
+        raise AssertionError(f'Text not found after {max_scrolls} scrolls: {text}')
+
+    def _to_region(self, region, size):
+        if region is None:
+            return (0, 0, size[0], size[1])
+        if isinstance(region, str):
+            # Robot Framework passes the region as a string like "(10, 20, 300, 400)"
+            region = region.strip('()[] ').split(',')
+        return tuple(int(float(v)) for v in region)
+
+    def _crop_gray(self, snapshot, region):
+        x, y, width, height = region
+        return snapshot.gray[y:y + height, x:x + width]
+
+    def _wait_until_region_settles(self, region, previous, timeout, interval = 0.05):
+        # Returns the snapshot and the grayscale region once the region changed and two following frames are equal
+        # (smooth scrolling animates the content over several frames), or None if the region did not change
+        start = time.monotonic()
+        moved = None
+        while time.monotonic() - start <= timeout:
+            snapshot = self.take_screenshot()
+            current = self._crop_gray(snapshot, region)
+            if moved is not None and cv2.absdiff(current, moved[1]).max() == 0:
+                break
+            if moved is not None or cv2.absdiff(current, previous).max() > 0:
+                moved = (snapshot, current)
+            time.sleep(interval)
+        if moved is None or cv2.absdiff(moved[1], previous).max() == 0:
+            # Nothing moved, or the content bounced back at the end of the list
+            return None
+        return moved
+
+    def _revealed_band(self, region, shift, margin = 48):
+        # The part of the region that was not visible before the content moved by shift. The band is extended by a
+        # margin into the old content, because the lines cut by the region border were not readable before.
+        x, y, width, height = region
+        dx, dy = shift
+        if dx != 0 or dy == 0:
+            return region
+        band = min(height, abs(dy) + margin)
+        if dy < 0:
+            return (x, y + height - band, width, band)
+        return (x, y, width, band)
+
     def mouse_move(self, x:int, y:int):
         if self.platform == 'Darwin':
             pyautogui.moveTo(x, y)
@@ -1499,7 +2005,7 @@ class RPALite:
             Label or name of the field to get text from
         '''
         img = self.take_screenshot()
-        location = self.find_control_by_label(field_name)
+        location = self.find_control_by_label(field_name, img)
         if(location is None):
             logger.error('Cannot find field:', field_name)
             return ''
@@ -0,0 +1,113 @@
+import threading
+import cv2
+import numpy as np
+import logging
+from .ocr_result import OcrResult
+from .ocr_handler import OCRHandlerWrapper
+
+logger = logging.getLogger(__name__)
+
+
+class ScaledOCRHandler(OCRHandlerWrapper):
+    '''
+    Wraps an OCR handler and downsamples images before recognition, mapping the boxes back to the original pixels.
+
+    On high DPI displays screenshots have 1.5x or 2x the logical resolution, which costs 2.25x to 4x the OCR compute
+    for texts that are perfectly legible at the logical resolution. The resolution policy decides the scale:
+
+    - 'full': the image is recognized as it is.
+    - 'auto': the image is scaled to the logical resolution if a display scale was set with set_display_scale().
+      Otherwise it is scaled so that the median text height of the previous result becomes target_text_height.
+    - a number between 0 and 1: the image is always scaled by this factor.
+    '''
+
+    def __init__(self, ocr_handler, resolution='auto', target_text_height: int = 24, min_scale: float = 0.5,
+                 debug_mode: bool = False):
+        '''
+        Parameters
+        ----------
+        ocr_handler : OCRHandler
+            The handler recognizing the scaled images.
+
+        resolution : str or float
+            The resolution policy: 'full', 'auto' or a fixed scale factor.
+
+        target_text_height : int
+            In 'auto' mode without a display scale, texts taller than this are downsampled to about this height.
+
+        min_scale : float
+            The smallest scale factor 'auto' mode uses.
+        '''
+        if isinstance(resolution, str) and resolution not in ('full', 'auto'):
+            # Robot Framework passes numbers as strings
+            try:
+                resolution = float(resolution)
+            except ValueError:
+                pass
+        if not (resolution in ('full', 'auto') or (isinstance(resolution, (int, float)) and 0 < resolution <= 1)):
+            raise ValueError(f"Invalid OCR resolution: {resolution}. Use 'full', 'auto' or a number between 0 and 1")
+        super().__init__(ocr_handler, debug_mode)
+        self.resolution = resolution
+        self.target_text_height = target_text_height
+        self.min_scale = min_scale
+        self._display_scale = None
+        self._median_text_height = None
+        self._lock = threading.Lock()
+
+    def set_display_scale(self, scale_x, scale_y):
+        '''Sets the ratio between the physical and the logical resolution of the display.'''
+        with self._lock:
+            if scale_x and scale_y and (scale_x > 1.01 or scale_y > 1.01):
+                self._display_scale = (scale_x, scale_y)
+            else:
+                self._display_scale = None
+
+    def get_scale(self):
+        '''Returns the (scale_x, scale_y) factors the next image will be resized with.'''
+        if self.resolution == 'full':
+            return 1.0, 1.0
+        if self.resolution != 'auto':
+            return float(self.resolution), float(self.resolution)
+        with self._lock:
+            if self._display_scale is not None:
+                return (max(self.min_scale, 1.0 / self._display_scale[0]),
+                        max(self.min_scale, 1.0 / self._display_scale[1]))
+            if self._median_text_height and self._median_text_height > self.target_text_height:
+                scale = max(self.min_scale, self.target_text_height / self._median_text_height)
+                return scale, scale
+        return 1.0, 1.0
+
+    def find_texts_in_image(self, image):
+        if isinstance(image, np.ndarray):
+            img_array = image
+        else:
+            img_array = np.array(image)
+
+        scale_x, scale_y = self.get_scale()
+        height, width = img_array.shape[:2]
+        scaled_width = max(1, int(round(width * scale_x)))
+        scaled_height = max(1, int(round(height * scale_y)))
+        if scaled_width == width and scaled_height == height:
+            result = self.ocr_handler.find_texts_in_image(img_array)
+        else:
+            if self.debug_mode:
+                logger.debug(f"OCR on image downsampled from {width}x{height} to {scaled_width}x{scaled_height}")
+            scaled = cv2.resize(img_array, (scaled_width, scaled_height), interpolation=cv2.INTER_AREA)
+            result = self.ocr_handler.find_texts_in_image(scaled)
+            if result is not None:
+                # Map the boxes back to the pixels of the original image
+                factor_x = width / scaled_width
+                factor_y = height / scaled_height
+                result = OcrResult.from_list(result)
+                result = OcrResult(result.boxes * np.array([factor_x, factor_y]), result.confidences, result.texts)
+
+        self._update_text_height(result)
+        return result
+
+    def _update_text_height(self, result):
+        if not result:
+            return
+        bounds = OcrResult.from_list(result).bounds()
+        heights = np.sort(bounds[:, 3] - bounds[:, 1])
+        with self._lock:
+            self._median_text_height = int(heights[len(heights) // 2])
@@ -0,0 +1,112 @@
+import threading
+import time
+import cv2
+import numpy as np
+import logging
+from .layout import FrameLayout
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot:
+    '''
+    A single captured frame of the screen (or any image) together with the analysis results computed from it.
+
+    Everything derived from the pixels - the numpy array, the grayscale image, the Canny edges, the contours, the layout
+    and the OCR result - is computed lazily the first time it is needed and then cached on the snapshot. Passing the same
+    snapshot to several ImageHandler methods therefore pays for each analysis only once.
+
+    A snapshot behaves like the PIL image it wraps: attributes such as size, mode, save() or crop() are forwarded to
+    the image and np.array(snapshot) returns the pixel array. This keeps code written against the PIL images that
+    RPALite used to return working unchanged.
+    '''
+
+    def __init__(self, image, timestamp: float = None):
+        if isinstance(image, Snapshot):
+            image = image.image
+        self.image = image
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self._cache = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def wrap(cls, image):
+        '''Returns image itself if it is already a Snapshot, otherwise a new Snapshot wrapping it. None stays None.'''
+        if image is None or isinstance(image, Snapshot):
+            return image
+        return cls(image)
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the snapshot itself. Forward them to the wrapped PIL image.
+        if name.startswith('_') or name == 'image':
+            raise AttributeError(name)
+        return getattr(self.image, name)
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.array
+        if dtype is not None:
+            return array.astype(dtype)
+        # Hand out a copy so that callers cannot modify the cached array
+        return array.copy()
+
+    def __repr__(self):
+        return f"<Snapshot size={getattr(self.image, 'size', None)} timestamp={self.timestamp}>"
+
+    def memoize(self, key, factory, cache_none: bool = True):
+        '''
+        Returns the value cached under key, computing it with factory() on the first call.
+
+        Parameters
+        ----------
+        key : hashable
+            The cache key. Callers should use tuples starting with a descriptive name, like ('ocr', ...).
+
+        factory : callable
+            A function without parameters that computes the value.
+
+        cache_none : bool
+            If False, a None value (like a failed recognition) is not cached, so the next call computes it again.
+        '''
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+            value = factory()
+            if value is not None or cache_none:
+                self._cache[key] = value
+            return value
+
+    def is_cached(self, key):
+        '''Returns True if a value is already cached under key.'''
+        with self._lock:
+            return key in self._cache
+
+    def clear_cache(self):
+        '''Drops every cached analysis result of this snapshot.'''
+        with self._lock:
+            self._cache.clear()
+
+    @property
+    def array(self):
+        '''The pixels of the image as a numpy array (RGB order for screenshots). Do not modify the returned array.'''
+        return self.memoize(('array',), lambda: np.array(self.image))
+
+    @property
+    def gray(self):
+        '''The grayscale version of the image, computed the same way ImageHandler always did it.'''
+        return self.memoize(('gray',), lambda: cv2.cvtColor(self.array, cv2.COLOR_BGR2GRAY))
+
+    def edges(self, threshold1=50, threshold2=200, aperture_size=5):
+        '''Returns the Canny edges of the grayscale image for the given thresholds.'''
+        return self.memoize(('edges', threshold1, threshold2, aperture_size),
+                            lambda: cv2.Canny(self.gray, threshold1, threshold2, apertureSize=aperture_size))
+
+    def contours(self, threshold1=50, threshold2=200, aperture_size=5):
+        '''Returns the (contours, hierarchy) tuple found on the Canny edges for the given thresholds.'''
+        return self.memoize(('contours', threshold1, threshold2, aperture_size),
+                            lambda: cv2.findContours(self.edges(threshold1, threshold2, aperture_size),
+                                                     cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE))
+
+    def layout(self, threshold1=50, threshold2=200, aperture_size=5):
+        '''Returns the FrameLayout (edges, contours, polygons and lines) of the image for the given Canny thresholds.'''
+        return self.memoize(('layout', threshold1, threshold2, aperture_size),
+                            lambda: FrameLayout(self, threshold1, threshold2, aperture_size))
@@ -0,0 +1,134 @@
+import math
+from collections import defaultdict
+import numpy as np
+
+
+class SpatialIndex:
+    '''
+    A uniform grid over (x, y, width, height) rectangles, like the text boxes or the contour rects of a frame, answering
+    the geometric queries of the locators without testing every rectangle:
+
+    - stab(): the rectangles containing a point,
+    - containing(): the rectangles containing a rectangle (the windows around a text),
+    - within(): the rectangles inside a rectangle (the texts of a window),
+    - intersecting(): the rectangles overlapping a rectangle,
+    - nearest(): the rectangles closest to a point.
+
+    Each rectangle is registered in the grid cells it overlaps. Rectangles covering more than max_cells cells (like
+    the frames of windows) are kept in a separate list that every query checks with one vectorized test. Rectangles
+    touching on their borders count as overlapping, and borders are inside, like in ImageHandler.check_point_inide_rect().
+    All the queries return the indexes of the rectangles in ascending order, which is the order they were given in.
+    '''
+
+    def __init__(self, rects, cell_size: int = 64, max_cells: int = 64):
+        '''
+        Parameters
+        ----------
+        rects : list
+            The (x, y, width, height) rectangles. Points can be indexed as rectangles of size 0.
+
+        cell_size : int
+            The size in pixels of the grid cells.
+
+        max_cells : int
+            Rectangles covering more cells are not registered in the grid.
+        '''
+        self.rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        large = []
+        if len(self.rects):
+            first = np.floor(self.rects[:, :2] / cell_size).astype(np.int64)
+            last = np.floor((self.rects[:, :2] + self.rects[:, 2:]) / cell_size).astype(np.int64)
+            for i, ((x0, y0), (x1, y1)) in enumerate(zip(first.tolist(), last.tolist())):
+                if (x1 - x0 + 1) * (y1 - y0 + 1) > max_cells:
+                    large.append(i)
+                    continue
+                for cx in range(x0, x1 + 1):
+                    for cy in range(y0, y1 + 1):
+                        self._cells[(cx, cy)].append(i)
+            self._bounds = (int(first[:, 0].min()), int(first[:, 1].min()), int(last[:, 0].max()), int(last[:, 1].max()))
+        self._large = np.array(large, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def _cell(self, value):
+        return math.floor(value / self.cell_size)
+
+    def _candidates(self, rect):
+        # The indexes of the rectangles that may overlap rect: the ones of the cells it covers and the large ones
+        found = set()
+        for cx in range(self._cell(rect[0]), self._cell(rect[0] + rect[2]) + 1):
+            for cy in range(self._cell(rect[1]), self._cell(rect[1] + rect[3]) + 1):
+                found.update(self._cells.get((cx, cy), ()))
+        if found:
+            return np.union1d(np.fromiter(found, dtype=np.intp, count=len(found)), self._large)
+        return self._large
+
+    def stab(self, point):
+        '''Returns the indexes of the rectangles containing the (x, y) point.'''
+        return self.containing((point[0], point[1], 0, 0))
+
+    def containing(self, rect):
+        '''Returns the indexes of the rectangles containing the (x, y, width, height) rect.'''
+        # A rectangle containing rect contains its top left corner, so only the cell of that corner is searched
+        candidates = self._candidates((rect[0], rect[1], 0, 0))
+        r = self.rects[candidates]
+        mask = (r[:, 0] <= rect[0]) & (r[:, 1] <= rect[1]) & \
+            (r[:, 0] + r[:, 2] >= rect[0] + rect[2]) & (r[:, 1] + r[:, 3] >= rect[1] + rect[3])
+        return candidates[mask]
+
+    def within(self, rect):
+        '''Returns the indexes of the rectangles inside the (x, y, width, height) rect.'''
+        candidates = self._candidates(rect)
+        r = self.rects[candidates]
+        mask = (r[:, 0] >= rect[0]) & (r[:, 1] >= rect[1]) & \
+            (r[:, 0] + r[:, 2] <= rect[0] + rect[2]) & (r[:, 1] + r[:, 3] <= rect[1] + rect[3])
+        return candidates[mask]
+
+    def intersecting(self, rect):
+        '''Returns the indexes of the rectangles overlapping the (x, y, width, height) rect.'''
+        candidates = self._candidates(rect)
+        r = self.rects[candidates]
+        mask = (r[:, 0] <= rect[0] + rect[2]) & (rect[0] <= r[:, 0] + r[:, 2]) & \
+            (r[:, 1] <= rect[1] + rect[3]) & (rect[1] <= r[:, 1] + r[:, 3])
+        return candidates[mask]
+
+    def distances(self, point, indexes=None):
+        '''Returns the distances from the (x, y) point to the rectangles (0 for the rectangles containing it), or to the rectangles of indexes.'''
+        r = self.rects if indexes is None else self.rects[indexes]
+        dx = np.maximum(np.maximum(r[:, 0] - point[0], point[0] - r[:, 0] - r[:, 2]), 0)
+        dy = np.maximum(np.maximum(r[:, 1] - point[1], point[1] - r[:, 1] - r[:, 3]), 0)
+        return np.hypot(dx, dy)
+
+    def nearest(self, point, k: int = 1, max_distance: float = None):
+        '''
+        Returns the indexes of the k rectangles closest to the (x, y) point, closest first, ignoring the rectangles
+        farther than max_distance. Rectangles at the same distance are returned in ascending order.
+        '''
+        if len(self.rects) == 0 or k <= 0:
+            return np.zeros(0, dtype=np.intp)
+        cx, cy = self._cell(point[0]), self._cell(point[1])
+        min_x, min_y, max_x, max_y = self._bounds
+        # Every cell of the grid is within this ring radius of the point
+        last_ring = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+        seen = set(self._large.tolist())
+        ring = 0
+        while True:
+            for x in range(cx - ring, cx + ring + 1):
+                for y in range(cy - ring, cy + ring + 1):
+                    if max(abs(x - cx), abs(y - cy)) == ring:
+                        seen.update(self._cells.get((x, y), ()))
+            # The rectangles outside the searched rings are at least ring cells away from the point
+            reach = ring * self.cell_size
+            exhausted = ring >= last_ring or (max_distance is not None and reach > max_distance)
+            if len(seen) >= k or exhausted:
+                candidates = np.array(sorted(seen), dtype=np.intp)
+                distances = self.distances(point, candidates)
+                order = np.argsort(distances, kind='stable')[:k]
+                if exhausted or (len(order) == k and distances[order[-1]] < reach):
+                    if max_distance is not None:
+                        order = order[distances[order] <= max_distance]
+                    return candidates[order]
+            ring += 1
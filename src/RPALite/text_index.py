@@ -0,0 +1,104 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class TextIndex:
+    '''
+    An index of the texts of one OCR result, answering many text searches without comparing the query with every text.
+
+    A search returns the texts containing the query, and the other texts whose SequenceMatcher ratio with the query is
+    above min_ratio, with the same results as comparing the query with each text:
+
+    - The texts containing the query are the texts having all the bigrams of the query, taken from an inverted index,
+      then checked with the in operator.
+    - A ratio above 0.75 needs at least one common bigram, except for very short texts, so only the texts sharing a
+      bigram with the query and the short texts are compared. Each comparison stops early at the cheap upper bounds
+      real_quick_ratio() and quick_ratio() of SequenceMatcher, like difflib.get_close_matches().
+
+    The results of each query are remembered, so searching the same text again only costs a lookup.
+    '''
+
+    def __init__(self, texts):
+        '''
+        Parameters
+        ----------
+        texts : list
+            The indexed texts, usually the texts of an OCR result in its order.
+        '''
+        self.texts = [text if isinstance(text, str) else str(text) for text in texts]
+        self._postings = defaultdict(list)
+        self._chars = defaultdict(list)
+        self._by_length = defaultdict(list)
+        for i, text in enumerate(self.texts):
+            for gram in _bigrams(text):
+                self._postings[gram].append(i)
+            for char in set(text):
+                self._chars[char].append(i)
+            self._by_length[len(text)].append(i)
+        self._searches = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def containing(self, query):
+        '''Returns the ascending indexes of the texts containing query.'''
+        if not query:
+            return list(range(len(self.texts)))
+        if len(query) < 2:
+            postings = [self._chars.get(char, []) for char in set(query)]
+        else:
+            postings = [self._postings.get(gram, []) for gram in _bigrams(query)]
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return sorted(i for i in candidates if query in self.texts[i])
+
+    def similar(self, query, min_ratio: float = 0.75, skip=()):
+        '''Returns a dict of the SequenceMatcher ratios above min_ratio of the texts with query, by text index. The indexes in skip are not compared.'''
+        candidates = set()
+        for gram in _bigrams(query):
+            candidates.update(self._postings.get(gram, ()))
+        if len(query) < 2 or min_ratio < 0.75:
+            # Without common bigrams the ratio is bounded only for longer texts, so compare all the texts
+            candidates = range(len(self.texts))
+        else:
+            # Up to two matching characters without a common bigram give a ratio above 0.75 for texts of 5 characters
+            # together, like "ab" and "a-b"
+            for length in range(0, 6 - len(query)):
+                candidates.update(self._by_length.get(length, ()))
+
+        # SequenceMatcher caches the analysis of its second sequence, so the query is set once
+        matcher = SequenceMatcher(None)
+        matcher.set_seq2(query)
+        ratios = {}
+        for i in candidates:
+            if i in skip:
+                continue
+            matcher.set_seq1(self.texts[i])
+            if matcher.real_quick_ratio() > min_ratio and matcher.quick_ratio() > min_ratio:
+                ratio = matcher.ratio()
+                if ratio > min_ratio:
+                    ratios[i] = ratio
+        return ratios
+
+    def search(self, query, min_ratio: float = 0.75):
+        '''
+        Returns the (index, contained, ratio) tuples of the texts containing query or similar to it, in the order of the
+        texts. contained is True for the texts containing query, whose ratio is not computed and reported as 1.
+        '''
+        key = (query, min_ratio)
+        results = self._searches.get(key)
+        if results is None:
+            scores = {i: (True, 1) for i in self.containing(query)}
+            for i, ratio in self.similar(query, min_ratio, scores).items():
+                scores[i] = (False, ratio)
+            results = [(i, contained, ratio) for i, (contained, ratio) in sorted(scores.items())]
+            self._searches[key] = results
+        return results
@@ -0,0 +1,174 @@
+import threading
+import cv2
+import numpy as np
+import logging
+from .ocr_utils import expand_rect, merge_rects, offset_result
+from .ocr_result import OcrResult
+from .ocr_handler import OCRHandlerWrapper
+
+logger = logging.getLogger(__name__)
+
+
+def to_gray(img_array):
+    '''Returns the grayscale version of an RGB, RGBA or grayscale image array.'''
+    if img_array.ndim == 2:
+        return img_array
+    if img_array.shape[2] == 4:
+        return cv2.cvtColor(img_array, cv2.COLOR_RGBA2GRAY)
+    return cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+
+
+def text_mask(gray, min_contrast: int = 40):
+    '''
+    Returns a binary mask of the pixels that probably belong to text lines.
+
+    The morphological gradient is large on the strokes of characters and small on flat panels and smooth gradients.
+    It is thresholded, and the characters of a line are joined by a closing with a wide flat kernel.
+    '''
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, mask = cv2.threshold(gradient, min_contrast, 255, cv2.THRESH_BINARY)
+    return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+
+
+def find_text_regions(img_array, min_height: int = 6, max_height: int = 200, min_width: int = 4,
+                      min_fill: float = 0.3, min_contrast: int = 40):
+    '''
+    Returns the (x, y, width, height) rectangles of the probable text lines of an image, without running OCR.
+
+    Parameters
+    ----------
+    min_height, max_height : int
+        Height range in pixels of a text line. Smaller blobs are noise, larger blobs are pictures or panels.
+
+    min_width : int
+        Minimum width in pixels of a text line.
+
+    min_fill : float
+        Minimum share of the rectangle covered by strokes. Lines, frame borders and filled panels have a low fill.
+
+    min_contrast : int
+        Minimum difference between a stroke and its background.
+    '''
+    mask = text_mask(to_gray(img_array), min_contrast)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    regions = []
+    for x, y, w, h, area in stats[1:count]:
+        if h < min_height or h > max_height or w < min_width:
+            continue
+        if area < min_fill * w * h:
+            continue
+        regions.append((int(x), int(y), int(w), int(h)))
+    return regions
+
+
+class TextPrefilterOCRHandler(OCRHandlerWrapper):
+    '''
+    Wraps an OCR handler and only recognizes the parts of the image that may contain text.
+
+    Large parts of a typical screen are pictures, gradients or empty panels, which the deep OCR detector still
+    processes pixel by pixel. This class proposes candidate text regions with cheap OpenCV operations (see
+    find_text_regions()), groups them into blocks grown by a margin and recognizes each block on its own. Images without
+    any candidate region are not recognized at all. If the blocks cover most of the image, or if there are too many of
+    them, the whole image is recognized as usual.
+    '''
+
+    def __init__(self, ocr_handler, margin: int = 12, max_area_ratio: float = 0.6, max_regions: int = 12,
+                 debug_mode: bool = False):
+        '''
+        Parameters
+        ----------
+        ocr_handler : OCRHandler
+            The handler recognizing the blocks.
+
+        margin : int
+            Pixels added around each candidate text line. Lines closer than twice the margin are recognized together.
+
+        max_area_ratio : float
+            If the blocks cover a larger share of the image, the whole image is recognized instead.
+
+        max_regions : int
+            If there are more blocks, the whole image is recognized instead.
+        '''
+        super().__init__(ocr_handler, debug_mode)
+        self.margin = margin
+        self.max_area_ratio = max_area_ratio
+        self.max_regions = max_regions
+
+    def find_blocks(self, img_array):
+        '''Returns the non overlapping (x, y, width, height) blocks of the image that should be recognized.'''
+        height, width = img_array.shape[:2]
+        return merge_rects(expand_rect(rect, self.margin, width, height) for rect in find_text_regions(img_array))
+
+    def find_texts_in_image(self, image):
+        if isinstance(image, np.ndarray):
+            img_array = image
+        else:
+            img_array = np.array(image)
+
+        height, width = img_array.shape[:2]
+        blocks = self.find_blocks(img_array)
+        if not blocks:
+            if self.debug_mode:
+                logger.debug("No text candidates found, OCR skipped")
+            return None
+        if len(blocks) > self.max_regions or sum(w * h for _, _, w, h in blocks) > self.max_area_ratio * width * height:
+            return self.ocr_handler.find_texts_in_image(img_array)
+
+        if self.debug_mode:
+            logger.debug(f"OCR on {len(blocks)} text candidate blocks: {blocks}")
+        result = []
+        for x, y, w, h in blocks:
+            crop = np.ascontiguousarray(img_array[y:y + h, x:x + w])
+            block_result = self.ocr_handler.find_texts_in_image(crop)
+            if block_result:
+                result.append(offset_result(block_result, x, y))
+        if not result:
+            return None
+        # Keep the reading order of a full frame recognition: top to bottom, then left to right
+        return OcrResult.concat(result).sorted()
+
+
+class TextChangeDetector:
+    '''
+    Tells cheaply whether the texts of the screen may have changed since the previous frame, so that polling loops can
+    skip OCR while only pictures, animations or the mouse cursor change.
+
+    The pixels inside the candidate text lines of both frames (see find_text_regions()) are compared. A frame of a
+    different size always counts as changed.
+    '''
+
+    def __init__(self, pixel_threshold: int = 32, min_changed_pixels: int = 8):
+        '''
+        Parameters
+        ----------
+        pixel_threshold : int
+            Minimum difference of a grayscale pixel value to consider the pixel as changed.
+
+        min_changed_pixels : int
+            Minimum number of changed text pixels to report a change. This ignores compression noise.
+        '''
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        '''Forgets the previous frame, so that the next frame counts as changed.'''
+        with self._lock:
+            self._previous = None
+
+    def has_changed(self, image):
+        '''Returns True if the texts of image may differ from the texts of the frame passed in the previous call.'''
+        gray = to_gray(image if isinstance(image, np.ndarray) else np.array(image))
+        mask = np.zeros(gray.shape, dtype=np.uint8)
+        for x, y, w, h in find_text_regions(gray):
+            mask[max(0, y - 2):y + h + 2, max(0, x - 2):x + w + 2] = 255
+        with self._lock:
+            previous = self._previous
+            self._previous = (gray, mask)
+        if previous is None or previous[0].shape != gray.shape:
+            return True
+        # Texts that appeared, disappeared or changed are inside the text regions of one of the frames
+        diff = cv2.absdiff(gray, previous[0])
+        changed = np.count_nonzero((diff > self.pixel_threshold) & ((mask | previous[1]) > 0))
+        return changed >= self.min_changed_pixels
@@ -0,0 +1,185 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import logging
+from .ocr_utils import box_bounds, offset_result
+from .ocr_result import OcrResult
+from .ocr_handler import OCRHandlerWrapper
+
+logger = logging.getLogger(__name__)
+
+
+class TiledOCRHandler(OCRHandlerWrapper):
+    '''
+    Wraps an OCR handler and recognizes large images as overlapping tiles on a thread pool.
+
+    On 4K and multi-monitor screenshots one OCR call on the full frame is slow and uses a single pipeline. This class
+    splits the frame into tiles overlapping by a few pixels, recognizes the tiles concurrently and stitches the boxes
+    back together. Boxes recognized twice in the overlap of two tiles are deduplicated, preferring boxes that are not
+    cut by a tile border.
+
+    OCR engines are generally not safe to call from several threads at once, so each worker thread uses its own
+    handler created by handler_factory. Without a factory the tiles are recognized one after another with the wrapped
+    handler.
+
+    The worker handlers have no cache, so the stitched result of a tiled frame is stored in the cache of this class,
+    keyed by the frame content, the engine configuration and the tiling.
+    '''
+
+    def __init__(self, ocr_handler, tile_size: int = 1280, overlap: int = 160, workers: int = 2,
+                 handler_factory=None, debug_mode: bool = False, cache=None):
+        '''
+        Parameters
+        ----------
+        ocr_handler : OCRHandler
+            The handler used for images not larger than a tile, and for the tiles if there is no handler_factory.
+
+        tile_size : int
+            Maximum width and height of a tile in pixels.
+
+        overlap : int
+            Number of pixels neighbouring tiles overlap. It should be larger than the height of a text line.
+
+        workers : int
+            Number of tiles recognized at the same time.
+
+        handler_factory : callable
+            A function without parameters returning a new OCR handler, used to create one handler per worker thread.
+
+        cache : OCRResultCache
+            Optional cache for the results of the tiled frames. Images not larger than a tile use the cache of the
+            wrapped handler.
+        '''
+        if overlap >= tile_size:
+            raise ValueError('The tile overlap must be smaller than the tile size')
+        super().__init__(ocr_handler, debug_mode)
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.workers = workers if handler_factory is not None else 1
+        self.handler_factory = handler_factory
+        self.cache = cache
+        self._local = threading.local()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def find_texts_in_image(self, image):
+        if isinstance(image, np.ndarray):
+            img_array = image
+        else:
+            img_array = np.array(image)
+
+        height, width = img_array.shape[:2]
+        if width <= self.tile_size and height <= self.tile_size:
+            return self.ocr_handler.find_texts_in_image(img_array)
+
+        key = None
+        if self.cache is not None:
+            key = (self.cache.hash_frame(img_array),) + tuple(self.ocr_handler.cache_key()) + \
+                ('tiled', self.tile_size, self.overlap)
+            result = self.cache.get(key)
+            if result is not None:
+                if self.debug_mode:
+                    logger.debug(f"Tiled OCR result served from cache: {self.cache.stats()}")
+                return OcrResult.from_list(result)
+
+        tiles = self.split_tiles(width, height)
+        if self.debug_mode:
+            logger.debug(f"Tiled OCR on {len(tiles)} tiles: {tiles}")
+
+        def recognize(tile):
+            x, y, w, h = tile
+            crop = np.ascontiguousarray(img_array[y:y + h, x:x + w])
+            return tile, offset_result(self._handler().find_texts_in_image(crop), x, y)
+
+        if self.workers > 1:
+            tile_results = list(self._get_executor().map(recognize, tiles))
+        else:
+            tile_results = [recognize(tile) for tile in tiles]
+
+        result = self.stitch(tile_results, width, height)
+        if not result:
+            return None
+        result = OcrResult.from_list(result)
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def split_tiles(self, width, height):
+        '''Returns the (x, y, width, height) tiles covering an image of width x height.'''
+        xs = self._tile_starts(width)
+        ys = self._tile_starts(height)
+        return [(x, y, min(self.tile_size, width - x), min(self.tile_size, height - y)) for y in ys for x in xs]
+
+    def _tile_starts(self, length):
+        if length <= self.tile_size:
+            return [0]
+        step = self.tile_size - self.overlap
+        starts = list(range(0, length - self.tile_size, step))
+        # The last tile is aligned to the image border so that no tile is smaller than necessary
+        starts.append(length - self.tile_size)
+        return starts
+
+    def stitch(self, tile_results, width, height, edge_tolerance: int = 2):
+        '''
+        Merges the results of the tiles into one result. tile_results is a list of (tile, result) tuples where the
+        result boxes already use image coordinates.
+        '''
+        candidates = []
+        for tile, result in tile_results:
+            if not result:
+                continue
+            x, y, w, h = tile
+            for box, text, confidence in result:
+                left, top, right, bottom = box_bounds(box)
+                # A box touching a border of its tile that is not a border of the image may be cut in two
+                cut = (x > 0 and left <= x + edge_tolerance) or (y > 0 and top <= y + edge_tolerance) or \
+                    (x + w < width and right >= x + w - edge_tolerance) or \
+                    (y + h < height and bottom >= y + h - edge_tolerance)
+                candidates.append(((left, top, right, bottom), cut, (box, text, confidence)))
+
+        # Prefer complete boxes, then larger boxes. Each box is kept unless it duplicates a box kept before.
+        candidates.sort(key=lambda c: (c[1], -(c[0][2] - c[0][0]) * (c[0][3] - c[0][1])))
+        kept = []
+        for bounds, _, entry in candidates:
+            if not any(self._is_duplicate(bounds, other) for other, _ in kept):
+                kept.append((bounds, entry))
+
+        kept.sort(key=lambda k: (k[0][1], k[0][0]))
+        return [entry for _, entry in kept]
+
+    @staticmethod
+    def _is_duplicate(bounds, other):
+        # Two boxes are the same text if they overlap horizontally and share most of their height
+        overlap_width = min(bounds[2], other[2]) - max(bounds[0], other[0])
+        overlap_height = min(bounds[3], other[3]) - max(bounds[1], other[1])
+        if overlap_width <= 0 or overlap_height <= 0:
+            return False
+        min_height = min(bounds[3] - bounds[1], other[3] - other[1])
+        min_width = min(bounds[2] - bounds[0], other[2] - other[0])
+        return overlap_height >= 0.5 * min_height and overlap_width >= 0.5 * min_width
+
+    def _handler(self):
+        if self.handler_factory is None or self.workers <= 1:
+            return self.ocr_handler
+        handler = getattr(self._local, 'handler', None)
+        if handler is None:
+            handler = self.handler_factory()
+            self._local.handler = handler
+        profile = getattr(self.ocr_handler, 'profile', None)
+        if profile is not None and handler.profile != profile:
+            # Follow speed profile switches of the wrapped handler
+            handler.set_profile(profile)
+        return handler
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='rpalite-ocr-tile')
+            return self._executor
+
+    def close(self):
+        '''Shuts down the worker threads.'''
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
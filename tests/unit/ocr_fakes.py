@@ -0,0 +1,47 @@
+'''OCR handlers standing for the engines and the worker pools in the unit tests.'''
+import time
+from RPALite.ocr_handler import OCRHandler
+from RPALite.ocr_process_pool import OCRTimeoutError
+
+
+class TimeoutOCRPool(OCRHandler):
+    '''Stands for an OCRProcessPool whose requests do not finish before the deadline.'''
+    engine_name = 'fake'
+
+    def __init__(self):
+        super().__init__(['en'])
+        self.deadline = None
+        self.deadlines = []
+
+    def _recognize(self, img_array):
+        self.deadlines.append(self.deadline)
+        raise OCRTimeoutError('OCR request timed out')
+
+
+class FailingBrightnessOCRHandler(OCRHandler):
+    '''Reports one box covering the image, named by the mean brightness, and records the batch sizes. Images with brightness 255 fail.'''
+
+    def __init__(self, languages, debug_mode=False, cache=None, profile=None):
+        super().__init__(languages, debug_mode, cache, profile)
+        self.batch_sizes = []
+
+    def _recognize(self, img_array):
+        if int(img_array.mean()) == 255:
+            raise RuntimeError('Recognition failed')
+        height, width = img_array.shape[:2]
+        return [([[0, 0], [width, 0], [width, height], [0, height]], str(int(img_array.mean())), 0.5)]
+
+    def _recognize_batch(self, img_arrays):
+        self.batch_sizes.append(len(img_arrays))
+        return super()._recognize_batch(img_arrays)
+
+
+class SlowBrightnessOCRHandler(OCRHandler):
+    '''Reports one box covering the image, named by the mean brightness. Images with brightness 1 take 2 seconds.'''
+
+    def _recognize(self, img_array):
+        brightness = int(img_array.mean())
+        if brightness == 1:
+            time.sleep(2)
+        height, width = img_array.shape[:2]
+        return [([[0, 0], [width, 0], [width, height], [0, height]], str(brightness), 0.5)]
@@ -1,4 +1,4 @@
-from RPALite import ImageHandler
+from RPALite import ImageHandler, Snapshot
 import PIL
 import logging
 
@@ -69,4 +69,23 @@ class TestImageHandler:
          # Find the location of the start image on the screen
         start_location = self.handler.find_image_location( start_img, screen)
         logger.debug(f"Start image found at {start_location}")
-        assert start_location is not None, "Start image not found on the screen"
\ No newline at end of file
+        assert start_location is not None, "Start image not found on the screen"
+
+    def test_snapshot_reuses_ocr_result(self):
+        snapshot = Snapshot(PIL.Image.open('./tests/unit/text_and_window.png'))
+        first = self.handler.read_text(snapshot)
+        assert first is not None, "No text found in the image"
+        assert self.handler.read_text(snapshot) is first, "OCR result should be computed only once per snapshot"
+
+        locations = self.handler.find_texts_in_image(snapshot, "Welcome")
+        assert locations is not None and len(locations) > 0, "Welcome text not found in the snapshot"
+        assert snapshot.size == snapshot.image.size, "Snapshot should expose the attributes of the PIL image"
+
+
+    def test_tiled_ocr_matches_full_frame(self):
+        image = PIL.Image.open('./tests/unit/text_and_window.png').convert('RGB')
+        tiled_handler = ImageHandler(debug_mode=False, ocr_cache_size=0, ocr_tile_size=640, ocr_tile_overlap=128, ocr_tile_workers=1)
+        full_texts = set(r[1].strip() for r in self.handler.ocr_handler.find_texts_in_image(image))
+        tiled_texts = set(r[1].strip() for r in tiled_handler.ocr_handler.find_texts_in_image(image))
+        missing = full_texts - tiled_texts
+        assert len(missing) <= len(full_texts) * 0.1, f"Tiled OCR missed texts found on the full frame: {missing}"
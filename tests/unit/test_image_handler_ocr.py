@@ -0,0 +1,108 @@
+import numpy as np
+import PIL.Image
+import pytest
+from RPALite.image_handler import ImageHandler
+from RPALite.ocr_handler import OCRHandler
+from RPALite.ocr_process_pool import OCRTimeoutError
+from RPALite.snapshot import Snapshot
+from ocr_fakes import TimeoutOCRPool
+
+
+class CountingOCRHandler(OCRHandler):
+    '''Reports one text box at the top left corner of each image and counts the recognized images. failures is the number of recognitions raising an error first.'''
+    engine_name = 'fake'
+
+    def __init__(self, failures=0):
+        super().__init__(['en'])
+        self.shapes = []
+        self.failures = failures
+
+    def _recognize(self, img_array):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError('OCR failed')
+        self.shapes.append(img_array.shape)
+        return [([[2, 2], [40, 2], [40, 12], [2, 12]], 'text', 0.9)]
+
+
+def create_handler(engine=None, **kwargs):
+    handler = ImageHandler(ocr_engine='easyocr', ocr_cache_size=0, shared_ocr_engine=False, **kwargs)
+    handler.ocr_handler = handler.engine_ocr_handler = engine or CountingOCRHandler()
+    return handler
+
+
+def make_snapshot(width=400, height=300):
+    return Snapshot(PIL.Image.fromarray(np.full((height, width, 3), 255, dtype=np.uint8)))
+
+
+class TestImageHandlerOCR:
+
+    def test_failed_recognition_is_retried(self):
+        engine = CountingOCRHandler(failures=1)
+        handler = create_handler(engine)
+        snapshot = make_snapshot()
+        assert handler.read_text(snapshot) is None
+        result = handler.read_text(snapshot)
+        assert result is not None and result[0][1] == 'text'
+        assert handler.read_text(snapshot) is result
+        assert len(engine.shapes) == 1
+
+    def test_profile_change_recognizes_frame_again(self):
+        engine = CountingOCRHandler()
+        handler = create_handler(engine)
+        snapshot = make_snapshot()
+        handler.read_text(snapshot)
+        handler.read_text(snapshot)
+        assert len(engine.shapes) == 1
+        handler.set_ocr_profile('fast')
+        handler.read_text(snapshot)
+        assert len(engine.shapes) == 2 and engine.profile.name == 'fast'
+
+    def test_read_text_in_rect_recognizes_the_padded_rect(self):
+        engine = CountingOCRHandler()
+        handler = create_handler(engine)
+        snapshot = make_snapshot()
+        result = handler.read_text_in_rect(snapshot, (100, 100, 50, 40))
+        # The rect plus 32 pixels on each side is recognized, and the boxes are moved back by the crop origin
+        assert engine.shapes == [(104, 114, 3)]
+        assert result[0][0] == [[70, 70], [108, 70], [108, 80], [70, 80]]
+        assert handler.read_text_in_rect(snapshot, (100, 100, 50, 40)) is result
+        assert len(engine.shapes) == 1
+
+    def test_read_text_in_rect_clips_padding_at_image_edges(self):
+        engine = CountingOCRHandler()
+        handler = create_handler(engine)
+        result = handler.read_text_in_rect(make_snapshot(), (380, 0, 20, 30))
+        assert engine.shapes == [(62, 52, 3)]
+        assert result[0][0][0] == [350, 2]
+
+    def test_read_text_in_large_rect_recognizes_full_frame(self):
+        engine = CountingOCRHandler()
+        handler = create_handler(engine)
+        snapshot = make_snapshot()
+        result = handler.read_text_in_rect(snapshot, (10, 10, 380, 280))
+        assert engine.shapes == [(300, 400, 3)]
+        assert handler.read_text(snapshot) is result
+
+    def test_read_text_in_rect_reuses_full_result(self):
+        engine = CountingOCRHandler()
+        handler = create_handler(engine)
+        snapshot = make_snapshot()
+        result = handler.read_text(snapshot)
+        assert handler.read_text_in_rect(snapshot, (100, 100, 50, 40)) is result
+        assert len(engine.shapes) == 1
+
+    def test_ocr_timeout_is_raised(self):
+        pool = TimeoutOCRPool()
+        handler = create_handler(pool)
+        handler.ocr_process_pool = pool
+        snapshot = make_snapshot()
+        with handler.ocr_deadline(5):
+            with pytest.raises(OCRTimeoutError):
+                handler.read_text(snapshot)
+            with pytest.raises(OCRTimeoutError):
+                handler.read_text_in_rect(snapshot, (100, 100, 50, 40))
+        assert len(pool.deadlines) == 2 and None not in pool.deadlines
+        # The timed out recognition is not kept on the snapshot
+        handler.ocr_handler = handler.engine_ocr_handler = CountingOCRHandler()
+        assert handler.read_text(snapshot)[0][1] == 'text'
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+# Modules that must not be imported before the capability that needs them is used
+HEAVY_MODULES = ['cv2', 'numpy', 'pyautogui', 'pyperclip', 'easyocr', 'paddleocr', 'torch', 'paddle']
+
+# Startup budget of "from RPALite import RPALite" in milliseconds, on top of a bare interpreter
+IMPORT_BUDGET_MS = float(os.environ.get('RPALITE_IMPORT_BUDGET_MS', 1500))
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'src'))
+
+
+def run_import(statement):
+    '''Runs statement in a new interpreter with -X importtime and returns (import time in ms, heavy modules imported).'''
+    code = f"{statement}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in (SRC_DIR, os.environ.get('PYTHONPATH')) if p))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                             env=env, check=True)
+    # Sum the cumulative time of the top level imports; the nested ones are part of it
+    total = sum(int(line.split('|')[1]) for line in process.stderr.splitlines()
+                if line.startswith('import time:') and 'cumulative' not in line
+                and not line.split('|')[2][1:].startswith(' '))
+    return total / 1000, [m for m in process.stdout.strip().split(',') if m]
+
+
+class TestImportTime:
+
+    def test_import_package_is_lightweight(self):
+        _, heavy = run_import('import RPALite')
+        assert heavy == []
+
+    def test_import_rpalite_within_budget(self):
+        baseline, _ = run_import('pass')
+        elapsed, heavy = run_import('from RPALite import RPALite')
+        assert heavy == []
+        assert elapsed - baseline <= IMPORT_BUDGET_MS
@@ -0,0 +1,98 @@
+import cv2
+import numpy as np
+from RPALite.incremental_ocr import IncrementalOCRHandler, estimate_shift
+
+
+class BlobOCRHandler:
+    '''Reports every white blob of the image as a text box, named by its size. The first failures calls return None, like an engine error.'''
+
+    def __init__(self, failures=0):
+        self.shapes = []
+        self.failures = failures
+
+    def find_texts_in_image(self, image):
+        self.shapes.append(image.shape)
+        if self.failures > 0:
+            self.failures -= 1
+            return None
+        count, _, stats, _ = cv2.connectedComponentsWithStats((image.max(axis=2) > 0).astype(np.uint8))
+        return [([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], f"{w}x{h}", 1.0) for x, y, w, h, _ in stats[1:count]]
+
+
+class TestIncrementalOCRHandler:
+
+    def setup_method(self):
+        self.frame = np.zeros((600, 800, 3), dtype=np.uint8)
+        self.frame[100:120, 100:200] = 255
+        self.frame[400:420, 500:600] = 255
+        self.ocr = BlobOCRHandler()
+        self.handler = IncrementalOCRHandler(self.ocr)
+
+    def test_unchanged_frame_is_not_recognized_again(self):
+        first = self.handler.find_texts_in_image(self.frame)
+        second = self.handler.find_texts_in_image(self.frame.copy())
+        assert len(self.ocr.shapes) == 1
+        assert [r[1] for r in first] == [r[1] for r in second]
+
+    def test_only_changed_region_is_recognized(self):
+        self.handler.find_texts_in_image(self.frame)
+        changed = self.frame.copy()
+        changed[400:420, 500:600] = 0
+        changed[400:430, 500:560] = 255
+        result = self.handler.find_texts_in_image(changed)
+
+        assert len(self.ocr.shapes) == 2
+        assert self.ocr.shapes[1][0] < 600 and self.ocr.shapes[1][1] < 800, "Only a crop should be recognized"
+        assert sorted(r[1] for r in result) == ["100x20", "60x30"]
+        moved_box = [r[0] for r in result if r[1] == "60x30"][0]
+        assert moved_box[0] == [500, 400], "Boxes of the crop should be translated back to frame coordinates"
+
+    def test_failed_region_is_recognized_again(self):
+        self.handler.find_texts_in_image(self.frame)
+        changed = self.frame.copy()
+        changed[400:420, 500:600] = 0
+        changed[400:430, 500:560] = 255
+        self.ocr.failures = 1
+        assert sorted(r[1] for r in self.handler.find_texts_in_image(changed)) == ["100x20"]
+
+        # The same frame again: the region that failed is still recognized, the rest is reused
+        result = self.handler.find_texts_in_image(changed.copy())
+        assert len(self.ocr.shapes) == 3
+        assert self.ocr.shapes[2][0] < 600 and self.ocr.shapes[2][1] < 800
+        assert sorted(r[1] for r in result) == ["100x20", "60x30"]
+        self.handler.find_texts_in_image(changed.copy())
+        assert len(self.ocr.shapes) == 3
+
+    def test_large_change_recognizes_full_frame(self):
+        self.handler.find_texts_in_image(self.frame)
+        self.handler.find_texts_in_image(255 - self.frame)
+        assert self.ocr.shapes[1] == self.frame.shape
+
+    def test_scrolled_content_is_reused(self):
+        rng = np.random.default_rng(0)
+        content = np.zeros((2000, 800, 3), dtype=np.uint8)
+        for i in range(60):
+            content[30 * i + 5:30 * i + 20, 50:50 + int(rng.integers(40, 300))] = 255
+
+        def view(offset):
+            frame = np.zeros((600, 1000, 3), dtype=np.uint8)
+            frame[50:600, 100:900] = content[offset:offset + 550]
+            return frame
+
+        self.handler.find_texts_in_image(view(0))
+        result = self.handler.find_texts_in_image(view(100))
+        expected = BlobOCRHandler().find_texts_in_image(view(100))
+        assert sorted(r[1] for r in result) == sorted(r[1] for r in expected)
+        assert sorted(np.asarray(r[0]).tolist() for r in result) == sorted(np.asarray(r[0]).tolist() for r in expected)
+        assert sum(h * w for h, w, _ in self.ocr.shapes[1:]) < 0.3 * 600 * 1000, "Only the exposed strip should be recognized"
+
+    def test_estimate_shift_of_scrolled_list(self):
+        rng = np.random.default_rng(0)
+        content = np.zeros((1200, 300), dtype=np.uint8)
+        for top in range(0, 1200, 30):
+            content[top + 8:top + 22, 10:int(rng.integers(60, 280))] = 255
+
+        previous = content[0:400]
+        assert estimate_shift(previous, content[137:537]) == (0, -137)
+        assert estimate_shift(content[137:537], previous) == (0, 137)
+        assert estimate_shift(previous, previous.copy()) is None
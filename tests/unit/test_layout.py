@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+import PIL.Image
+from RPALite.snapshot import Snapshot
+
+
+def make_form():
+    screen = np.full((400, 600, 3), 240, dtype=np.uint8)
+    # A window with an input box and an underlined input field
+    cv2.rectangle(screen, (20, 20), (580, 380), (0, 0, 0), 2)
+    cv2.rectangle(screen, (200, 80), (500, 110), (0, 0, 0), 1)
+    cv2.line(screen, (200, 200), (500, 200), (0, 0, 0), 1)
+    return Snapshot(PIL.Image.fromarray(screen))
+
+
+class TestFrameLayout:
+
+    def test_layout_is_computed_once_per_frame(self):
+        snapshot = make_form()
+        layout = snapshot.layout(50, 150, 5)
+        assert snapshot.layout(50, 150, 5) is layout
+        assert layout.edges is snapshot.edges(50, 150, 5)
+        assert len(layout.polygons) == len(layout.contours) == len(layout.polygon_rects)
+        assert layout.controls() is layout.controls()
+        assert layout.shapes() is layout.shapes()
+
+    def test_shapes_and_controls(self):
+        snapshot = make_form()
+        layout = snapshot.layout(50, 200, 5)
+        shapes, index = layout.shapes()
+        around_box = [layout.polygon_rects[shapes[i]] for i in index.containing((250, 90, 50, 10))]
+        # The box and the window contain the target
+        assert any(x <= 200 and x + w >= 500 and h < 50 for x, y, w, h in around_box)
+        assert any(x <= 20 and x + w >= 580 for x, y, w, h in around_box)
+
+        layout = snapshot.layout(50, 150, 5)
+        assert any(y1 == y2 and 195 <= y1 <= 205 and x2 - x1 > 250 for x1, y1, x2, y2 in layout.horizontal_lines())
+        controls, index = layout.controls()
+        assert len(index) == len(controls)
+        # The input box is a control, sorted after the window
+        rects = [rect for _, rect in controls]
+        assert (199, 79, 303, 33) in rects
+        assert rects.index((199, 79, 303, 33)) > rects.index((19, 19, 563, 363))
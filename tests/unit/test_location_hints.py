@@ -0,0 +1,32 @@
+from RPALite.location_hints import LocationHintCache
+
+
+class TestLocationHintCache:
+
+    def test_search_rect_around_hint(self):
+        hints = LocationHintCache(padding=40)
+        assert hints.get_search_rect('OK', 800, 600) is None
+        hints.put('OK', (100, 200, 40, 16))
+        assert hints.get_search_rect('OK', 800, 600) == (60, 160, 120, 96)
+        assert hints.get_search_rect('OK', 800, 600, window=(0, 0, 400, 400)) is None, "Hints are kept per window"
+        hints.put('Title', (0, 0, 200, 30))
+        assert hints.get_search_rect('Title', 800, 600) == (0, 0, 260, 90), "Padding grows with the text height and is clipped"
+
+    def test_least_recently_used_hints_are_dropped(self):
+        hints = LocationHintCache(max_entries=2)
+        hints.put('a', (0, 0, 1, 1))
+        hints.put('b', (0, 0, 1, 1))
+        hints.get('a')
+        hints.put('c', (0, 0, 1, 1))
+        assert hints.get('b') is None and hints.get('a') is not None
+        hints.invalidate('a')
+        assert len(hints) == 1
+
+    def test_metrics(self):
+        hints = LocationHintCache()
+        hints.record_full_search(2.0)
+        hints.record_hit(0.5)
+        hints.record_miss(0.25)
+        stats = hints.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['hit_rate'] == 0.5
+        assert stats['time_saved'] == 1.25
@@ -0,0 +1,37 @@
+import time
+import cv2
+import numpy as np
+import PIL.Image
+from RPALite.locator_cache import LocatorCache
+from RPALite.snapshot import Snapshot
+
+
+def make_screen(label='Submit', noise_seed=0):
+    screen = np.full((300, 400, 3), 230, dtype=np.uint8)
+    cv2.putText(screen, label, (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    # Something changing elsewhere on the screen, like a clock or an animation
+    screen[250:290, 300:390] = np.random.default_rng(noise_seed).integers(0, 255, (40, 90, 3), dtype=np.uint8)
+    return Snapshot(PIL.Image.fromarray(screen))
+
+
+class TestLocatorCache:
+
+    def setup_method(self):
+        self.cache = LocatorCache()
+        self.cache.put(('text', 'Submit'), make_screen(), [(48, 75, 115, 32)], [(48, 75, 115, 32)])
+
+    def test_unchanged_pixels_reuse_the_result(self):
+        assert self.cache.get(('text', 'Submit'), make_screen(noise_seed=1)) == [(48, 75, 115, 32)]
+        assert self.cache.get(('text', 'Cancel'), make_screen()) is None
+        assert self.cache.stats()['hits'] == 1 and self.cache.stats()['misses'] == 1
+
+    def test_changed_pixels_invalidate_the_result(self):
+        assert self.cache.get(('text', 'Submit'), make_screen('Cancel')) is None
+        assert self.cache.stats()['mismatches'] == 1
+        assert len(self.cache) == 0, "Mismatching results should be dropped"
+
+    def test_expired_results_are_dropped(self):
+        self.cache.ttl = 0.01
+        time.sleep(0.02)
+        assert self.cache.get(('text', 'Submit'), make_screen()) is None
+        assert self.cache.stats()['expirations'] == 1
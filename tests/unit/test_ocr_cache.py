@@ -0,0 +1,56 @@
+import numpy as np
+from RPALite.ocr_cache import OCRResultCache
+from RPALite.ocr_result import OcrResult
+
+
+def make_result(text):
+    return [([[0, 0], [10, 0], [10, 10], [0, 10]], text, 0.9)]
+
+
+class TestOCRResultCache:
+
+    def test_hash_frame(self):
+        frame = np.zeros((20, 30, 3), dtype=np.uint8)
+        same = np.zeros((20, 30, 3), dtype=np.uint8)
+        changed = frame.copy()
+        changed[5, 5, 0] = 1
+        assert OCRResultCache.hash_frame(frame) == OCRResultCache.hash_frame(same)
+        assert OCRResultCache.hash_frame(frame) != OCRResultCache.hash_frame(changed)
+        assert OCRResultCache.hash_frame(frame) != OCRResultCache.hash_frame(np.zeros((30, 20, 3), dtype=np.uint8))
+
+    def test_hit_and_miss_counters(self):
+        cache = OCRResultCache(max_entries=4)
+        assert cache.get('a') is None
+        cache.put('a', make_result('hello'))
+        assert cache.get('a')[0][1] == 'hello'
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['entries'] == 1
+
+    def test_result_is_kept_as_ocr_result(self):
+        cache = OCRResultCache(max_entries=4)
+        result = OcrResult.from_list([([[0, 10 * i], [80, 10 * i], [80, 10 * i + 8], [0, 10 * i + 8]], f'text {i}', 0.9)
+                                      for i in range(100)])
+        cache.put('a', result)
+        assert cache.get('a') is result
+        assert cache.stats()['bytes'] == OCRResultCache.estimate_size(result)
+        # Lists are converted once when they are stored
+        cache.put('b', make_result('hello'))
+        assert isinstance(cache.get('b'), OcrResult) and cache.get('b').texts == ['hello']
+
+    def test_lru_eviction_by_entries(self):
+        cache = OCRResultCache(max_entries=2)
+        cache.put('a', make_result('a'))
+        cache.put('b', make_result('b'))
+        cache.get('a')
+        cache.put('c', make_result('c'))
+        assert cache.get('b') is None, "The least recently used entry should be evicted"
+        assert cache.get('a') is not None and cache.get('c') is not None
+        assert cache.stats()['evictions'] == 1
+
+    def test_eviction_by_bytes(self):
+        size = OCRResultCache.estimate_size(OcrResult.from_list(make_result('a')))
+        cache = OCRResultCache(max_entries=10, max_bytes=size * 2)
+        for key in 'abc':
+            cache.put(key, make_result(key))
+        assert len(cache) == 2
+        assert cache.stats()['bytes'] <= size * 2
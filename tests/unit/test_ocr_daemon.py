@@ -0,0 +1,79 @@
+import os
+import socket
+import tempfile
+import threading
+import numpy as np
+import pytest
+from RPALite.ocr_daemon import OCRDaemon
+from RPALite.remote_ocr import RemoteOCRHandler
+from ocr_fakes import FailingBrightnessOCRHandler
+
+
+# The daemon listens on a Unix domain socket, which Windows Python does not support
+needs_unix_sockets = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='rpalite-ocrd needs Unix domain sockets')
+
+
+@needs_unix_sockets
+class TestOCRDaemon:
+
+    def setup_method(self):
+        self.engines = []
+
+        def factory(engine, languages, debug_mode=False, cache=None, profile=None):
+            handler = FailingBrightnessOCRHandler(languages, debug_mode, cache, profile)
+            self.engines.append(handler)
+            return handler
+
+        self.socket_path = os.path.join(tempfile.mkdtemp(), 'ocrd.sock')
+        self.daemon = OCRDaemon(self.socket_path, 'fake', batch_wait=0.2, engine_factory=factory)
+        self.daemon.start()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+
+    def teardown_method(self):
+        self.daemon.shutdown()
+        self.thread.join()
+
+    def test_remote_recognition(self):
+        handler = RemoteOCRHandler(socket_path=self.socket_path, engine='fake')
+        result = handler.find_texts_in_image(np.full((30, 40, 3), 7, dtype=np.uint8))
+        assert result == [([[0, 0], [40, 0], [40, 30], [0, 30]], '7', 0.5)]
+        handler.close()
+
+    def test_concurrent_requests_are_batched(self):
+        results = {}
+
+        def request(value):
+            handler = RemoteOCRHandler(socket_path=self.socket_path, engine='fake')
+            results[value] = handler.find_texts_in_image(np.full((30, 40, 3), value, dtype=np.uint8))[0][1]
+            handler.close()
+
+        threads = [threading.Thread(target=request, args=(value,)) for value in (1, 2, 2, 3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == {1: '1', 2: '2', 3: '3'}
+        assert self.daemon.requests == 4 and self.daemon.batches < 4
+        # Identical frames are recognized once
+        assert sum(self.engines[0].batch_sizes) < 4
+
+    def test_fallback_on_daemon_error(self):
+        fallback = FailingBrightnessOCRHandler(['en'])
+        fallback._recognize = lambda img_array: [([[0, 0], [1, 0], [1, 1], [0, 1]], 'fallback', 0.5)]
+        handler = RemoteOCRHandler(socket_path=self.socket_path, engine='fake', fallback_factory=lambda: fallback)
+        assert handler.find_texts_in_image(np.full((30, 40, 3), 255, dtype=np.uint8))[0][1] == 'fallback'
+        # The daemon is still used for the next images
+        assert handler.find_texts_in_image(np.full((30, 40, 3), 9, dtype=np.uint8))[0][1] == '9'
+        handler.close()
+
+
+class TestRemoteOCRFallback:
+    '''Runs everywhere: without Unix domain sockets the in-process fallback is used too.'''
+
+    def test_fallback_without_daemon(self):
+        fallback = FailingBrightnessOCRHandler(['en'])
+        handler = RemoteOCRHandler(socket_path=os.path.join(tempfile.mkdtemp(), 'missing.sock'), engine='fake',
+                                   fallback_factory=lambda: fallback)
+        assert handler.find_texts_in_image(np.full((30, 40, 3), 5, dtype=np.uint8))[0][1] == '5'
+        assert handler.fallback_handler is fallback
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import numpy as np
+from RPALite.ocr_cache import OCRResultCache
+from RPALite.ocr_disk_cache import PersistentOCRCache, main
+from RPALite.ocr_profile import BALANCED
+
+
+def make_key(name):
+    return (OCRResultCache.hash_frame(np.full((4, 4), len(name), dtype=np.uint8)) + name, 'easyocr', ('en',), BALANCED)
+
+
+def make_result(text):
+    return [([[0, 0], [10, 0], [10, 10], [0, 10]], text, np.float64(0.9))]
+
+
+class TestPersistentOCRCache:
+
+    def setup_method(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite3')
+
+    def test_results_survive_reopening(self):
+        cache = PersistentOCRCache(self.path)
+        cache.put(make_key('login'), make_result('Login'))
+        cache.close()
+        cache = PersistentOCRCache(self.path)
+        assert cache.get(make_key('login')) == [([[0, 0], [10, 0], [10, 10], [0, 10]], 'Login', 0.9)]
+        assert cache.get(make_key('other')) is None
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    def test_least_recently_used_results_are_evicted(self):
+        cache = PersistentOCRCache(self.path, max_entries=2)
+        cache.put(make_key('a'), make_result('a'))
+        cache.put(make_key('b'), make_result('b'))
+        cache.get(make_key('a'))
+        cache.put(make_key('c'), make_result('c'))
+        assert len(cache) == 2
+        assert cache.get(make_key('b')) is None and cache.get(make_key('a')) is not None
+
+    def test_memory_cache_backend(self):
+        backend = PersistentOCRCache(self.path)
+        backend.put(make_key('menu'), make_result('File'))
+        cache = OCRResultCache(backend=backend)
+        assert cache.get(make_key('menu'))[0][1] == 'File'
+        assert len(cache) == 1
+        cache.put(make_key('dialog'), make_result('OK'))
+        assert backend.get(make_key('dialog'))[0][1] == 'OK'
+
+    def test_prune_command(self, capsys):
+        cache = PersistentOCRCache(self.path)
+        for name in ('a', 'b', 'c'):
+            cache.put(make_key(name), make_result(name))
+        cache.close()
+        assert main(['--path', self.path, 'prune', '--max-entries', '1']) == 0
+        assert 'Deleted 2 results' in capsys.readouterr().out
+        main(['--path', self.path, 'info'])
+        assert 'Entries: 1' in capsys.readouterr().out
@@ -0,0 +1,39 @@
+import time
+import numpy as np
+import pytest
+from RPALite.ocr_process_pool import OCRProcessPool, OCRTimeoutError, pack_result, unpack_result
+from ocr_fakes import SlowBrightnessOCRHandler
+
+
+def create_engine(engine, languages, debug_mode=False, profile=None):
+    return SlowBrightnessOCRHandler(languages, debug_mode, profile=profile)
+
+
+class TestOCRProcessPool:
+
+    def setup_method(self):
+        self.pool = OCRProcessPool('fake', workers=2, max_pending=2, engine_factory=create_engine)
+
+    def teardown_method(self):
+        self.pool.close()
+
+    def test_pack_result(self):
+        result = [([[0, 0], [10, 0], [10, 5], [0, 5]], 'a', 0.5), ([[1, 1], [9, 1], [9, 4], [1, 4]], 'b', 0.25)]
+        packed = pack_result(result)
+        assert packed[0].dtype == np.int32 and packed[0].shape == (2, 4, 2)
+        assert unpack_result(packed) == result
+        assert pack_result(None) is None and unpack_result(None) is None
+
+    def test_recognize_in_worker(self):
+        frame = np.full((30, 40, 3), 7, dtype=np.uint8)
+        assert self.pool.find_texts_in_image(frame) == [([[0, 0], [40, 0], [40, 30], [0, 30]], '7', 0.5)]
+        assert self.pool.find_texts_in_image(np.full((30, 40, 3), 9, dtype=np.uint8))[0][1] == '9'
+
+    def test_deadline_raises_timeout(self):
+        self.pool.warm_up()
+        self.pool.deadline = time.monotonic() + 0.5
+        with pytest.raises(OCRTimeoutError):
+            self.pool.find_texts_in_image(np.full((30, 40, 3), 1, dtype=np.uint8))
+        self.pool.deadline = None
+        # The slot of the timed out request is freed when the worker finishes it
+        assert self.pool.find_texts_in_image(np.full((30, 40, 3), 3, dtype=np.uint8))[0][1] == '3'
@@ -0,0 +1,55 @@
+import sys
+import types
+import numpy as np
+import pytest
+from RPALite.easyocr_handler import EasyOCRHandler
+from RPALite.image_handler import ImageHandler
+from RPALite.ocr_profile import ACCURATE, BALANCED, FAST, OCRProfile, get_profile
+
+
+class TestOCRProfile:
+
+    def test_get_profile(self):
+        assert get_profile(None) is BALANCED
+        assert get_profile('fast') is FAST
+        assert get_profile('Accurate') is ACCURATE
+        custom = OCRProfile('custom', cpu_threads=2)
+        assert get_profile(custom) is custom
+
+    def test_invalid_profile(self):
+        for profile in ('turbo', '', 3):
+            with pytest.raises(ValueError):
+                get_profile(profile)
+
+    def test_with_settings(self):
+        profile = FAST.with_settings(cpu_threads=2)
+        assert profile.cpu_threads == 2 and profile.canvas_size == FAST.canvas_size
+        assert FAST.cpu_threads is None
+
+    def test_set_ocr_profile(self):
+        handler = ImageHandler(ocr_engine='easyocr', ocr_cache_size=0, shared_ocr_engine=False)
+        assert handler.set_ocr_profile('fast') is BALANCED
+        assert handler.ocr_profile is FAST and handler.engine_ocr_handler.profile is FAST
+        with pytest.raises(ValueError):
+            handler.set_ocr_profile('turbo')
+        assert handler.ocr_profile is FAST
+
+    def test_easyocr_restores_torch_threads(self, monkeypatch):
+        threads = []
+        torch = types.SimpleNamespace(get_num_threads=lambda: 8, set_num_threads=threads.append)
+        monkeypatch.setitem(sys.modules, 'torch', torch)
+
+        class Reader:
+            def readtext(self, img_array, **options):
+                return [([[0, 0], [10, 0], [10, 5], [0, 5]], 'text', 0.9)]
+
+        handler = EasyOCRHandler(profile=OCRProfile('custom', cpu_threads=2))
+        handler.reader = Reader()
+        handler.loaded = True
+        assert handler.find_texts_in_image(np.zeros((5, 10, 3), dtype=np.uint8))[0][1] == 'text'
+        assert threads == [2, 8]
+
+        threads.clear()
+        handler.set_profile('balanced')
+        handler.find_texts_in_image(np.zeros((5, 10, 3), dtype=np.uint8))
+        assert threads == []
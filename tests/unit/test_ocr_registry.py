@@ -0,0 +1,79 @@
+import numpy as np
+from RPALite.ocr_cache import OCRResultCache
+from RPALite.ocr_handler import OCRHandler
+from RPALite.ocr_registry import OCREngineRegistry
+
+
+class CountingOCRHandler(OCRHandler):
+    engine_name = 'fake'
+
+    def __init__(self, languages, debug_mode=False, profile=None):
+        super().__init__(languages, debug_mode, profile=profile)
+        self.calls = 0
+        self.loads = 0
+        self.closed = False
+
+    def _load(self):
+        self.loads += 1
+
+    def _recognize(self, img_array):
+        self.calls += 1
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], 'text', 0.9)]
+
+    def close(self):
+        self.closed = True
+
+
+class TestOCREngineRegistry:
+
+    def setup_method(self):
+        self.engines = []
+
+        def factory(engine, languages, debug_mode=False, profile=None):
+            handler = CountingOCRHandler(languages, debug_mode, profile)
+            self.engines.append(handler)
+            return handler
+
+        self.registry = OCREngineRegistry(factory)
+
+    def test_same_key_shares_engine(self):
+        first = self.registry.acquire('fake', ['en'])
+        second = self.registry.acquire('fake', ['en'], 'balanced')
+        other = self.registry.acquire('fake', ['en'], 'fast')
+        assert first.engine is second.engine
+        assert first.engine is not other.engine
+        assert len(self.engines) == 2
+        assert self.registry.references('fake', ['en']) == 2
+
+    def test_release_drops_engine(self):
+        first = self.registry.acquire('fake', ['en'])
+        second = self.registry.acquire('fake', ['en'])
+        engine = first.engine
+        first.release()
+        assert len(self.registry) == 1 and not engine.closed
+        second.release()
+        assert len(self.registry) == 0 and engine.closed
+
+    def test_caches_are_not_shared(self):
+        frame = np.zeros((20, 20, 3), dtype=np.uint8)
+        first = self.registry.acquire('fake', ['en'], cache=OCRResultCache())
+        second = self.registry.acquire('fake', ['en'], cache=OCRResultCache())
+        first.find_texts_in_image(frame)
+        first.find_texts_in_image(frame)
+        second.find_texts_in_image(frame)
+        assert self.engines[0].calls == 2
+
+    def test_models_are_loaded_on_first_recognition(self):
+        first = self.registry.acquire('fake', ['en'])
+        second = self.registry.acquire('fake', ['en'])
+        assert self.engines[0].loads == 0
+        first.find_texts_in_image(np.zeros((20, 20, 3), dtype=np.uint8))
+        second.warm_up()
+        assert self.engines[0].loads == 1 and self.engines[0].calls == 2
+
+    def test_switching_profile_switches_engine(self):
+        handler = self.registry.acquire('fake', ['en'])
+        handler.set_profile('fast')
+        assert handler.engine.profile.name == 'fast'
+        assert self.registry.references('fake', ['en']) == 0
+        assert self.registry.references('fake', ['en'], 'fast') == 1
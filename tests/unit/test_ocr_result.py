@@ -0,0 +1,34 @@
+import pickle
+import numpy as np
+from RPALite.ocr_result import OcrResult
+
+
+def make_result():
+    return OcrResult.from_list([
+        ([[100.4, 50], [180, 50], [180, 70], [100, 70]], 'Password', 0.8),
+        ([[10, 10], [90, 10], [90, 30], [10, 30]], 'User name', 0.9),
+        ([[10, 50], [60, 50], [60, 70], [10, 70]], 'Email', 0.7),
+    ])
+
+
+class TestOcrResult:
+
+    def test_columns_and_list_view(self):
+        result = make_result()
+        assert result.boxes.dtype == np.int32 and result.boxes.shape == (3, 4, 2)
+        assert result.confidences.dtype == np.float32
+        assert result.texts == ['Password', 'User name', 'Email']
+        assert result[0][0] == [[100, 50], [180, 50], [180, 70], [100, 70]]
+        assert [text for _, text, _ in result] == result.texts
+        assert result == result.to_list()
+        assert pickle.loads(pickle.dumps(result)) == result
+
+    def test_geometric_queries(self):
+        result = make_result()
+        assert result.locations().tolist()[1] == [10, 10, 80, 20]
+        assert result.points_in_rect((0, 0, 90, 100)).tolist() == [False, True, True]
+        assert result.points_in_rects([(0, 0, 20, 20), (95, 45, 10, 10)]).tolist() == [True, True, False]
+        assert result.boxes_in_rect((0, 0, 100, 100)).tolist() == [False, True, True]
+        assert result.sorted().texts == ['User name', 'Email', 'Password']
+        assert result.select([2]).offset(5, -5)[0][0][0] == [15, 45]
+        assert OcrResult.concat([result.select([0]), None, result.select([1])]).texts == ['Password', 'User name']
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from RPALite.paddleocr_handler import PaddleOCRHandler
+
+
+def box(x, y, width=40, height=12):
+    return [[x, y], [x + width, y], [x + width, y + height], [x, y + height]]
+
+
+class LanguageOCR:
+    '''Stands for a PaddleOCR instance of one language: detects the given boxes and recognizes them with the given (text, confidence) tuples.'''
+
+    def __init__(self, lang, boxes, texts):
+        self.lang = lang
+        self.boxes = boxes
+        self.texts = texts
+        self.detections = 0
+        self.recognized_crops = []
+
+    def text_detector(self, img_array):
+        self.detections += 1
+        return np.array(self.boxes, dtype=np.float32), 0.0
+
+    def text_recognizer(self, crops):
+        self.recognized_crops.append(len(crops))
+        return list(self.texts), 0.0
+
+
+class TestPaddleOCRHandler:
+
+    def test_sort_boxes(self):
+        # Boxes less than 10 pixels apart vertically are on the same line and sorted left to right
+        boxes = [np.array(b, dtype=np.float32) for b in (box(200, 54), box(10, 100), box(300, 8), box(20, 50), box(100, 12))]
+        order = [b[0].tolist() for b in PaddleOCRHandler._sort_boxes(boxes)]
+        assert order == [[100, 12], [300, 8], [20, 50], [200, 54], [10, 100]]
+
+    def test_remove_duplicate_results(self):
+        handler = PaddleOCRHandler(['ch', 'ja'])
+        results = [
+            (box(10, 10), 'Save', 0.7),
+            (box(12, 9), ' save ', 0.9),
+            (box(11, 11), 'Open', 0.8),
+            (box(200, 10), 'Save', 0.6),
+            (box(14, 13), 'SAVE', 0.5),
+        ]
+        unique = handler._remove_duplicate_results(results)
+        # The two languages recognized the same text in the same box, the most confident result is kept
+        assert unique == [(box(12, 9), ' save ', 0.9), (box(11, 11), 'Open', 0.8), (box(200, 10), 'Save', 0.6)]
+
+    def test_recognize_multi_language_keeps_best_language_per_box(self):
+        boxes = [box(10, 10), box(10, 40), box(10, 70)]
+        chinese = LanguageOCR('ch', boxes, [('保存', 0.95), ('Opem', 0.6), ('x', 0.2)])
+        japanese = LanguageOCR('japan', boxes, [('保存', 0.9), ('開く', 0.8), ('y', 0.3)])
+        handler = PaddleOCRHandler(['japan', 'ch'])
+        handler._instances_by_profile[handler.profile] = [japanese, chinese]
+        try:
+            result = handler.find_texts_in_image(np.full((100, 100, 3), 255, dtype=np.uint8))
+        finally:
+            handler.close()
+
+        # The boxes are detected once, by the Chinese detector, and recognized by both languages
+        assert chinese.detections == 1 and japanese.detections == 0
+        assert chinese.recognized_crops == [3] and japanese.recognized_crops == [3]
+        # Each box keeps the text of the most confident language, texts below the confidence threshold are dropped
+        assert [r[1] for r in result] == ['保存', '開く']
+        assert [r[2] for r in result] == pytest.approx([0.95, 0.8])
+        assert result[1][0] == box(10, 40)
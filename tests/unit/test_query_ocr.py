@@ -0,0 +1,85 @@
+from RPALite.ocr_handler import OCRHandler
+from RPALite.query_ocr import QueryAwareRecognizer, contains_words, estimate_char_count, length_bounds
+
+
+def make_box(x, y, text, height=20):
+    # About 0.55 * height pixels per character
+    width = int(len(text) * height * 0.55)
+    return [[x, y], [x + width, y], [x + width, y + height], [x, y + height]]
+
+
+class FixedTextsOCRHandler(OCRHandler):
+    '''Detects fixed texts and counts the recognized boxes.'''
+
+    engine_name = 'fixed'
+    supports_detection = True
+
+    def __init__(self, texts):
+        super().__init__()
+        self.boxes = [make_box(10, 30 * i, text) for i, text in enumerate(texts)]
+        self.texts = {tuple(map(tuple, box)): text for box, text in zip(self.boxes, texts)}
+        self.recognized = 0
+
+    def _detect(self, img_array):
+        return self.boxes
+
+    def _recognize_boxes(self, img_array, boxes):
+        self.recognized += len(boxes)
+        return [(box, self.texts[tuple(map(tuple, box))], 0.9) for box in boxes]
+
+
+class TestQueryAwareRecognizer:
+
+    def setup_method(self):
+        texts = ['File', 'Edit', 'View', 'Window', 'Help', 'Save changes before closing?', 'Cancel', 'OK',
+                 'Untitled document 1', 'Recent files', 'Open a folder', 'Preferences and settings']
+        self.ocr = FixedTextsOCRHandler(texts)
+        self.recognizer = QueryAwareRecognizer(self.ocr)
+
+    def search(self, text, recognized=None):
+        boxes = self.ocr.detect_boxes(None)
+        return self.recognizer.find(None, text, boxes, {} if recognized is None else recognized)
+
+    def test_estimate_char_count(self):
+        assert estimate_char_count(make_box(0, 0, 'Save changes')) == 12
+        shortest, longest = length_bounds(10)
+        assert shortest == 6 and round(longest, 2) == 16.67
+
+    def test_only_boxes_of_compatible_length_are_recognized(self):
+        result = self.search('Recent fils')
+        assert 'Recent files' in [r[1] for r in result]
+        assert self.ocr.recognized < len(self.ocr.boxes)
+
+        # A dense screen of short labels
+        self.ocr = FixedTextsOCRHandler([f'Item {i}' for i in range(100)] + ['Save changes before closing?'])
+        self.recognizer = QueryAwareRecognizer(self.ocr)
+        assert [r[1] for r in self.search('Save changes before closing')] == ['Save changes before closing?']
+        assert self.ocr.recognized == 1
+
+    def test_search_widens_to_longer_boxes(self):
+        result = self.search('closing')
+        assert 'Save changes before closing?' in [r[1] for r in result]
+
+    def test_recognized_boxes_are_reused(self):
+        recognized = {}
+        self.search('Edit', recognized)
+        count = self.ocr.recognized
+        self.search('Help', recognized)
+        assert self.ocr.recognized == count
+
+    def test_missing_text_recognizes_all_boxes(self):
+        assert all(r[1] != 'Print' for r in self.search('Print'))
+        assert self.ocr.recognized == len(self.ocr.boxes)
+
+    def test_weak_match_does_not_stop_search(self):
+        assert contains_words('Save', 'Save changes') and not contains_words('Save', 'Saved')
+        self.ocr = FixedTextsOCRHandler(['Saved', 'Open', 'Save changes'])
+        self.recognizer = QueryAwareRecognizer(self.ocr)
+        # 'Saved' has the length of the query but the longer box holds the text as a word
+        assert [r[1] for r in self.search('Save')] == ['Saved', 'Open', 'Save changes']
+        assert self.ocr.recognized == 3
+
+        # A whole word match in the boxes of compatible length stops the search
+        self.ocr.recognized = 0
+        assert [r[1] for r in self.search('Open')] == ['Saved', 'Open']
+        assert self.ocr.recognized == 2
@@ -246,6 +246,20 @@ class TestRPALite(unittest.TestCase):
 
         self.close_app()
 
+    def test_find_texts_positions(self):
+        app = self.open_app()
+        results = self.rpalite.find_texts_positions(["Mouse Test Canvas", "Button B", "Dummy Text"])
+        assert(results["Mouse Test Canvas"] is not None)
+        assert(results["Button B"] is not None)
+        assert(results["Dummy Text"] is None)
+
+        results = self.rpalite.wait_until_all_texts_shown(["Mouse Test Canvas", "Button B"], timeout=5)
+        assert(len(results["Button B"][0][0]) == 4)
+        with pytest.raises(AssertionError):
+            self.rpalite.wait_until_any_text_shown(["Dummy Text", "Another Dummy Text"], timeout=2)
+
+        self.close_app()
+
     def test_mouse_click(self):
         app = self.open_app()
         self.rpalite.maximize_window(app)
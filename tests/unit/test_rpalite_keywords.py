@@ -0,0 +1,147 @@
+import time
+import numpy as np
+import PIL.Image
+import pytest
+from RPALite.image_handler import ImageHandler
+from RPALite.ocr_handler import OCRHandler
+from RPALite.snapshot import Snapshot
+from ocr_fakes import TimeoutOCRPool
+
+# RPALite is a Robot Framework library
+pytest.importorskip('robot')
+from RPALite import RPALite  # noqa: E402
+
+
+class TextsOCRHandler(OCRHandler):
+    '''Reports the given texts one below the other in each image and counts the recognized images.'''
+    engine_name = 'fake'
+
+    def __init__(self, texts):
+        super().__init__(['en'])
+        self.texts = texts
+        self.recognized = 0
+
+    def _recognize(self, img_array):
+        self.recognized += 1
+        return [([[10, 10 + 30 * i], [90, 10 + 30 * i], [90, 30 + 30 * i], [10, 30 + 30 * i]], text, 0.9)
+                for i, text in enumerate(self.texts)]
+
+
+def make_screen(value=255):
+    return np.full((300, 400, 3), value, dtype=np.uint8)
+
+
+def create_rpalite(engine, screens=None):
+    '''
+    Returns an RPALite instance recognizing the screen with the engine OCR handler. screens is the list of the images
+    returned by the successive screenshots, the last one being repeated.
+    '''
+    rpalite = RPALite(step_pause_interval=0)
+    handler = ImageHandler(ocr_engine='easyocr', ocr_cache_size=0, shared_ocr_engine=False)
+    handler.ocr_handler = handler.engine_ocr_handler = engine
+    rpalite.image_handler = handler
+    screens = list(screens or [make_screen()])
+
+    def take_screenshot(*args, **kwargs):
+        screen = screens.pop(0) if len(screens) > 1 else screens[0]
+        return Snapshot(PIL.Image.fromarray(screen))
+
+    rpalite.take_screenshot = take_screenshot
+    # Nothing is moved or scrolled on the real screen
+    rpalite.mouse_move = lambda *args, **kwargs: None
+    rpalite.scroll = lambda *args, **kwargs: None
+    return rpalite
+
+
+class TestRPALiteKeywords:
+    '''Keywords tested without a GUI application: the screen and the OCR are replaced by stubs.'''
+
+    def test_set_ocr_profile(self):
+        rpalite = RPALite(ocr_engine='easyocr', ocr_cache_size=0, shared_ocr_engine=False, step_pause_interval=0)
+        assert rpalite.set_ocr_profile('fast') == 'balanced'
+        assert rpalite.image_handler.ocr_profile.name == 'fast'
+        assert rpalite.set_ocr_profile('accurate') == 'fast'
+        with pytest.raises(ValueError):
+            rpalite.set_ocr_profile('turbo')
+
+    def test_wait_until_text_shown_raises_ocr_timeout(self):
+        pool = TimeoutOCRPool()
+        rpalite = create_rpalite(pool)
+        rpalite.image_handler.ocr_process_pool = pool
+        start = time.monotonic()
+        with pytest.raises(AssertionError, match='Timeout waiting for text: Save'):
+            rpalite.wait_until_text_shown('Save', timeout=30)
+        # The deadline stops the polling instead of waiting for the timeout
+        assert time.monotonic() - start < 5
+        assert pool.deadlines and pool.deadlines[0] is not None
+
+    def test_revealed_band(self):
+        rpalite = create_rpalite(TextsOCRHandler([]))
+        region = (10, 20, 300, 400)
+        # Scrolling down moves the content up and reveals the bottom of the region, plus the margin
+        assert rpalite._revealed_band(region, (0, -100)) == (10, 272, 300, 148)
+        # Scrolling up reveals the top of the region
+        assert rpalite._revealed_band(region, (0, 100)) == (10, 20, 300, 148)
+        # The band never exceeds the region, and horizontal shifts search the whole region
+        assert rpalite._revealed_band(region, (0, -390)) == region
+        assert rpalite._revealed_band(region, (15, -100)) == region
+
+    def test_wait_until_region_settles(self):
+        # Smooth scrolling animates the content over several frames before it stops
+        screens = [make_screen(value) for value in (200, 150, 100, 100)]
+        rpalite = create_rpalite(TextsOCRHandler([]), screens)
+        previous = make_screen(255)[:, :, 0]
+        snapshot, current = rpalite._wait_until_region_settles((0, 0, 400, 300), previous, 5, interval=0.01)
+        assert current.max() == 100 and snapshot.gray.max() == 100
+
+    def test_wait_until_region_settles_timeout(self):
+        rpalite = create_rpalite(TextsOCRHandler([]))
+        previous = make_screen()[:, :, 0]
+        start = time.monotonic()
+        assert rpalite._wait_until_region_settles((0, 0, 400, 300), previous, 0.3, interval=0.01) is None
+        assert time.monotonic() - start >= 0.3
+
+    def test_scroll_until_text_shown_stops_at_end_of_list(self):
+        engine = TextsOCRHandler(['File', 'Edit'])
+        rpalite = create_rpalite(engine)
+        with pytest.raises(AssertionError, match='end of the scrolled content: Settings'):
+            rpalite.scroll_until_text_shown('Settings', max_scrolls=5, settle_timeout=0.1)
+        # The content did not move after the first scroll, so the screen was not searched again
+        assert engine.recognized == 1
+
+    def test_scroll_until_text_shown_refuses_frozen_frame(self):
+        engine = TextsOCRHandler(['File'])
+        rpalite = create_rpalite(engine)
+        with rpalite.frozen_frame(Snapshot(PIL.Image.fromarray(make_screen()))):
+            with pytest.raises(AssertionError, match='frame is frozen'):
+                rpalite.scroll_until_text_shown('Settings')
+        assert engine.recognized == 0
+
+    def test_find_texts_positions_recognizes_screen_once(self):
+        engine = TextsOCRHandler(['File', 'Edit', 'Help'])
+        rpalite = create_rpalite(engine)
+        results = rpalite.find_texts_positions(['File', 'Help', 'Missing', 'File'])
+        assert engine.recognized == 1
+        assert results['File'][0] == ((10, 10, 80, 20), 1)
+        assert results['Help'][0] == ((10, 70, 80, 20), 1)
+        assert results['Missing'] is None
+
+    def test_wait_until_any_text_shown(self):
+        engine = TextsOCRHandler(['File', 'Edit'])
+        rpalite = create_rpalite(engine)
+        results = rpalite.wait_until_any_text_shown(['Missing', 'Edit', 'Other'], timeout=5)
+        assert engine.recognized == 1
+        assert results['Edit'] is not None and results['Missing'] is None and results['Other'] is None
+
+    def test_wait_until_all_texts_shown(self):
+        engine = TextsOCRHandler(['File', 'Edit', 'Help'])
+        rpalite = create_rpalite(engine)
+        results = rpalite.wait_until_all_texts_shown(['Help', 'File', 'Edit'], timeout=5)
+        assert engine.recognized == 1
+        assert all(result is not None for result in results.values())
+
+    def test_wait_until_all_texts_shown_timeout_lists_missing_texts(self):
+        engine = TextsOCRHandler(['File', 'Edit'])
+        rpalite = create_rpalite(engine)
+        with pytest.raises(AssertionError, match='^Timeout waiting for texts: Missing, Other$'):
+            rpalite.wait_until_all_texts_shown(['File', 'Missing', 'Edit', 'Other'], timeout=0)
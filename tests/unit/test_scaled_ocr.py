@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from RPALite.scaled_ocr import ScaledOCRHandler
+
+
+class BoxOCRHandler:
+    '''Reports one text box of text_height pixels at (10, 10) of each image and records the recognized shapes.'''
+
+    def __init__(self, text_height=10):
+        self.text_height = text_height
+        self.shapes = []
+
+    def find_texts_in_image(self, image):
+        self.shapes.append(image.shape)
+        bottom = 10 + self.text_height
+        return [([[10, 10], [50, 10], [50, bottom], [10, bottom]], 'text', 0.9)]
+
+
+def make_image(width=400, height=200):
+    return np.full((height, width, 3), 255, dtype=np.uint8)
+
+
+class TestScaledOCRHandler:
+
+    def test_fixed_scale_maps_boxes_back(self):
+        engine = BoxOCRHandler()
+        handler = ScaledOCRHandler(engine, 0.5)
+        result = handler.find_texts_in_image(make_image())
+        assert engine.shapes == [(100, 200, 3)]
+        assert result[0][0] == [[20, 20], [100, 20], [100, 40], [20, 40]]
+        assert result[0][1] == 'text'
+
+    def test_full_resolution_keeps_image(self):
+        engine = BoxOCRHandler()
+        result = ScaledOCRHandler(engine, 'full').find_texts_in_image(make_image())
+        assert engine.shapes == [(200, 400, 3)]
+        assert result[0][0] == [[10, 10], [50, 10], [50, 20], [10, 20]]
+
+    def test_auto_follows_text_height(self):
+        engine = BoxOCRHandler(text_height=48)
+        handler = ScaledOCRHandler(engine, 'auto', target_text_height=24)
+        assert handler.get_scale() == (1.0, 1.0)
+        handler.find_texts_in_image(make_image())
+        # The texts of the first image are 48 pixels high, twice the target height
+        assert handler.get_scale() == (0.5, 0.5)
+        handler.find_texts_in_image(make_image())
+        assert engine.shapes == [(200, 400, 3), (100, 200, 3)]
+
+    def test_auto_uses_display_scale(self):
+        handler = ScaledOCRHandler(BoxOCRHandler(text_height=48), 'auto')
+        handler.set_display_scale(1.5, 1.25)
+        assert handler.get_scale() == pytest.approx((1 / 1.5, 1 / 1.25))
+        # The display scale takes precedence over the text height
+        handler.find_texts_in_image(make_image())
+        assert handler.get_scale() == pytest.approx((1 / 1.5, 1 / 1.25))
+        handler.set_display_scale(1, 1)
+        assert handler.get_scale() == (0.5, 0.5)
+
+    def test_auto_scale_is_clamped(self):
+        handler = ScaledOCRHandler(BoxOCRHandler(text_height=240), 'auto', min_scale=0.4)
+        handler.set_display_scale(4, 4)
+        assert handler.get_scale() == (0.4, 0.4)
+        handler.set_display_scale(1, 1)
+        handler.find_texts_in_image(make_image())
+        assert handler.get_scale() == (0.4, 0.4)
+
+    def test_invalid_resolution(self):
+        for resolution in ('half', 0, 1.5, -0.5, None):
+            with pytest.raises(ValueError):
+                ScaledOCRHandler(BoxOCRHandler(), resolution)
+        # Robot Framework passes numbers as strings
+        assert ScaledOCRHandler(BoxOCRHandler(), '0.75').get_scale() == (0.75, 0.75)
@@ -0,0 +1,37 @@
+import numpy as np
+from RPALite.spatial_index import SpatialIndex
+
+
+class TestSpatialIndex:
+
+    def test_queries_match_full_scan(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            count = int(rng.integers(0, 80))
+            # Small boxes, larger controls and window frames covering many cells
+            sizes = rng.integers(0, rng.choice([30, 400, 1200]), (count, 2))
+            rects = np.concatenate([rng.integers(-50, 1000, (count, 2)), sizes], axis=1)
+            index = SpatialIndex(rects, cell_size=int(rng.choice([16, 64])), max_cells=int(rng.choice([4, 64])))
+            x, y, w, h = rects.T
+            for _ in range(20):
+                rx, ry = rng.integers(-100, 1100, 2)
+                rw, rh = rng.integers(0, 300, 2)
+                containing = (x <= rx) & (y <= ry) & (x + w >= rx + rw) & (y + h >= ry + rh)
+                within = (x >= rx) & (y >= ry) & (x + w <= rx + rw) & (y + h <= ry + rh)
+                intersecting = (x <= rx + rw) & (rx <= x + w) & (y <= ry + rh) & (ry <= y + h)
+                assert index.containing((rx, ry, rw, rh)).tolist() == np.flatnonzero(containing).tolist()
+                assert index.within((rx, ry, rw, rh)).tolist() == np.flatnonzero(within).tolist()
+                assert index.intersecting((rx, ry, rw, rh)).tolist() == np.flatnonzero(intersecting).tolist()
+
+                distances = index.distances((rx, ry))
+                nearest = index.nearest((rx, ry), k=3, max_distance=300)
+                expected = np.argsort(distances, kind='stable')[:3]
+                expected = expected[distances[expected] <= 300]
+                assert distances[nearest].tolist() == distances[expected].tolist()
+
+    def test_stab(self):
+        index = SpatialIndex([(0, 0, 800, 600), (10, 10, 50, 20), (100, 100, 0, 0)])
+        assert index.stab((20, 15)).tolist() == [0, 1]
+        assert index.stab((100, 100)).tolist() == [0, 2]
+        assert index.stab((900, 100)).tolist() == []
+        assert index.nearest((0, 900)).tolist() == [0]
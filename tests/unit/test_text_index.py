@@ -0,0 +1,47 @@
+import random
+from difflib import SequenceMatcher
+from RPALite.text_index import TextIndex
+
+
+def brute_force_search(texts, query, min_ratio=0.75):
+    results = []
+    for i, text in enumerate(texts):
+        if query in text:
+            results.append((i, True, 1))
+        else:
+            ratio = SequenceMatcher(None, text, query).ratio()
+            if ratio > min_ratio:
+                results.append((i, False, ratio))
+    return results
+
+
+class TestTextIndex:
+
+    def test_search_matches_full_scan(self):
+        rng = random.Random(0)
+        words = ['File', 'Edit', 'View', 'Help', 'Save as', 'Settings', 'User name', 'Password', 'ab', 'a-b', 'x']
+        texts = [rng.choice(words) for _ in range(200)]
+        # OCR mistakes: dropped, replaced and inserted characters
+        for _ in range(300):
+            text = list(rng.choice(words))
+            position = rng.randrange(len(text))
+            operation = rng.choice(['drop', 'replace', 'insert'])
+            if operation == 'drop' and len(text) > 1:
+                del text[position]
+            elif operation == 'replace':
+                text[position] = rng.choice('xyz01 ')
+            else:
+                text.insert(position, rng.choice('xyz01 '))
+            texts.append(''.join(text))
+        texts.extend(['', 'Total: 1,234.00', 'Save'])
+
+        index = TextIndex(texts)
+        for query in words + ['Save', 'Setings', 'a', 'b', 'ab', 'Sve', 'Nothing like this', '']:
+            assert index.search(query) == brute_force_search(texts, query), query
+
+    def test_containing_uses_all_bigrams(self):
+        index = TextIndex(['Open file', 'Open folder', 'Close file'])
+        assert index.containing('Open') == [0, 1]
+        assert index.containing('file') == [0, 2]
+        assert index.containing('n f') == [0, 1]
+        assert index.containing('Save') == []
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+from RPALite.text_prefilter import TextChangeDetector, TextPrefilterOCRHandler, find_text_regions
+
+
+class ShapeOCRHandler:
+    '''Reports one text box covering each recognized image and remembers the image shapes.'''
+
+    def __init__(self):
+        self.shapes = []
+
+    def find_texts_in_image(self, image):
+        self.shapes.append(image.shape)
+        height, width = image.shape[:2]
+        return [([[0, 0], [width, 0], [width, height], [0, height]], f"{width}x{height}", 1.0)]
+
+
+def make_screen():
+    screen = np.full((720, 1280, 3), 240, dtype=np.uint8)
+    # A picture and a panel without any text
+    screen[400:700, 700:1200] = np.linspace(0, 255, 500, dtype=np.uint8)[None, :, None]
+    screen[50:300, 800:1200] = 60
+    cv2.putText(screen, 'Login', (100, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    cv2.putText(screen, 'Password', (100, 500), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1)
+    return screen
+
+
+class TestTextPrefilter:
+
+    def test_find_text_regions(self):
+        regions = find_text_regions(make_screen())
+        assert len(regions) == 2
+        assert all(x < 300 for x, _, _, _ in regions), "Pictures and panels should not be text candidates"
+
+    def test_only_text_blocks_are_recognized(self):
+        ocr = ShapeOCRHandler()
+        result = TextPrefilterOCRHandler(ocr).find_texts_in_image(make_screen())
+        assert len(ocr.shapes) == 2
+        assert all(h < 100 and w < 300 for h, w, _ in ocr.shapes)
+        assert result[0][0][0][1] < result[1][0][0][1], "Boxes should be sorted in reading order"
+
+    def test_blank_image_is_not_recognized(self):
+        ocr = ShapeOCRHandler()
+        assert TextPrefilterOCRHandler(ocr).find_texts_in_image(np.full((300, 400, 3), 200, dtype=np.uint8)) is None
+        assert ocr.shapes == []
+
+    def test_text_change_detector(self):
+        detector = TextChangeDetector()
+        screen = make_screen()
+        assert detector.has_changed(screen)
+        animated = screen.copy()
+        animated[400:700, 700:1200] = 255 - animated[400:700, 700:1200]
+        assert not detector.has_changed(animated), "Changes outside the texts should be ignored"
+        cv2.putText(animated, 'Welcome', (100, 300), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        assert detector.has_changed(animated)
@@ -0,0 +1,61 @@
+import numpy as np
+from RPALite.ocr_cache import OCRResultCache
+from RPALite.ocr_disk_cache import PersistentOCRCache
+from RPALite.ocr_handler import OCRHandler
+from RPALite.tiled_ocr import TiledOCRHandler
+
+
+class TileOCRHandler(OCRHandler):
+    '''Reports one text box at the top left corner of each image and records the recognized shapes in recognized.'''
+    engine_name = 'fake'
+
+    def __init__(self, recognized, cache=None):
+        super().__init__(['en'], cache=cache)
+        self.recognized = recognized
+
+    def _recognize(self, img_array):
+        self.recognized.append(img_array.shape)
+        return [([[5, 5], [60, 5], [60, 20], [5, 20]], 'text', 0.9)]
+
+
+def make_frame():
+    frame = np.zeros((700, 1500, 3), dtype=np.uint8)
+    frame[::7, ::11] = 255
+    return frame
+
+
+class TestTiledOCRHandler:
+
+    def create_handler(self, cache):
+        self.recognized = []
+        # Like ImageHandler, the wrapped handler has the cache and the worker handlers do not
+        return TiledOCRHandler(TileOCRHandler(self.recognized, cache), tile_size=640, overlap=128, workers=2,
+                               handler_factory=lambda: TileOCRHandler(self.recognized), cache=cache)
+
+    def test_large_frame_is_recognized_once(self):
+        handler = self.create_handler(OCRResultCache())
+        try:
+            first = handler.find_texts_in_image(make_frame())
+            tiles = len(self.recognized)
+            assert tiles == len(handler.split_tiles(1500, 700)) > 1
+            second = handler.find_texts_in_image(make_frame())
+            assert len(self.recognized) == tiles
+            assert second == first
+        finally:
+            handler.close()
+
+    def test_large_frame_uses_persistent_cache(self, tmp_path):
+        path = str(tmp_path / 'ocr.sqlite')
+        handler = self.create_handler(PersistentOCRCache(path))
+        try:
+            first = handler.find_texts_in_image(make_frame())
+        finally:
+            handler.close()
+
+        # A new run reads the stitched result from the database
+        handler = self.create_handler(PersistentOCRCache(path))
+        try:
+            assert handler.find_texts_in_image(make_frame()) == first
+            assert self.recognized == []
+        finally:
+            handler.close()